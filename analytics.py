@@ -0,0 +1,347 @@
+"""
+Kohort analitiği: tamamlanmış oyunların log'larından bölümlenmiş (seed / oda / ay) sütunlu dosyalar
+ve önceden hesaplanmış grup toplamları. Dönemler arası sorular her şeyi pandas'a yüklemeden yanıtlanır.
+
+Depo (WFG_ANALYTICS_DIR, yoksa uygulamanın yanındaki analytics_store/):
+
+    inbox/*.jsonl                       biten oyunlar (oyun başına bir dosya); build bölümlere taşır
+    seed=20260209/room=Genel/month=4/
+        part-<id>.npy                   (satır, sütun) float64, Fortran sırası: her sütun bitişik, mmap ile okunur
+        part-<id>.agg.npz               GROUP_DIMS başına adet / toplam / kare toplamı
+
+Her satır bir oyuncu-aydır: o ayın log alanları (LOG_COLUMNS) + oyuncunun oyun sonu alanları
+(GAME_COLUMNS, "Oyun." ve "Pay." önekli; her ay satırına kopyalanır, birleştirme gerekmez).
+Oyuncu başına tek satır için "Ay == 1" süzgeci kullanılır (her oyunun 1. ayı vardır).
+
+    python -m analytics build
+    python -m analytics query mean Oyun.Temerrüt --where "Ay == 4" --by "YeniBorç(1ay)(TL)" --bins 0,1,20000,50000
+    python -m analytics query mean "Oyun.Hırsızlık(TL)" --where "Ay == 4" --where "DönemSonuNakit(TL) > 0"
+    python -m analytics query mean Oyun.SonServet --where "Ay == 1" --by Oyun.BaskınVarlık
+    python -m analytics stats
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import sys
+import urllib.parse
+import uuid
+
+import numpy as np
+
+from engine import ASSETS, RISK_ASSETS, dd_total, td_total, net_wealth
+
+ANALYTICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analytics_store")
+
+LOG_COLUMNS = (
+    "Ay", "FiyatlarGenelDuzeyi", "Gelir(TL)", "SabitGider(TL)", "EkHarcama(TL)",
+    "SatışNetNakitGirişi(TL)", "GerçekleşenKârZarar(TL)", "GerçekleşmemişKârZarar(TL)",
+    "YeniBorç(1ay)(TL)", "VadesiGelenBorçÖdeme(TL)", "İşlemÜcreti(TL)", "SpreadMaliyeti(TL)",
+    "VadeliBozmaCezası(TL)", "VadeliFaizGeliri(TL)", "BankaKayıp(TL)", "BankaBatışıKayıp(TL)",
+    "NakitHırsızlıkKayıp(TL)", "DönemSonuNakit(TL)", "DönemSonuYatırım(TL)", "Borç(Anapara)(TL)",
+    "Borç(Görünüm)(TL)", "ToplamServet(TL)", "BankaBatışı_Sayı",
+)
+# oyun sonu alanları: log satırlarından toplanan tutarlar + son portföy payları
+_GAME_SUMS = {
+    "Oyun.Hırsızlık(TL)": ("NakitHırsızlıkKayıp(TL)",),
+    "Oyun.BankaKayıp(TL)": ("BankaKayıp(TL)", "BankaBatışıKayıp(TL)"),
+    "Oyun.Maliyet(TL)": ("İşlemÜcreti(TL)", "SpreadMaliyeti(TL)", "VadeliBozmaCezası(TL)"),
+    "Oyun.VadeliFaiz(TL)": ("VadeliFaizGeliri(TL)",),
+    "Oyun.Borç(TL)": ("YeniBorç(1ay)(TL)",),
+}
+GAME_COLUMNS = (
+    "Oyun.Temerrüt", "Oyun.Ay", "Oyun.SonServet", "Oyun.BatışSayı", *_GAME_SUMS, "Oyun.BaskınVarlık",
+    *(f"Pay.{k}" for k in ASSETS),
+)
+COLUMNS = LOG_COLUMNS + GAME_COLUMNS
+# kategorik sütunlar: kod -> etiket (sorguda etiketle süzülebilir, gruplar etiketle yazılır)
+CATEGORIES = {"Oyun.BaskınVarlık": tuple(ASSETS), "Oyun.Temerrüt": ("hayır", "evet")}
+# her parça için önceden toplanan gruplamalar ("" = tüm satırlar)
+GROUP_DIMS = ("", "Oyun.BaskınVarlık", "Oyun.Temerrüt")
+AGGS = ("count", "sum", "mean", "std")
+
+_COL_INDEX = {c: j for j, c in enumerate(COLUMNS)}
+
+def library_dir() -> str:
+    return os.environ.get("WFG_ANALYTICS_DIR") or ANALYTICS_DIR
+
+# =========================
+# KAYIT
+# =========================
+def game_record(name: str, p: dict, seed: int, room: str) -> dict:
+    """Biten oyunun analitik kaydı (JSON'a yazılabilir): log satırları + oyun sonu alanları."""
+    log = [[float(row.get(c, math.nan)) for c in LOG_COLUMNS] for row in p["log"]]
+    values = {"cash": float(p["holdings"]["cash"]), "dd": dd_total(p), "td": td_total(p),
+              **{k: float(p["holdings"].get(k, 0.0)) for k in RISK_ASSETS}}
+    gross = sum(max(v, 0.0) for v in values.values())
+    shares = {k: (max(values[k], 0.0) / gross if gross > 0 else 0.0) for k in ASSETS}
+    game = {
+        "Oyun.Temerrüt": float(bool(p["defaulted"])),
+        "Oyun.Ay": float(len(log)),
+        "Oyun.SonServet": float(net_wealth(p)),
+        "Oyun.BatışSayı": float(p.get("bankruptcies_seen", 0)),
+        "Oyun.BaskınVarlık": float(tuple(ASSETS).index(max(shares, key=shares.get))) if gross > 0 else -1.0,
+        **{f"Pay.{k}": v for k, v in shares.items()},
+    }
+    for col, fields in _GAME_SUMS.items():
+        idx = [LOG_COLUMNS.index(f) for f in fields]
+        game[col] = float(sum(r[j] for r in log for j in idx))
+    return {"seed": int(seed), "room": str(room), "player": str(name),
+            "game": [game[c] for c in GAME_COLUMNS], "log": log}
+
+def record_game(rec: dict, path: str = None):
+    """
+    Kaydı gelen kutusuna kendi dosyası olarak koyar (ucuz; bölümlere build ile taşınır). Dosya geçici adla
+    yazılıp os.replace ile yayımlanır: build yalnızca tamamlanmış, bir daha yazılmayacak dosyaları görür,
+    süreçler ve iş parçacıkları arasında kilit gerekmez.
+    """
+    inbox = os.path.join(path or library_dir(), "inbox")
+    os.makedirs(inbox, exist_ok=True)
+    name = f"{os.getpid()}-{uuid.uuid4().hex}"
+    tmp = os.path.join(inbox, f".{name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    os.replace(tmp, os.path.join(inbox, f"{name}.jsonl"))
+
+# =========================
+# BÖLÜMLER (YAZMA)
+# =========================
+def partition_dir(seed: int, room: str, month: int, path: str = None) -> str:
+    return os.path.join(path or library_dir(), f"seed={int(seed)}", f"room={urllib.parse.quote(str(room), safe='')}",
+                        f"month={int(month)}")
+
+def _group_sums(arr: np.ndarray) -> dict:
+    """GROUP_DIMS başına (anahtarlar, adet, toplam, kare toplamı); NaN değerler toplama girmez."""
+    out = {}
+    finite = np.isfinite(arr)
+    vals = np.where(finite, arr, 0.0)
+    for i, dim in enumerate(GROUP_DIMS):
+        if dim:
+            keys, inv = np.unique(arr[:, _COL_INDEX[dim]], return_inverse=True)
+        else:
+            keys, inv = np.zeros(1), np.zeros(arr.shape[0], dtype=np.intp)
+        g = keys.size
+        out[f"g{i}_keys"] = keys
+        out[f"g{i}_count"] = np.stack([np.bincount(inv, finite[:, j], g) for j in range(arr.shape[1])], axis=1)
+        out[f"g{i}_sum"] = np.stack([np.bincount(inv, vals[:, j], g) for j in range(arr.shape[1])], axis=1)
+        out[f"g{i}_sumsq"] = np.stack([np.bincount(inv, vals[:, j] ** 2, g) for j in range(arr.shape[1])], axis=1)
+    return out
+
+def write_part(arr: np.ndarray, directory: str) -> str:
+    """(satır, COLUMNS) dizisini yeni bir parça olarak yazar; önce toplamlar, sonra veri (atomik)."""
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"part-{uuid.uuid4().hex[:12]}")
+    with open(f"{base}.agg.tmp", "wb") as f:
+        np.savez(f, columns=np.array(COLUMNS), **_group_sums(arr))
+    os.replace(f"{base}.agg.tmp", f"{base}.agg.npz")
+    with open(f"{base}.tmp", "wb") as f:
+        np.save(f, np.asfortranarray(arr, dtype=np.float64))
+    os.replace(f"{base}.tmp", f"{base}.npy")
+    return f"{base}.npy"
+
+def write_records(records, path: str = None) -> int:
+    """Kayıtları (seed, oda, ay) bölümlerine yeni parçalar olarak yazar; yazılan satır sayısını döndürür."""
+    rows = {}
+    for rec in records:
+        for log_row in rec["log"]:
+            key = (rec["seed"], rec["room"], int(log_row[0]))
+            rows.setdefault(key, []).append(log_row + rec["game"])
+    for (seed, room, month), block in rows.items():
+        write_part(np.array(block, dtype=np.float64), partition_dir(seed, room, month, path))
+    return sum(len(b) for b in rows.values())
+
+def compact(path: str = None) -> int:
+    """Birden çok parçası olan bölümleri tek parçada birleştirir; birleştirilen bölüm sayısını döndürür."""
+    merged = 0
+    for directory in sorted({os.path.dirname(f) for f in _parts(path or library_dir())}):
+        files = sorted(glob.glob(os.path.join(directory, "part-*.npy")))
+        if len(files) < 2:
+            continue
+        write_part(np.concatenate([_load(f) for f in files]), directory)
+        for f in files:
+            os.remove(f)
+            os.remove(f[:-4] + ".agg.npz")
+        merged += 1
+    return merged
+
+def build(path: str = None) -> int:
+    """Gelen kutusundaki oyunları bölümlere taşır ve bölümleri sıkıştırır; taşınan oyun sayısını döndürür."""
+    path = path or library_dir()
+    games = 0
+    for inbox in sorted(glob.glob(os.path.join(path, "inbox", "*.jsonl"))):
+        work = f"{inbox}.{uuid.uuid4().hex[:8]}.build"
+        try:
+            os.replace(inbox, work)  # dosyayı bu build sahiplenir
+        except FileNotFoundError:
+            continue  # eşzamanlı başka bir build aldı
+        with open(work, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        write_records(records, path)
+        os.remove(work)
+        games += len(records)
+    compact(path)
+    return games
+
+# =========================
+# SORGU
+# =========================
+def _parts(path: str, seeds=None, rooms=None, months=None) -> list:
+    out = []
+    for f in glob.glob(os.path.join(path, "seed=*", "room=*", "month=*", "part-*.npy")):
+        month_dir = os.path.dirname(f)
+        room_dir = os.path.dirname(month_dir)
+        seed = int(os.path.basename(os.path.dirname(room_dir))[5:])
+        room = urllib.parse.unquote(os.path.basename(room_dir)[5:])
+        month = int(os.path.basename(month_dir)[6:])
+        if (seeds is None or seed in seeds) and (rooms is None or room in rooms) and (months is None or months(month)):
+            out.append(f)
+    return sorted(out)
+
+def _load(file: str) -> np.ndarray:
+    arr = np.load(file, mmap_mode="r")
+    if arr.ndim != 2 or arr.shape[1] != len(COLUMNS):
+        raise ValueError(f"{file}: (n, {len(COLUMNS)}) dizi bekleniyordu, {arr.shape} bulundu (eski şema?).")
+    return arr
+
+_OPS = {"==": np.equal, "!=": np.not_equal, "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal}
+_WHERE_RE = re.compile(r"^\s*(.+?)\s*(==|!=|<=|>=|<|>)\s*(.+?)\s*$")
+
+def parse_where(text: str) -> tuple:
+    """"Ay == 4" -> ("Ay", "==", 4.0); kategorik sütunda etiket de yazılabilir ("Oyun.BaskınVarlık == td")."""
+    m = _WHERE_RE.match(str(text))
+    if not m:
+        raise ValueError(f"Koşul 'sütun işleç değer' biçiminde olmalı: {text!r}")
+    col, op, raw = m.groups()
+    if col not in _COL_INDEX:
+        raise KeyError(f"Bilinmeyen sütun: {col}")
+    labels = CATEGORIES.get(col, ())
+    if raw in labels:
+        return col, op, float(labels.index(raw))
+    try:
+        return col, op, float(raw)
+    except ValueError:
+        raise ValueError(f"{col}: sayı ya da {', '.join(labels) or 'sayı'} bekleniyordu: {raw!r}") from None
+
+def _group_label(by: str, key, bins) -> str:
+    if bins is not None:
+        lo = bins[int(key) - 1] if int(key) > 0 else -math.inf
+        hi = bins[int(key)] if int(key) < len(bins) else math.inf
+        return f"[{lo:g}, {hi:g})"
+    labels = CATEGORIES.get(by, ())
+    return labels[int(key)] if by and 0 <= key < len(labels) else ("tümü" if not by else f"{key:g}")
+
+def _finish(acc: dict, agg: str, by: str, bins) -> list:
+    out = []
+    for key in sorted(acc):
+        n, s, sq = acc[key]
+        mean = s / n if n else math.nan
+        value = {"count": n, "sum": s, "mean": mean,
+                 "std": math.sqrt(max(sq / n - mean * mean, 0.0)) if n else math.nan}[agg]
+        out.append({"group": _group_label(by, key, bins), "n": int(n), "value": float(value)})
+    return out
+
+def query(agg: str, metric: str, where=(), by: str = "", bins=None, seeds=None, rooms=None,
+          path: str = None) -> list:
+    """
+    [{"group", "n", "value"}, ...]: metric sütununun agg'si (count/sum/mean/std), by'a göre gruplu.
+    where: ("sütun", işleç, değer) ya da "sütun işleç değer" listesi (hepsi VE ile bağlanır).
+    bins verilirse by sayısal sütun aralıklara bölünür ([b0, b1), ...). "Ay" koşulları bölüm
+    seçiminde kullanılır; başka koşul yoksa ve by GROUP_DIMS'teyse yanıt yalnızca toplam
+    dosyalarından okunur (satırlara dokunulmaz).
+    """
+    if agg not in AGGS:
+        raise ValueError(f"agg şunlardan biri olmalı: {', '.join(AGGS)}")
+    if metric not in _COL_INDEX or (by and by not in _COL_INDEX):
+        raise KeyError(f"Bilinmeyen sütun: {metric if metric not in _COL_INDEX else by}")
+    conds = [parse_where(w) if isinstance(w, str) else tuple(w) for w in where]
+    month_conds = [(op, v) for c, op, v in conds if c == "Ay"]
+    row_conds = [(_COL_INDEX[c], _OPS[op], v) for c, op, v in conds if c != "Ay"]
+    files = _parts(path or library_dir(), seeds=None if seeds is None else {int(s) for s in seeds},
+                   rooms=None if rooms is None else {str(r) for r in rooms},
+                   months=lambda m: all(_OPS[op](m, v) for op, v in month_conds))
+    j = _COL_INDEX[metric]
+    bins = None if bins is None else sorted(float(b) for b in bins)
+    acc = {}
+    if not row_conds and bins is None and by in GROUP_DIMS:
+        g = GROUP_DIMS.index(by)
+        for f in files:
+            with np.load(f[:-4] + ".agg.npz") as z:
+                for key, n, s, sq in zip(z[f"g{g}_keys"], z[f"g{g}_count"][:, j], z[f"g{g}_sum"][:, j],
+                                         z[f"g{g}_sumsq"][:, j]):
+                    a = acc.setdefault(float(key), [0.0, 0.0, 0.0])
+                    a[0] += n
+                    a[1] += s
+                    a[2] += sq
+        return _finish(acc, agg, by, bins)
+
+    for f in files:
+        arr = _load(f)
+        mask = np.isfinite(arr[:, j])
+        for col, op, v in row_conds:
+            mask &= op(arr[:, col], v)
+        vals = arr[:, j][mask]
+        if by:
+            keys = arr[:, _COL_INDEX[by]][mask]
+            if bins is not None:
+                keys = np.digitize(keys, bins).astype(np.float64)
+            uniq, inv = np.unique(keys, return_inverse=True)
+        else:
+            uniq, inv = np.zeros(1), np.zeros(vals.size, dtype=np.intp)
+        n = np.bincount(inv, minlength=uniq.size)
+        s = np.bincount(inv, vals, uniq.size)
+        sq = np.bincount(inv, vals * vals, uniq.size)
+        for key, a_n, a_s, a_sq in zip(uniq, n, s, sq):
+            a = acc.setdefault(float(key), [0.0, 0.0, 0.0])
+            a[0] += float(a_n)
+            a[1] += float(a_s)
+            a[2] += float(a_sq)
+    return _finish(acc, agg, by, bins)
+
+def stats(path: str = None) -> dict:
+    """Bölüm / parça / satır sayıları (yalnızca .npy başlıkları okunur)."""
+    files = _parts(path or library_dir())
+    return {"partitions": len({os.path.dirname(f) for f in files}), "parts": len(files),
+            "rows": int(sum(_load(f).shape[0] for f in files))}
+
+# =========================
+# KOMUT SATIRI
+# =========================
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m analytics", description="Tamamlanmış oyunlar üzerinde kohort sorguları.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build", help="gelen kutusunu bölümlere taşı ve sıkıştır")
+    sub.add_parser("stats", help="bölüm ve satır sayıları")
+    sub.add_parser("columns", help="sorgulanabilir sütunlar")
+    q = sub.add_parser("query", help="gruplu toplam")
+    q.add_argument("agg", choices=AGGS)
+    q.add_argument("metric")
+    q.add_argument("--where", action="append", default=[], help='koşul (tekrarlanabilir), ör. "Ay == 4"')
+    q.add_argument("--by", default="", help="gruplama sütunu")
+    q.add_argument("--bins", help="by için aralık sınırları, ör. 0,1,20000,50000")
+    q.add_argument("--seed", type=int, action="append", help="yalnızca bu seed(ler)")
+    q.add_argument("--room", action="append", help="yalnızca bu oda(lar)")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "build":
+        print(f"{build()} oyun taşındı")
+        return 0
+    if args.cmd == "stats":
+        print(json.dumps(stats(), ensure_ascii=False))
+        return 0
+    if args.cmd == "columns":
+        print("\n".join(COLUMNS))
+        return 0
+    try:
+        bins = [float(b) for b in args.bins.split(",")] if args.bins else None
+        rows = query(args.agg, args.metric, args.where, args.by, bins, args.seed, args.room)
+    except (OSError, ValueError, KeyError) as e:
+        ap.error(str(e))
+    for r in rows:
+        print(json.dumps(r, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
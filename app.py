@@ -1,239 +1,111 @@
+import copy
+import inspect
+import json
+import os
+import pickle
+import re
+import time
+import uuid
+
 import streamlit as st
-import numpy as np
-import pandas as pd
+
+from engine import (
+    ASSETS, RISK_ASSETS, TAX_DROP_RATE,
+    Market, dd_total, td_total, other_investments_total, total_investments,
+    loan_due_amount, total_debt_display, net_wealth, new_player, ensure_positions, position_rows, ensure_bank_choices,
+    empty_decisions, projected_sell_cash, validate_decisions, settle_month,
+    encode_save_code, decode_save_code, save_code_text, save_code_bytes,
+)
+from reference import QUANTILES, wealth_quantiles
+from bots import STRATEGIES, default_orders, standing_orders, fast_forward
+from compare import benchmark_wealth
+from rooms import Room, load_rooms
+import analytics
+import metrics
+import montecarlo
+from bus import Bus, class_topic
+from playerstore import PlayerStore, VersionConflict, transact
+import views
 
 st.set_page_config(page_title="Borsa Uygulamaları - 1. Hafta Oyunu", layout="wide")
 
+ROOMS = load_rooms()
+
 # =========================
-# SABİT (ÖĞRENCİ DEĞİŞTİREMEZ)
+# YARDIMCI
 # =========================
-DEFAULT_MONTHLY_INCOME = 60000
-START_FIXED_COST = 30000
-START_EXTRA_COST = 5000
+def fmt_tl(x: float) -> str:
+    return f"{x:,.0f} TL".replace(",", ".")
 
-# ✅ Vergi dilimi etkisi: 2. aydan itibaren gelir her ay %5 azalır
-TAX_DROP_RATE = 0.05
+def fmt_pct(x: float) -> str:
+    return f"{x*100:.1f}%"
 
+@st.cache_resource(show_spinner=False)
+def get_room(room_name: str) -> Room:
+    """Oda başına bir kez kurulur; odadaki bütün oturumlar aynı salt okunur piyasayı paylaşır."""
+    spec = ROOMS[room_name]
+    return Room(room_name, spec["seed"], spec["overrides"])
 
-def income_for_month(base_income: float, month: int) -> float:
-    """Ay 1: base, Ay2: base*0.95, Ay3: base*0.95^2 ..."""
-    month = int(month)
-    if month <= 1:
-        return float(base_income)
-    return float(base_income * ((1.0 - TAX_DROP_RATE) ** (month - 1)))
+def get_market() -> Market:
+    """Oturumun odasının paylaşılan piyasası."""
+    return get_room(st.session_state.room).market
 
+def banks_for_month(month: int):
+    return get_market().banks_for_month(month)
 
-# =========================
-# OYUN PARAMETRELERİ
-# =========================
-CFG = {
-    "MONTHS": 12,
-
-    # FGD
-    "PGL_MIN_STEP": 0.01,
-    "PGL_MAX_STEP": 0.05,
-    "PGL_FLOOR": 0.01,
-    "PGL_CAP": 0.05,
-
-    "LOAN_ACTIVE_FROM_MONTH": 4,
-
-    # Nakit hırsızlığı
-    "CASH_THEFT_PROB_STAGE1": 0.12,
-    "CASH_THEFT_PROB_STAGE2": 0.05,
-    "CASH_THEFT_SEV_MIN": 0.10,
-    "CASH_THEFT_SEV_MAX": 0.35,
-
-    # Küçük banka olayı
-    "BANK_INCIDENT_PROB": 0.02,
-
-    # ✅ Banka BATIŞI (oyuncu bazlı, para varsa batış olur)
-    "BANKRUPTCY_EXTRA_PROB_AFTER_MIN": 0.05,  # min 2 sonrası ek batış ihtimali
-    "BANKRUPTCY_MIN_EVENTS_PER_PLAYER": 2,    # ✅ KESİN: her oyuncu için en az 2 batış
-    "BANKRUPTCY_FORCE_START_MONTH": 5,        # 4. ayda mevduat yeni oluşuyor; 5'ten itibaren zorlamayı başlatmak daha mantıklı
-    "BANKRUPTCY_FORCE_END_MONTH": 11,         # 12'de kapatma yerine önceki aylarda tamamla
-
-    # Banka faiz/güvence
-    "TD_RATE_MIN": 0.0070,
-    "TD_RATE_MAX": 0.0140,
-    "GUAR_MIN": 0.70,
-    "GUAR_MAX": 0.99,
-
-    # Kredi
-    "LOAN_RATE_BASE": 0.018,
-    "LOAN_RATE_ADD": 0.030,
-    "LOAN_RATE_NOISE": 0.002,
-    "LOAN_MAX_MULT_INCOME": 3.0,
-
-    # Komisyon/ceza
-    "EARLY_BREAK_PENALTY": 0.01,
-    "TX_FEE": 0.005,
-
-    # Spread (arayüzde "Komisyon" diye göstereceğiz)
-    "SPREAD": {"fx": 0.010, "pm": 0.012, "eq": 0.020, "cr": 0.050},
-
-    # Riskli varlık getirileri
-    "EQ_MU": 0.015, "EQ_SIG": 0.060,
-    "CR_MU": 0.020, "CR_SIG": 0.120,
-    "PM_MU": 0.008, "PM_SIG": 0.030,
-    "FX_MU": 0.010, "FX_SIG": 0.040,
-
-    # Kriz
-    "CRISIS_MONTH": 6,
-    "CRISIS_EQ": -0.12,
-    "CRISIS_CR": -0.20,
-    "CRISIS_PM": +0.04,
-    "CRISIS_FX": +0.07,
-}
+def banks_df(month: int):
+    return views.banks_df(banks_for_month(month))
 
-ASSETS = {
-    "cash": "Nakit",
-    "dd": "Vadesiz Mevduat (Faiz Yok)",
-    "td": "Vadeli Mevduat (Faiz Var)",
-    "fx": "Döviz",
-    "pm": "Kıymetli Metal",
-    "eq": "Hisse Senedi",
-    "cr": "Kripto",
-}
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_wealth_quantiles(seed: int, cfg_key: str, _cfg: dict):
+    """Referans dağılım (seed, CFG özeti) başına bir kez hesaplanır; tüm oturumlar paylaşır."""
+    return wealth_quantiles(seed, _cfg)
 
-RISK_ASSETS = ["fx", "pm", "eq", "cr"]
-DEPOSIT_ASSETS = ["dd", "td"]
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_month_preview(key: tuple, cfg_key: str, _cfg: dict):
+    """Ay sonu Monte Carlo önizlemesi; aynı karar demeti tekrar hesaplanmaz."""
+    return montecarlo.simulate_month_end(key, _cfg)
 
-# =========================
-# YARDIMCI
-# =========================
-def fmt_tl(x: float) -> str:
-    return f"{x:,.0f} TL".replace(",", ".")
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_portfolio_risk(key: tuple, cfg_key: str, _cfg: dict):
+    """Bir aylık VaR/ES; anahtar portföy durumu + ay olduğundan yalnızca varlıklar değişince yeniden hesaplanır."""
+    return montecarlo.portfolio_risk(key, _cfg)
 
-def fmt_pct(x: float) -> str:
-    return f"{x*100:.1f}%"
+@st.cache_data(show_spinner=False, max_entries=512)
+def cached_benchmarks(name: str, seed: int, cfg_key: str, _market) -> dict:
+    """Hazır botların aynı ad ve odanın piyasasındaki son net serveti; oyuncu başına bir kez oynatılır."""
+    return {key: benchmark_wealth(name, _market, strategy) for key, strategy in STRATEGIES.items()}
 
-def can_borrow(month: int) -> bool:
-    return month >= int(CFG["LOAN_ACTIVE_FROM_MONTH"])
-
-def open_assets_by_month(month: int):
-    if month <= 3:
-        return ["cash"]
-    if month <= 5:
-        return ["cash", "dd", "td"]
-    if month <= 7:
-        return ["cash", "dd", "td", "fx", "pm"]
-    return ["cash", "dd", "td", "fx", "pm", "eq", "cr"]
-
-def stage_label(month: int):
-    if month <= 3: return "1-KurumYok"
-    if month <= 5: return "2-Banka"
-    if month <= 7: return "3-Korunma"
-    return "4-Piyasa"
-
-def rng_for_global(month: int):
-    return np.random.default_rng(st.session_state.seed + month * 999)
-
-def rng_for_player(name: str, month: int):
-    return np.random.default_rng((hash(name) % 10000) + month * 1000 + st.session_state.seed)
-
-def random_pgl_step(rng: np.random.Generator) -> float:
-    return float(rng.uniform(CFG["PGL_MIN_STEP"], CFG["PGL_MAX_STEP"]))
-
-def next_pgl(prev_pgl: float, rng: np.random.Generator):
-    step = random_pgl_step(rng)
-    sign = -1.0 if rng.random() < 0.5 else 1.0
-    signed_delta = float(sign * step)
-
-    new_pgl = float(prev_pgl + signed_delta)
-    new_pgl = float(np.clip(new_pgl, CFG["PGL_FLOOR"], CFG["PGL_CAP"]))
-    realized_delta = float(new_pgl - prev_pgl)
-    return new_pgl, realized_delta
-
-def bank_count_for_month(month: int) -> int:
-    if month < 4:
-        return 0
-    return min(2 + (month - 4), 8)
+BOT_LABELS = {"all_cash": "Hep nakit", "td_ladder": "Vadeli mevduat", "max_risk": "En riskli varlık",
+              "borrow_to_invest": "Borçla yatırım"}
 
-def banks_for_month(month: int):
-    n = bank_count_for_month(month)
-    if n == 0:
-        return []
-
-    if month in st.session_state.bank_state:
-        bmap = st.session_state.bank_state[month]
-        out = []
-        for i in range(n):
-            name = f"Banka {i+1}"
-            out.append({"Bank": name, **bmap[name]})
-        return out
-
-    r = rng_for_global(month)
-
-    td_min, td_max = float(CFG["TD_RATE_MIN"]), float(CFG["TD_RATE_MAX"])
-    gmin, gmax = float(CFG["GUAR_MIN"]), float(CFG["GUAR_MAX"])
-
-    TD_STEP = 0.0015
-    G_STEP  = 0.010
-    prev = st.session_state.bank_state.get(month - 1)
-
-    bmap_this = {}
-    for i in range(n):
-        bname = f"Banka {i+1}"
-
-        if prev and bname in prev:
-            td_prev = float(prev[bname]["TD_Rate"])
-            g_prev  = float(prev[bname]["Guarantee"])
-            td = td_prev + float(r.normal(0, TD_STEP))
-            guar = g_prev + float(r.normal(0, G_STEP))
-            td = float(np.clip(td, td_min, td_max))
-            guar = float(np.clip(guar, gmin, gmax))
-        else:
-            td = float(r.uniform(td_min, td_max))
-            x = (td - td_min) / max(td_max - td_min, 1e-9)
-            base_guar = gmax - x * (gmax - gmin)
-            guar = float(np.clip(base_guar + float(r.normal(0, 0.015)), gmin, gmax))
-
-        loan_rate = float(np.clip(
-            float(CFG["LOAN_RATE_BASE"]) + (1.0 - guar) * float(CFG["LOAN_RATE_ADD"]) + float(r.normal(0, float(CFG["LOAN_RATE_NOISE"]))),
-            0.010, 0.060
-        ))
-
-        bmap_this[bname] = {"TD_Rate": td, "Guarantee": guar, "Loan_Rate": loan_rate}
-
-    st.session_state.bank_state[month] = bmap_this
-
-    out = []
-    for i in range(n):
-        name = f"Banka {i+1}"
-        out.append({"Bank": name, **bmap_this[name]})
-    return out
-
-def banks_df(month: int) -> pd.DataFrame:
-    b = banks_for_month(month)
-    if not b:
-        return pd.DataFrame()
-    df = pd.DataFrame(b)
-    df["Vadeli Faiz (Aylık)"] = df["TD_Rate"].map(lambda x: f"{x*100:.2f}%")
-    df["Güvence Oranı"] = df["Guarantee"].map(lambda x: f"{x*100:.0f}%")
-    df["Kredi Faizi (Aylık)"] = df["Loan_Rate"].map(lambda x: f"{x*100:.2f}%")
-    return df.sort_values("TD_Rate", ascending=False)[["Bank", "Vadeli Faiz (Aylık)", "Güvence Oranı", "Kredi Faizi (Aylık)"]]
-
-def buy_cost_rate(asset_key: str) -> float:
-    fee = float(CFG["TX_FEE"])
-    spr = float(CFG["SPREAD"].get(asset_key, 0.0))
-    return fee + spr / 2.0
+RISK_LABELS = {"market": "Piyasa (döviz, metal, hisse, kripto)", "deposit": "Mevduat (banka batışı / olay)",
+               "theft": "Nakit hırsızlığı"}
 
-def sell_cost_rate(asset_key: str) -> float:
-    fee = float(CFG["TX_FEE"])
-    spr = float(CFG["SPREAD"].get(asset_key, 0.0))
-    return fee + spr / 2.0
+@st.cache_resource
+def get_bus() -> Bus:
+    """Süreçteki bütün oturumların paylaştığı olay yolu (sınıf duyuruları)."""
+    return Bus()
+
+@st.cache_resource
+def get_store() -> PlayerStore:
+    """Süreçteki bütün oturumların paylaştığı sürümlü oyuncu kayıtları ((oda, oyuncu, sahip) -> durum)."""
+    return PlayerStore()
 
-def dd_total(p: dict) -> float:
-    return float(sum(p.get("dd_accounts", {}).values()))
+@st.cache_resource(show_spinner=False)
+def start_metrics_endpoint(port: int):
+    """WFG_METRICS_PORT verildiyse süreç başına bir kez /metrics uç noktasını açar."""
+    return metrics.serve(port)
 
-def td_total(p: dict) -> float:
-    return float(sum(p.get("td_accounts", {}).values()))
+if os.environ.get("WFG_METRICS_PORT"):
+    start_metrics_endpoint(int(os.environ["WFG_METRICS_PORT"]))
 
-def other_investments_total(p: dict) -> float:
-    return float(sum(p["holdings"].get(k, 0.0) for k in RISK_ASSETS))
+LOG_PAGE_SIZE = 6
 
-def total_investments(p: dict) -> float:
-    return float(dd_total(p) + td_total(p) + other_investments_total(p))
+@st.cache_data(show_spinner=False, max_entries=2048)
+def cached_log_blocks(items: tuple):
+    """Log satırı bir kez biçimlenir; kapanmış ayların satırları değişmez."""
+    return views.log_row_blocks(items)
 
 def safe_number_input(label: str, key: str, maxv: float, step: float = 1000.0) -> float:
     maxv = float(max(0.0, maxv))
@@ -246,150 +118,236 @@ def safe_number_input(label: str, key: str, maxv: float, step: float = 1000.0) -
     val = min(max(prev, 0.0), maxv)
     return st.number_input(label, min_value=0.0, max_value=maxv, value=val, step=step, key=key)
 
-# =========================
-# BANKA BATIŞI: OYUNCU BAZLI SEÇİM (PARASI OLAN BANKA)
-# =========================
-def choose_bankruptcy_for_player_month(p: dict, month: int, bank_map_local: dict, rng: np.random.Generator):
-    """
-    Her oyuncu için en az 2 batış:
-    - Batış sadece oyuncunun o ay mevduatı bulunan bankalardan seçilir (dd/td > 0).
-    - Min 2 batış tamamlanana kadar uygun aylarda zorlanır.
-    - Min 2 sonrası küçük bir olasılıkla ek batış olabilir.
-    """
-    month = int(month)
-    if month < 4 or not bank_map_local:
-        return set()
-
-    # aday bankalar: oyuncunun mevduatı olan bankalar
-    candidates = []
-    for bank in bank_map_local.keys():
-        dd = float(p.get("dd_accounts", {}).get(bank, 0.0))
-        td = float(p.get("td_accounts", {}).get(bank, 0.0))
-        tot = dd + td
-        if tot > 0:
-            candidates.append((bank, tot))
-
-    if not candidates:
-        return set()
-
-    seen = int(p.get("bankruptcies_seen", 0))
-    must = int(CFG["BANKRUPTCY_MIN_EVENTS_PER_PLAYER"])
-
-    force_window = (int(CFG["BANKRUPTCY_FORCE_START_MONTH"]) <= month <= int(CFG["BANKRUPTCY_FORCE_END_MONTH"]))
-    need_force = (seen < must) and force_window
-
-    do_extra = (seen >= must) and (rng.random() < float(CFG["BANKRUPTCY_EXTRA_PROB_AFTER_MIN"]))
-
-    if not need_force and not do_extra:
-        return set()
-
-    # aynı bankayı tekrar tekrar batırmayı engelle (eğitsel olarak daha iyi)
-    history = set(p.get("bankrupt_banks_history", []))
-    fresh = [(b, w) for (b, w) in candidates if b not in history]
-    pool = fresh if fresh else candidates  # hepsi zaten batmışsa, yine de birini seç
-
-    banks = [x[0] for x in pool]
-    weights = np.array([x[1] for x in pool], dtype=float)
-    weights = weights / max(weights.sum(), 1e-9)
-
-    chosen = str(rng.choice(banks, p=weights))
-    return {chosen}
-
-# =========================
-# 1 AYLIK BORÇ MODELİ
-# =========================
-def loan_due_amount(p: dict, current_month: int) -> float:
-    total = 0.0
-    for ln in p.get("loans", []):
-        if int(ln["due_month"]) == int(current_month):
-            total += float(ln["principal"]) * (1.0 + float(ln["rate"]))
-    return float(total)
-
-def loan_outstanding_principal(p: dict) -> float:
-    return float(sum(float(ln["principal"]) for ln in p.get("loans", [])))
-
-def remove_due_loans(p: dict, current_month: int):
-    p["loans"] = [ln for ln in p.get("loans", []) if int(ln["due_month"]) != int(current_month)]
-
-def total_debt_display(p: dict, current_month: int) -> float:
-    due = loan_due_amount(p, current_month)
-    future_principal = float(sum(float(ln["principal"]) for ln in p.get("loans", []) if int(ln["due_month"]) > int(current_month)))
-    return float(due + future_principal)
-
-def net_wealth(p: dict) -> float:
-    return float(p["holdings"]["cash"] + total_investments(p) - float(loan_outstanding_principal(p)))
-
 # =========================
 # SESSION STATE
 # =========================
-if "seed" not in st.session_state:
-    st.session_state.seed = 20260209
 if "players" not in st.session_state:
-    st.session_state.players = {}
-if "theft_popup" not in st.session_state:
-    st.session_state.theft_popup = None
-if "pgl_popup" not in st.session_state:
-    st.session_state.pgl_popup = None
-if "loan_popup" not in st.session_state:
-    st.session_state.loan_popup = None
-if "bank_state" not in st.session_state:
-    st.session_state.bank_state = {}
-if "bankruptcy_queue" not in st.session_state:
-    st.session_state.bankruptcy_queue = []  # list of dict pop-up queue
-
-def get_player(name: str) -> dict:
-    if name not in st.session_state.players:
-        theft_rng = np.random.default_rng((hash(name) % 10000) + st.session_state.seed)
-        theft_months = sorted(
-            theft_rng.choice(np.arange(1, CFG["MONTHS"] + 1), size=3, replace=False).tolist()
-        )
-
-        pgl0 = float(np.random.default_rng((hash(name) % 10000) + st.session_state.seed + 777).uniform(
-            CFG["PGL_FLOOR"], CFG["PGL_CAP"]
-        ))
-
-        st.session_state.players[name] = {
-            "month": 1,
-            "finished": False,
-            "defaulted": False,
-
-            "loans": [],
-            "loan_bank": None,
+    st.session_state.players = {}  # oyuncu -> bu oturumun çalışma kopyası (paylaşılan kayıt: get_store())
+if "player_versions" not in st.session_state:
+    st.session_state.player_versions = {}  # oyuncu -> çalışma kopyasının okunduğu sürüm
+if "room" not in st.session_state or st.session_state.room not in ROOMS:
+    st.session_state.room = next(iter(ROOMS))
+
+# oda: seed ve senaryo odadan gelir (CFG adı bu betikte odanın CFG'sine bağlanır)
+_room = get_room(st.session_state.room)
+SCN = _room.scenario
+CFG = _room.cfg
+# aşama sınırlarına göre metinler ("Ay 1–3" gibi); ufuk ve aşamalar senaryodan gelir
+BANKLESS = f"{SCN.unit} 1–{int(CFG['BANK_STAGE_FROM']) - 1}"
+NO_LOAN = f"{SCN.unit} 1–{int(CFG['LOAN_ACTIVE_FROM_MONTH']) - 1}"
+STEP = SCN.unit.lower()  # cümle içinde: "bu ay" / "bu hafta"
+
+def plural(word: str) -> str:
+    """Türkçe çoğul eki (büyük ünlü uyumu): Ay -> Aylar, Hafta -> Haftalar, Gün -> Günler."""
+    vowels = [c for c in word.lower() if c in "aıoueiöü"]
+    return word + ("ler" if vowels and vowels[-1] in "eiöü" else "lar")
+
+UNITS = plural(SCN.unit)  # başlıkta: "Aylar" / "Haftalar"
+st.session_state.seed = _room.seed
+
+if "notices" not in st.session_state:
+    st.session_state.notices = []  # ayın olayları, oluş sırasıyla (settle_month olayları)
+if "bus_id" not in st.session_state:
+    st.session_state.bus_id = uuid.uuid4().hex
+# kayıt sahibi: aynı adı seçen iki öğrenci ayrı oyun alır. Belirteç URL'de (?owner=) durur; sayfa yenilense
+# ya da aynı bağlantı başka sekmede açılsa da aynı kayıt sürer
+if "owner" not in st.session_state:
+    _owner = st.query_params.get("owner", "")
+    st.session_state.owner = _owner if re.fullmatch(r"[0-9a-f]{32}", _owner) else uuid.uuid4().hex
+if st.query_params.get("owner") != st.session_state.owner:
+    st.query_params["owner"] = st.session_state.owner
+if "class_notices" not in st.session_state:
+    st.session_state.class_notices = []
+
+# sınıf duyuruları: yalnızca bu oturumun kuyruğu boşaltılır
+CLASS_NOTICE_KEEP = 5
+INSTRUCTOR_KEY = os.environ.get("WFG_INSTRUCTOR_KEY")
+_topic = class_topic(st.session_state.room)
+get_bus().subscribe(_topic, st.session_state.bus_id)
+for _ev in get_bus().drain(_topic, st.session_state.bus_id):
+    st.session_state.class_notices = ([_ev] + st.session_state.class_notices)[:CLASS_NOTICE_KEEP]
+    st.toast(f"📢 {_ev['message']}")
+
+# Ay bazlı widget anahtarları: f"{kök}{oyuncu}_{ay}"
+MONTH_KEY_STEMS = (
+    [f"buy_{k}_" for k in ASSETS if k != "cash"]
+    + [f"sell_{k}_" for k in ASSETS if k != "cash"]
+    + ["borrow_", "repay_", "sel_dd_", "sel_td_", "sel_loan_", "dd_with_bank_", "td_break_bank_", "ticket_"]
+    + ["close_notices_", "close_notices_fallback_"]
+)
+POPUP_KEYS = ("notices",)
+
+def _month_key_re(name: str):
+    stems = "|".join(re.escape(s) for s in MONTH_KEY_STEMS)
+    return re.compile(rf"^(?:{stems}){re.escape(name)}_(\d+)(?:_Banka \d+)?$")
+
+def prune_month_keys(name: str, current_month: int) -> int:
+    """Oyuncunun geçmiş aylarına ait widget anahtarlarını ve eski pop-up kayıtlarını siler. Silinen anahtar sayısı."""
+    rx = _month_key_re(name)
+    dead = []
+    for k in list(st.session_state.keys()):
+        m = rx.match(k) if isinstance(k, str) else None
+        if m and int(m.group(1)) < current_month:
+            dead.append(k)
+    for k in dead:
+        del st.session_state[k]
+    # bildirimler: aynı oyuncunun bir önceki aydan eski (gösterilmemiş) kayıtları
+    st.session_state.notices = [
+        n for n in st.session_state.notices
+        if n.get("player") != name or int(n.get("month", n.get("from_month", 0))) >= current_month - 1
+    ]
+    return len(dead)
+
+def _approx_bytes(v) -> int:
+    try:
+        return len(pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
 
-            "holdings": {"cash": 0.0, "fx": 0.0, "pm": 0.0, "eq": 0.0, "cr": 0.0},
-            "dd_accounts": {},
-            "td_accounts": {},
+def session_memory_report() -> list:
+    """Oturum durumunu kategorilere ayırır: anahtar sayısı ve yaklaşık bayt (pickle boyutu)."""
+    rxs = [_month_key_re(n) for n in st.session_state.get("players", {})]
+    cats = {}
+    for k in list(st.session_state.keys()):
+        v = st.session_state[k]
+        if k == "players":
+            cat = "Oyuncular"
+        elif k in POPUP_KEYS:
+            cat = "Pop-up / kuyruk"
+        elif isinstance(k, str) and any(rx.match(k) for rx in rxs):
+            cat = "Widget (ay bazlı)"
+        else:
+            cat = "Diğer"
+        c = cats.setdefault(cat, {"Kategori": cat, "Anahtar": 0, "Bayt": 0})
+        c["Anahtar"] += 1
+        c["Bayt"] += _approx_bytes(v)
+    return sorted(cats.values(), key=lambda r: -r["Bayt"])
 
-            "income_base": float(DEFAULT_MONTHLY_INCOME),
+def player_key(name: str) -> tuple:
+    return (st.session_state.room, name, st.session_state.owner)
 
-            "fixed_current": float(START_FIXED_COST),
-            "extra_current": float(START_EXTRA_COST),
-            "pgl_current": float(pgl0),
+def get_player(name: str) -> dict:
+    """Oturumun çalışma kopyası; paylaşılan kayıt başka sekmede değiştiyse güncel sürüm yeniden okunur."""
+    store, key = get_store(), player_key(name)
+    if not store.exists(key):
+        # sıfırlanmış kayıt bu oturumdaki eski kopyadan geri getirilmez: yeni oyun başlar
+        version = store.version(key)
+        p = (st.session_state.players.get(name) if version == 0 else None) or new_player(name, st.session_state.seed, CFG)
+        try:
+            store.commit(key, version, p)
+        except VersionConflict:
+            pass  # başka sekme aynı anda oluşturdu: aşağıda onun kaydı okunur
+    if st.session_state.player_versions.get(name) != store.version(key):
+        if name in st.session_state.player_versions:
+            st.session_state.conflict_note = "Bu oyuncu başka bir sekmede güncellendi; güncel durum yüklendi."
+        version, p = store.checkout(key)
+        st.session_state.players[name] = p
+        st.session_state.player_versions[name] = version
+    return st.session_state.players[name]
 
-            "last_dd_bank": None,
-            "last_td_bank": None,
+# sekmeye özgü seçimler: yazarken güncel duruma bu sekmedeki değerleri taşınır
+TAB_FIELDS = ("last_dd_bank", "last_td_bank", "loan_bank", "standing_orders")
 
-            "theft_months": theft_months,
-            "log": [],
+def commit_player(name: str, month: int, apply):
+    """
+    apply(p)'yi paylaşılan kaydın güncel kopyasına uygular ve CAS ile yazar (çakışmada yeniden dener).
+    Ay başka bir sekmede kapatılmışsa ya da kayıt sıfırlanmışsa ValueError; hiçbir şey yazılmaz.
+    apply'ın sonucunu döndürür.
+    """
+    mine = st.session_state.players[name]
+
+    def run(p: dict):
+        if int(p["month"]) != int(month) or p["finished"]:
+            raise ValueError(f"{SCN.unit} {month} başka bir sekmede zaten tamamlandı; güncel durum yüklendi.")
+        for k in TAB_FIELDS:
+            if k in mine:
+                p[k] = copy.deepcopy(mine[k])
+        return apply(p)
+
+    try:
+        version, p, result = transact(get_store(), player_key(name), run)
+    except (ValueError, KeyError, VersionConflict) as e:
+        st.session_state.player_versions.pop(name, None)  # sonraki çalıştırmada güncel kayıt okunur
+        if isinstance(e, ValueError):
+            raise
+        raise ValueError("Oyuncu kaydı başka bir sekmede değişti; güncel durum yüklendi.") from None
+    st.session_state.players[name] = p
+    st.session_state.player_versions[name] = version
+    return result
 
-            # ✅ batış takibi (oyuncu bazlı)
-            "bankruptcies_seen": 0,
-            "bankrupt_banks_history": [],  # list of bank names (en az bir kez batmış)
-        }
-    return st.session_state.players[name]
+# =========================
+# KAYIT KODU (OYUNU DIŞA AKTAR / GERİ YÜKLE)
+# =========================
+def restore_game(blob: bytes) -> str:
+    name, p, seed = decode_save_code(blob)
+    if int(seed) != int(st.session_state.seed):
+        rooms = [r for r, spec in ROOMS.items() if int(spec["seed"]) == int(seed)]
+        if not rooms:
+            raise ValueError(f"Bu kayıt hiçbir odaya ait değil (seed {seed}).")
+        # oda değişince diğer oyuncuların banka/risk yolları geçersiz olur
+        st.session_state.room = rooms[0]
+        st.session_state.players = {}
+        st.session_state.player_versions = {}
+    # kayıttan yükleme bilinçli bir üzerine yazmadır: sürüm koşulsuz ilerler
+    st.session_state.player_versions[name] = get_store().put(player_key(name), p)
+    st.session_state.players[name] = p
+    return name
 
 # =========================
 # SIDEBAR
 # =========================
 with st.sidebar:
+    if len(ROOMS) > 1:
+        # anahtarsız: kayıt yükleme aynı çalıştırmada st.session_state.room'u değiştirebilsin
+        room_names = list(ROOMS)
+        picked = st.selectbox("🏫 Oda (şube)", room_names, index=room_names.index(st.session_state.room))
+        if picked != st.session_state.room:
+            st.session_state.room = picked
+            st.session_state.players = {}
+            st.session_state.player_versions = {}
+            st.session_state.notices = []
+            st.rerun()
     st.header("ℹ️ Oyun Bilgisi")
     st.write(
-        "- **Gelir**, 2. aydan itibaren vergi dilimi etkisiyle her ay **%5 azalır**.\n"
-        "- **Fiyatlar Genel Düzeyi** her ay değişir; sabit gider ve ek harcama bir sonraki ay etkilenir.\n"
-        "- **4. aydan itibaren** bankalar devreye girer.\n"
+        f"- **Gelir**, {SCN.unit} 2+ vergi dilimi etkisiyle her {STEP} **%{TAX_DROP_RATE * 100:.0f} azalır** "
+        f"(en fazla {int(CFG['TAX_DROP_STEPS'])} kez).\n"
+        f"- **Fiyatlar Genel Düzeyi** her {STEP} değişir; sabit gider ve ek harcama bir sonraki {STEP} etkilenir.\n"
+        f"- **{SCN.unit} {int(CFG['BANK_STAGE_FROM'])}+** bankalar devreye girer.\n"
            )
+    if _room.stress_label:
+        st.info(f"📉 Tarihsel stres senaryosu: **{_room.stress_label}** — piyasa getirileri ve FGD "
+                "gerçek bir dönemden oynatılır.")
+    st.divider()
+    with st.expander("💾 Kayıttan Devam Et"):
+        code_in = st.text_area("Kayıt kodu", key="restore_code_input", height=80)
+        file_in = st.file_uploader("veya kayıt dosyası (.wfg)", type=["wfg"], key="restore_file_input")
+        if st.button("📂 Yükle", use_container_width=True):
+            try:
+                blob = file_in.getvalue() if file_in is not None else save_code_bytes(code_in)
+                restored = restore_game(blob)
+            except ValueError as e:
+                st.error(f"Kayıt yüklenemedi: {e}")
+            else:
+                st.session_state.player_name = restored
+                st.rerun()
+    if st.session_state.class_notices:
+        st.divider()
+        st.subheader("📢 Sınıf Duyuruları")
+        for ev in st.session_state.class_notices:
+            icon = "🚨" if ev.get("kind") == "crisis" else "📢"
+            st.caption(f"{icon} {time.strftime('%H:%M', time.localtime(ev['ts']))} — {ev['message']}")
+    if INSTRUCTOR_KEY:
+        with st.expander("🎓 Eğitmen"):
+            if st.text_input("Eğitmen anahtarı", type="password", key="instructor_key_input") == INSTRUCTOR_KEY:
+                msg = st.text_area("Duyuru", key="broadcast_text", height=80)
+                crisis = st.checkbox("Sistemik kriz duyurusu", key="broadcast_crisis")
+                if st.button("📢 Sınıfa Yayınla", use_container_width=True) and msg.strip():
+                    n = get_bus().publish(_topic, {"kind": "crisis" if crisis else "info", "message": msg.strip()})
+                    st.success(f"{n} oturuma gönderildi.")
     st.divider()
     if st.button("🧹 Oyunu Sıfırla"):
+        for n in st.session_state.players:
+            get_store().delete(player_key(n))
         st.session_state.clear()
         st.rerun()
 
@@ -399,87 +357,28 @@ st.title("🎮 1. Hafta Oyunu: Neden Finansal Piyasalar ve Kurumlarla İlgileniy
 # POP-UP RENDER (Modal)
 # =========================
 def _overlay_style():
-    st.markdown(
-        """
-        <style>
-        .ovl {
-            position: fixed; top: 0; left: 0;
-            width: 100vw; height: 100vh;
-            background: rgba(0,0,0,0.35);
-            z-index: 9999;
-            display: flex; align-items: center; justify-content: center;
-            padding: 18px;
-        }
-        .card {
-            background: #ffffff;
-            border-radius: 18px;
-            padding: 18px;
-            max-width: 620px;
-            width: 100%;
-            box-shadow: 0 18px 60px rgba(0,0,0,0.20);
-            border: 2px solid rgba(0,0,0,0.06);
-        }
-        .titleRed { font-size: 22px; font-weight: 900; color:#b30000; margin-bottom: 6px; }
-        .titleBlue { font-size: 22px; font-weight: 900; color:#0b4aa2; margin-bottom: 6px; }
-        .titleOrange { font-size: 22px; font-weight: 900; color:#9a4b00; margin-bottom: 6px; }
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
-
-def render_theft_modal():
-    pop = st.session_state.get("theft_popup")
-    if not pop:
-        return
+    st.markdown(views.OVERLAY_CSS, unsafe_allow_html=True)
+
+def _notice_theft(pop: dict) -> dict:
     loss = float(pop.get("loss", 0.0))
     remain = float(pop.get("remain", 0.0))
-    m = int(pop.get("month", 0))
-    player = str(pop.get("player", ""))
-
-    if hasattr(st, "dialog"):
-        @st.dialog("🚨 NAKİT HIRSIZLIĞI!")
-        def _dlg():
-            st.markdown(
-                f"""
-                **Oyuncu:** {player}  
-                **Ay:** {m}
-
-                **Kayıp:** :red[**{fmt_tl(loss)}**]  
-                **Kalan Nakit:** **{fmt_tl(remain)}**
-
-                Bu risk yalnızca **nakitte** geçerlidir.
-                """
-            )
-            if st.button("Kapat ✖", use_container_width=True, key=f"close_theft_{player}_{m}"):
-                st.session_state.theft_popup = None
-                st.rerun()
-        _dlg()
-    else:
-        _overlay_style()
-        st.markdown(
-            f"""
-            <div class="ovl">
-              <div class="card" style="border:4px solid #b30000;background:#fff5f5;">
-                <div class="titleRed">🚨 NAKİT HIRSIZLIĞI! 🚨</div>
-                <div><b>Oyuncu:</b> {player} &nbsp; | &nbsp; <b>Ay:</b> {m}</div>
-                <div style="margin-top:10px;"><b>Kayıp:</b> <span style="color:#b30000;font-weight:900;">{fmt_tl(loss)}</span></div>
-                <div><b>Kalan Nakit:</b> <b>{fmt_tl(remain)}</b></div>
-                <div style="margin-top:10px;">Bu risk yalnızca <b>nakitte</b> geçerlidir.</div>
-              </div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-        if st.button("Kapat ✖", use_container_width=True, key=f"close_theft_fallback_{player}_{m}"):
-            st.session_state.theft_popup = None
-            st.rerun()
-
-def render_pgl_modal():
-    pop = st.session_state.get("pgl_popup")
-    if not pop:
-        return
-
-    player = str(pop.get("player", ""))
+    return {
+        "title": "🚨 NAKİT HIRSIZLIĞI!",
+        "cls": "titleRed", "border": "#b30000", "bg": "#fff5f5",
+        "md": f"""
+**Kayıp:** :red[**{fmt_tl(loss)}**]  
+**Kalan Nakit:** **{fmt_tl(remain)}**
+
+Bu risk yalnızca **nakitte** geçerlidir.
+""",
+        "html": f"""
+<div style="margin-top:10px;"><b>Kayıp:</b> <span style="color:#b30000;font-weight:900;">{fmt_tl(loss)}</span></div>
+<div><b>Kalan Nakit:</b> <b>{fmt_tl(remain)}</b></div>
+<div style="margin-top:10px;">Bu risk yalnızca <b>nakitte</b> geçerlidir.</div>
+""",
+    }
+
+def _notice_pgl(pop: dict) -> dict:
     from_month = int(pop.get("from_month", 0))
     to_month = int(pop.get("to_month", 0))
     pgl_prev = float(pop.get("pgl_prev", 0.0))
@@ -491,196 +390,241 @@ def render_pgl_modal():
     extra_new = float(pop.get("extra_new", 0.0))
 
     if step_used > 0:
-        msg = "Bu ay **artış (+)** oldu → bir sonraki ay giderler **arttı**."
+        msg = f"Bu {STEP} **artış (+)** oldu → bir sonraki {STEP} giderler **arttı**."
         arrow = "⬆️"
     elif step_used < 0:
-        msg = "Bu ay **azalış (−)** oldu → bir sonraki ay giderler **azaldı**."
+        msg = f"Bu {STEP} **azalış (−)** oldu → bir sonraki {STEP} giderler **azaldı**."
         arrow = "⬇️"
     else:
-        msg = "Band sınırına çarptığı için bu ay değişim **0** gerçekleşti."
+        msg = f"Band sınırına çarptığı için bu {STEP} değişim **0** gerçekleşti."
         arrow = "➡️"
     step_text = f"{arrow} {fmt_pct(abs(step_used))}"
 
-    if hasattr(st, "dialog"):
-        @st.dialog("📌 FGD Güncellendi")
-        def _dlg():
-            st.markdown(
-                f"""
-                **Oyuncu:** {player}  
-                **Geçiş:** Ay {from_month} → Ay {to_month}
-
-                **FGD:** {fmt_pct(pgl_prev)} → **{fmt_pct(pgl_new)}**  
-                **Bu Ay Değişim:** **{step_text}**
-
-                **Sabit Gider:** {fmt_tl(fixed_prev)} → **{fmt_tl(fixed_new)}**  
-                **Ek Harcama:** {fmt_tl(extra_prev)} → **{fmt_tl(extra_new)}**
-
-                {msg}
-                """
-            )
-            if st.button("Kapat ✖", use_container_width=True, key=f"close_pgl_{player}_{to_month}"):
-                st.session_state.pgl_popup = None
-                st.rerun()
-        _dlg()
-    else:
-        _overlay_style()
-        st.markdown(
-            f"""
-            <div class="ovl">
-              <div class="card" style="border:4px solid #0b4aa2;background:#f3f8ff;">
-                <div class="titleBlue">📌 FGD Güncellendi</div>
-                <div><b>Oyuncu:</b> {player} &nbsp; | &nbsp; <b>Geçiş:</b> Ay {from_month} → Ay {to_month}</div>
-                <div style="margin-top:10px;"><b>FGD:</b> {fmt_pct(pgl_prev)} → <b>{fmt_pct(pgl_new)}</b></div>
-                <div><b>Bu Ay Değişim:</b> <b>{step_text}</b></div>
-                <div style="margin-top:10px;"><b>Sabit Gider:</b> {fmt_tl(fixed_prev)} → <b>{fmt_tl(fixed_new)}</b></div>
-                <div><b>Ek Harcama:</b> {fmt_tl(extra_prev)} → <b>{fmt_tl(extra_new)}</b></div>
-                <div style="margin-top:10px;">{msg}</div>
-              </div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-        if st.button("Kapat ✖", use_container_width=True, key=f"close_pgl_fallback_{player}_{to_month}"):
-            st.session_state.pgl_popup = None
-            st.rerun()
-
-def render_loan_modal():
-    pop = st.session_state.get("loan_popup")
-    if not pop:
-        return
-    player = str(pop.get("player", ""))
-    m = int(pop.get("month", 0))
+    return {
+        "title": "📌 FGD Güncellendi",
+        "cls": "titleBlue", "border": "#0b4aa2", "bg": "#f3f8ff",
+        "md": f"""
+**Geçiş:** {SCN.unit} {from_month} → {SCN.unit} {to_month}
+
+**FGD:** {fmt_pct(pgl_prev)} → **{fmt_pct(pgl_new)}**  
+**Bu {SCN.unit} Değişim:** **{step_text}**
+
+**Sabit Gider:** {fmt_tl(fixed_prev)} → **{fmt_tl(fixed_new)}**  
+**Ek Harcama:** {fmt_tl(extra_prev)} → **{fmt_tl(extra_new)}**
+
+{msg}
+""",
+        "html": f"""
+<div><b>Geçiş:</b> {SCN.unit} {from_month} → {SCN.unit} {to_month}</div>
+<div style="margin-top:10px;"><b>FGD:</b> {fmt_pct(pgl_prev)} → <b>{fmt_pct(pgl_new)}</b></div>
+<div><b>Bu {SCN.unit} Değişim:</b> <b>{step_text}</b></div>
+<div style="margin-top:10px;"><b>Sabit Gider:</b> {fmt_tl(fixed_prev)} → <b>{fmt_tl(fixed_new)}</b></div>
+<div><b>Ek Harcama:</b> {fmt_tl(extra_prev)} → <b>{fmt_tl(extra_new)}</b></div>
+<div style="margin-top:10px;">{msg}</div>
+""",
+    }
+
+def _notice_loan(pop: dict) -> dict:
     principal = float(pop.get("principal", 0.0))
     rate = float(pop.get("rate", 0.0))
     due = float(pop.get("due", 0.0))
-
-    msg = "Borcunuzu, bir sonraki ay ana para + faizi ile birlikte ödemek zorundasınız!"
-
-    if hasattr(st, "dialog"):
-        @st.dialog("⚠️ Borç Uyarısı")
-        def _dlg():
-            st.markdown(
-                f"""
-                **Oyuncu:** {player}  
-                **Alındığı ay:** {m}
-
-                **Anapara:** **{fmt_tl(principal)}**  
-                **Faiz (1 ay):** **{rate*100:.2f}%**  
-                **Gelecek ay ödenecek:** **{fmt_tl(due)}**
-
-                **{msg}**
-                """
-            )
-            if st.button("Kapat ✖", use_container_width=True, key=f"close_loan_{player}_{m}"):
-                st.session_state.loan_popup = None
-                st.rerun()
-        _dlg()
-    else:
-        _overlay_style()
-        st.markdown(
-            f"""
-            <div class="ovl">
-              <div class="card" style="border:4px solid #9a4b00;background:#fff7ee;">
-                <div class="titleOrange">⚠️ Borç Uyarısı</div>
-                <div><b>Oyuncu:</b> {player} &nbsp; | &nbsp; <b>Ay:</b> {m}</div>
-                <div style="margin-top:10px;"><b>Anapara:</b> <b>{fmt_tl(principal)}</b></div>
-                <div><b>Faiz:</b> <b>{rate*100:.2f}%</b></div>
-                <div><b>Gelecek ay ödenecek:</b> <b>{fmt_tl(due)}</b></div>
-                <div style="margin-top:10px;font-weight:900;">{msg}</div>
-              </div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-        if st.button("Kapat ✖", use_container_width=True, key=f"close_loan_fallback_{player}_{m}"):
-            st.session_state.loan_popup = None
-            st.rerun()
-
-def render_bankruptcy_modal_queue():
-    if not st.session_state.bankruptcy_queue:
-        return
-
-    pop = st.session_state.bankruptcy_queue[0]
-
-    player = str(pop.get("player", ""))
-    m = int(pop.get("month", 0))
+    msg = f"Borcunuzu, bir sonraki {STEP} ana para + faizi ile birlikte ödemek zorundasınız!"
+    return {
+        "title": "⚠️ Borç Uyarısı",
+        "cls": "titleOrange", "border": "#9a4b00", "bg": "#fff7ee",
+        "md": f"""
+**Anapara:** **{fmt_tl(principal)}**  
+**Faiz (1 {STEP}):** **{rate*100:.2f}%**  
+**Gelecek {STEP} ödenecek:** **{fmt_tl(due)}**
+
+**{msg}**
+""",
+        "html": f"""
+<div style="margin-top:10px;"><b>Anapara:</b> <b>{fmt_tl(principal)}</b></div>
+<div><b>Faiz:</b> <b>{rate*100:.2f}%</b></div>
+<div><b>Gelecek {STEP} ödenecek:</b> <b>{fmt_tl(due)}</b></div>
+<div style="margin-top:10px;font-weight:900;">{msg}</div>
+""",
+    }
+
+def _notice_bankruptcy(pop: dict) -> dict:
     bank = str(pop.get("bank", ""))
     guar = float(pop.get("guarantee", 0.0))
-
     dd_before = float(pop.get("dd_before", 0.0))
     td_before = float(pop.get("td_before", 0.0))
     total_before = dd_before + td_before
-
     loss = float(pop.get("loss", 0.0))
     remain = float(pop.get("remain", 0.0))
 
     msg = f"Bu bankada yalnızca **%{guar*100:.0f}** oranı korunur. Kalan kısım **batar**."
+    if pop.get("contagion"):
+        msg = f"🔗 Bu banka, alacaklı olduğu başka bir bankanın batışıyla **zincirleme** battı. {msg}"
+
+    return {
+        "title": f"🏦💥 BANKA BATIŞI: {bank}",
+        "cls": "titleBlue", "border": "#7a1fa2", "bg": "#fbf5ff",
+        "md": f"""
+**Güvence Oranı:** **%{guar*100:.0f}**
+
+**Batış Öncesi Toplam Mevduat:** **{fmt_tl(total_before)}**  
+- Vadesiz: {fmt_tl(dd_before)}
+- Vadeli: {fmt_tl(td_before)}
+
+**Kayıp (Güvence Dışı):** :red[**{fmt_tl(loss)}**]  
+**Kalan (Güvenceli):** **{fmt_tl(remain)}**
+
+{msg}
+""",
+        "html": f"""
+<div style="margin-top:10px;"><b>Güvence Oranı:</b> <b>%{guar*100:.0f}</b></div>
+<div><b>Batış Öncesi Toplam:</b> <b>{fmt_tl(total_before)}</b> (DD {fmt_tl(dd_before)} + TD {fmt_tl(td_before)})</div>
+<div style="margin-top:10px;"><b>Kayıp (Güvence Dışı):</b> <span style="color:#b30000;font-weight:900;">{fmt_tl(loss)}</span></div>
+<div><b>Kalan (Güvenceli):</b> <b>{fmt_tl(remain)}</b></div>
+<div style="margin-top:10px;">{msg}</div>
+""",
+    }
+
+AUTOPILOT_STOP_TEXT = {
+    None: f"İstenen {STEP} sayısı tamamlandı.",
+    "finished": "Oyun bitti.",
+    "bankruptcy": "Banka batışı oldu — kararlarınızı gözden geçirin.",
+    "default": "Temerrüt!",
+}
 
-    if hasattr(st, "dialog"):
-        @st.dialog("🏦💥 BANKA BATIŞI!")
-        def _dlg():
-            st.markdown(
-                f"""
-                **Oyuncu:** {player}  
-                **Ay:** {m}  
-                **Banka:** **{bank}**
+def _notice_autopilot(pop: dict) -> dict:
+    first, last = int(pop.get("month", 0)), int(pop.get("last_month", 0))
+    reason = pop.get("reason")
+    why = AUTOPILOT_STOP_TEXT.get(reason, f"Talimat uygulanamadı: {reason}")
+    done = f"{SCN.unit} {first} → {SCN.unit} {last}" if last >= first else f"Hiçbir {STEP} kapatılmadı"
+    return {
+        "title": "🤖 Otomatik Pilot",
+        "cls": "titleBlue", "border": "#0b4aa2", "bg": "#f3f8ff",
+        "md": f"""
+**Kapatılan {UNITS.lower()}:** {done}  
+**Durma nedeni:** {why}
+""",
+        "html": f"""
+<div><b>Kapatılan {UNITS.lower()}:</b> {done}</div>
+<div><b>Durma nedeni:</b> {why}</div>
+""",
+    }
+
+def _notice_default(pop: dict) -> dict:
+    msg = str(pop.get("message", "⛔ TEMERRÜT!"))
+    return {
+        "title": "⛔ TEMERRÜT",
+        "cls": "titleRed", "border": "#b30000", "bg": "#fff5f5",
+        "md": f"""
+:red[**{msg}**]
+
+Oyun bu {STEP} sona erdi; sonuçlar aşağıda.
+""",
+        "html": f"""
+<div style="margin-top:10px;color:#b30000;font-weight:900;">{msg}</div>
+<div style="margin-top:10px;">Oyun bu {STEP} sona erdi; sonuçlar aşağıda.</div>
+""",
+    }
+
+NOTICE_BLOCKS = {
+    "autopilot": _notice_autopilot,
+    "default": _notice_default,
+    "loan": _notice_loan,
+    "theft": _notice_theft,
+    "bankruptcy": _notice_bankruptcy,
+    "pgl": _notice_pgl,
+}
 
-                **Güvence Oranı:** **%{guar*100:.0f}**
+def dismiss_notices():
+    st.session_state.notices = []
 
-                **Batış Öncesi Toplam Mevduat:** **{fmt_tl(total_before)}**  
-                - Vadesiz: {fmt_tl(dd_before)}  
-                - Vadeli: {fmt_tl(td_before)}
+# eski sürümlerde st.dialog on_dismiss almaz; o durumda yalnızca düğmeyle kapanır
+_DIALOG_KWARGS = {"width": "large"}
+if hasattr(st, "dialog") and "on_dismiss" in inspect.signature(st.dialog).parameters:
+    _DIALOG_KWARGS["on_dismiss"] = dismiss_notices
 
-                **Kayıp (Güvence Dışı):** :red[**{fmt_tl(loss)}**]  
-                **Kalan (Güvenceli):** **{fmt_tl(remain)}**
+def render_notices():
+    """Ayın bütün olayları (borç, hırsızlık, batış, FGD) oluş sırasıyla tek pencerede; tek kapatma."""
+    notices = st.session_state.notices
+    if not notices:
+        return
+    blocks = [NOTICE_BLOCKS[n["type"]](n) for n in notices if n.get("type") in NOTICE_BLOCKS]
+    player = str(notices[0].get("player", ""))
+    months = sorted({int(n.get("month", n.get("from_month", 0))) for n in notices})
+    m = months[0]
+    span = f"{SCN.unit} {m}" if len(months) == 1 else f"{SCN.unit} {m}–{months[-1]}"
+    title = f"📣 {span} Sonu — {len(blocks)} bildirim"
 
-                {msg}
-                """
-            )
-            if st.button("Kapat ✖", use_container_width=True, key=f"close_bankruptcy_{player}_{m}_{bank}"):
-                st.session_state.bankruptcy_queue = st.session_state.bankruptcy_queue[1:]
+    if hasattr(st, "dialog"):
+        @st.dialog(title, **_DIALOG_KWARGS)
+        def _dlg():
+            st.caption(f"Oyuncu: {player}")
+            for i, b in enumerate(blocks):
+                if i:
+                    st.divider()
+                st.markdown(f"#### {b['title']}")
+                st.markdown(b["md"])
+            # kuyruk geri çağrıda boşalır: tam yeniden çalıştırmada pencere hiç çizilmez;
+            # pencere parçası (fragment) içinden tıklanınca kapatmak için tek st.rerun gerekir
+            if st.button("Tamam, hepsini kapat ✖", use_container_width=True, on_click=dismiss_notices,
+                         key=f"close_notices_{player}_{m}"):
                 st.rerun()
         _dlg()
     else:
         _overlay_style()
+        cards = "".join(
+            f'<div class="card" style="border:4px solid {b["border"]};background:{b["bg"]};margin-bottom:10px;">'
+            f'<div class="{b["cls"]}">{b["title"]}</div>{b["html"]}</div>'
+            for b in blocks
+        )
         st.markdown(
-            f"""
-            <div class="ovl">
-              <div class="card" style="border:4px solid #7a1fa2;background:#fbf5ff;">
-                <div class="titleBlue">🏦💥 BANKA BATIŞI!</div>
-                <div><b>Oyuncu:</b> {player} &nbsp; | &nbsp; <b>Ay:</b> {m}</div>
-                <div><b>Banka:</b> <b>{bank}</b></div>
-                <div style="margin-top:10px;"><b>Güvence Oranı:</b> <b>%{guar*100:.0f}</b></div>
-                <div><b>Batış Öncesi Toplam:</b> <b>{fmt_tl(total_before)}</b> (DD {fmt_tl(dd_before)} + TD {fmt_tl(td_before)})</div>
-                <div style="margin-top:10px;"><b>Kayıp (Güvence Dışı):</b> <span style="color:#b30000;font-weight:900;">{fmt_tl(loss)}</span></div>
-                <div><b>Kalan (Güvenceli):</b> <b>{fmt_tl(remain)}</b></div>
-                <div style="margin-top:10px;">{msg}</div>
-              </div>
-            </div>
-            """,
+            f'<div class="ovl"><div style="max-height:90vh;overflow-y:auto;">'
+            f'<div class="titleBlue" style="color:#fff;">{title} | {player}</div>{cards}</div></div>',
             unsafe_allow_html=True
         )
-        if st.button("Kapat ✖", use_container_width=True, key=f"close_bankruptcy_fallback_{player}_{m}_{bank}"):
-            st.session_state.bankruptcy_queue = st.session_state.bankruptcy_queue[1:]
+        if st.button("Tamam, hepsini kapat ✖", use_container_width=True, on_click=dismiss_notices,
+                     key=f"close_notices_fallback_{player}_{m}"):
             st.rerun()
 
 # =========================
 # OYUNCU ADI
 # =========================
-name = st.text_input("Oyuncu Adı")
+name = st.text_input("Oyuncu Adı", key="player_name")
 if not name:
     st.stop()
 
 p = get_player(name)
+
+with st.sidebar:
+    if st.toggle("🧠 Oturum belleği", key="show_mem_report"):
+        rows = session_memory_report()
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        st.caption(f"Toplam: {sum(r['Anahtar'] for r in rows)} anahtar, ~{sum(r['Bayt'] for r in rows) / 1024:.1f} KB")
+    with st.expander("💾 Oyunu Kaydet"):
+        # kayıt kodu yalnızca oyuncu durumu değişince yeniden üretilir (uzun oyunda log büyür)
+        save_key = (name, int(p["month"]), len(p["log"]), bool(p["finished"]), st.session_state.seed,
+                    p.get("last_dd_bank"), p.get("last_td_bank"), p.get("loan_bank"),
+                    json.dumps(p.get("standing_orders"), sort_keys=True))
+        cached = st.session_state.get("save_blob")
+        if cached is None or cached[0] != save_key:
+            st.session_state.save_blob = cached = (save_key, encode_save_code(name, p, st.session_state.seed))
+        save_blob = cached[1]
+        st.caption(f"Kayıt boyutu: {len(save_blob)} bayt")
+        st.code(save_code_text(save_blob), language=None)
+        st.download_button(
+            "⬇️ Kayıt dosyasını indir",
+            data=save_blob,
+            file_name=f"{name}_ay{int(p['month'])}.wfg",
+            mime="application/octet-stream",
+            use_container_width=True,
+        )
 month = int(p["month"])
-opened = open_assets_by_month(month)
-income = income_for_month(float(p["income_base"]), month)
+opened = list(SCN.open_assets[SCN.row(month)])
+income = SCN.income(p["income_base"], month)
 
-# popuplar
-render_theft_modal()
-render_pgl_modal()
-render_loan_modal()
-render_bankruptcy_modal_queue()
+# ay sonu bildirimleri
+render_notices()
+if "conflict_note" in st.session_state:
+    st.warning(st.session_state.pop("conflict_note"))
 
 # =========================
 # OYUN BİTTİ
@@ -690,12 +634,26 @@ if p.get("finished", False):
     if p.get("defaulted", False):
         st.error("⛔ Oyun bitti: Temerrüt oluştu.")
     else:
-        st.success("✅ Oyun bitti: 12. ay tamamlandı.")
+        st.success(f"✅ Oyun bitti: {SCN.unit} {SCN.months} tamamlandı.")
     a1, a2, a3, a4 = st.columns(4)
     a1.metric("Nakit", fmt_tl(p["holdings"]["cash"]))
     a2.metric("Yatırım (Toplam)", fmt_tl(total_investments(p)))
     a3.metric("Borç (Toplam Görünüm)", fmt_tl(total_debt_display(p, month)))
     a4.metric("Servet (Net)", fmt_tl(net_wealth(p)))
+    # ortak rastgele sayılar: botlar aynı ad ve piyasada oynar, fark yalnızca kararlardan gelir
+    st.markdown("#### 🤖 Aynı Dünyada Hazır Stratejiler")
+    mine = float(net_wealth(p))
+    bots_wealth = cached_benchmarks(name, int(st.session_state.seed), _room.cfg_key, get_market())
+    st.dataframe([{"Strateji": BOT_LABELS.get(k, k), "Net Servet": fmt_tl(w), "Sizin Farkınız": fmt_tl(mine - w)}
+                  for k, w in sorted(bots_wealth.items(), key=lambda kv: -kv[1])],
+                 hide_index=True, use_container_width=True)
+    st.caption("Botlar sizin adınızla aynı piyasada oynar: hırsızlık ayları, hırsızlık/batış/olay çekilişleri, "
+               "FGD ve fiyatlar sizinkiyle aynıdır. Aradaki fark şanstan değil, kararlardan gelir.")
+    # kohort analitiği: biten oyun bir kez gelen kutusuna yazılır (WFG_ANALYTICS_DIR ayarlıysa)
+    done_key = (st.session_state.room, st.session_state.seed, name, len(p["log"]))
+    if os.environ.get("WFG_ANALYTICS_DIR") and done_key not in st.session_state.setdefault("analytics_sent", set()):
+        analytics.record_game(analytics.game_record(name, p, st.session_state.seed, st.session_state.room))
+        st.session_state.analytics_sent.add(done_key)
     st.stop()
 
 # =========================
@@ -706,7 +664,7 @@ fixed_this_month = float(p["fixed_current"])
 extra_this_month = float(p["extra_current"])
 due_this_month = float(loan_due_amount(p, month))
 
-st.markdown(f"### 📅 Ay {month}/{CFG['MONTHS']}  —  Aşama: **{stage_label(month)}**")
+st.markdown(f"### 📅 {SCN.unit} {month}/{SCN.months}  —  Aşama: **{SCN.stage(month)}**")
 st.progress((month - 1) / CFG["MONTHS"])
 
 r1a, r1b, r1c, r1d = st.columns(4)
@@ -716,19 +674,38 @@ r1c.metric("Yatırım (Toplam)", fmt_tl(total_investments(p)))
 r1d.metric("Borç (Vade+Anapara)", fmt_tl(total_debt_display(p, month)))
 
 r2a, r2b, r2c, r2d = st.columns(4)
-r2a.metric("FGD (Bu Ay)", fmt_pct(pgl))
-r2b.metric("Sabit Gider (Bu Ay)", fmt_tl(fixed_this_month))
-r2c.metric("Ek Harcama (Bu Ay)", fmt_tl(extra_this_month))
-r2d.metric("Gelir (Bu Ay)", fmt_tl(income))
+r2a.metric(f"FGD (Bu {SCN.unit})", fmt_pct(pgl))
+r2b.metric(f"Sabit Gider (Bu {SCN.unit})", fmt_tl(fixed_this_month))
+r2c.metric(f"Ek Harcama (Bu {SCN.unit})", fmt_tl(extra_this_month))
+r2d.metric(f"Gelir (Bu {SCN.unit})", fmt_tl(income))
 
 r3a, r3b, r3c, r3d = st.columns(4)
-r3a.metric("Finansal Kurumlar", "Açık (Ay4+)" if can_borrow(month) else "Kapalı (Ay1-3)")
+r3a.metric("Finansal Kurumlar", f"Açık ({SCN.unit} {int(CFG['LOAN_ACTIVE_FROM_MONTH'])}+)" if SCN.can_borrow(month) else f"Kapalı ({NO_LOAN})")
 r3b.metric("Vadesiz Toplam", fmt_tl(dd_total(p)))
 r3c.metric("Vadeli Toplam", fmt_tl(td_total(p)))
 r3d.metric("Diğer Yatırımlar", fmt_tl(other_investments_total(p)))
 
+open_prices = get_market().prices(month - 1)
+ensure_positions(p, open_prices)
+pos_rows = position_rows(p, open_prices)
+if pos_rows:
+    with st.expander("📊 Pozisyonlar (birim, maliyet, kâr/zarar)"):
+        st.dataframe(views.positions_df(pos_rows, ASSETS), use_container_width=True, hide_index=True)
+
+risk = cached_portfolio_risk(montecarlo.risk_key(p, get_market().bank_map(month), CFG), _room.cfg_key, CFG)
+if risk["value"] > 0:
+    with st.expander(f"🛡️ Portföy Riski (1 {SCN.unit.lower()}, %{montecarlo.RISK_LEVEL * 100:.0f})"):
+        k1, k2, k3 = st.columns(3)
+        k1.metric("Portföy Değeri", fmt_tl(risk["value"]))
+        k2.metric(f"VaR %{montecarlo.RISK_LEVEL * 100:.0f}", fmt_tl(risk["var"]))
+        k3.metric("Beklenen Kayıp (ES)", fmt_tl(risk["es"]))
+        st.dataframe(views.risk_df(risk["components"], RISK_LABELS), use_container_width=True, hide_index=True)
+        st.caption(f"Bugünkü portföyünüzün {STEP} sonuna kadar kaybı: {risk['draws']} senaryonun en kötü %5'inin sınırı (VaR) "
+                   "ve bu kötü senaryoların ortalaması (ES). Gelir, gider ve borç dahil değildir; bekleyen kararlar "
+                   f"{STEP} tamamlanınca yansır.")
+
 if due_this_month > 0:
-    st.warning(f"⚠️ Bu ay vadesi gelen 1 aylık borç ödemesi var: **{fmt_tl(due_this_month)}** (Ay sonunda ödenir)")
+    st.warning(f"⚠️ Bu {STEP} vadesi gelen borç ödemesi var: **{fmt_tl(due_this_month)}** ({SCN.unit} sonunda ödenir)")
 
 tab_game, tab_banks, tab_log = st.tabs(["🎯 Karar Ekranı", "🏦 Bankalar & Mevduat", "📒 Geçmiş"])
 
@@ -738,21 +715,15 @@ tab_game, tab_banks, tab_log = st.tabs(["🎯 Karar Ekranı", "🏦 Bankalar & M
 with tab_banks:
     st.subheader("🏦 Bankalar ve Mevduat")
 
-    if month < 4:
-        st.info("Ay 1–3: Bankalar yok.")
+    if SCN.bank_count(month) == 0:
+        st.info(f"{BANKLESS}: Bankalar yok.")
     else:
         b_list = banks_for_month(month)
         bank_map = {b["Bank"]: b for b in b_list}
         st.dataframe(banks_df(month), use_container_width=True, hide_index=True, height=280)
 
         banks_names = list(bank_map.keys())
-        if p.get("last_dd_bank") is None:
-            p["last_dd_bank"] = banks_names[-1]
-        if p.get("last_td_bank") is None:
-            p["last_td_bank"] = banks_names[0]
-        if p.get("loan_bank") is None:
-            best = sorted(b_list, key=lambda x: x["Loan_Rate"])[0]["Bank"]
-            p["loan_bank"] = best
+        ensure_bank_choices(p, b_list)
 
         cA, cB, cC = st.columns(3)
         with cA:
@@ -761,7 +732,7 @@ with tab_banks:
             p["last_td_bank"] = st.selectbox("Vadeli bankası", banks_names, index=banks_names.index(p["last_td_bank"]), key=f"sel_td_{name}_{month}")
         with cC:
             p["loan_bank"] = st.selectbox("Kredi bankası", banks_names, index=banks_names.index(p["loan_bank"]), key=f"sel_loan_{name}_{month}")
-            st.caption(f"Kredi faizi: **{bank_map[p['loan_bank']]['Loan_Rate']*100:.2f}% / ay** (1 ay vadeli)")
+            st.caption(f"Kredi faizi: **{bank_map[p['loan_bank']]['Loan_Rate']*100:.2f}% / {STEP}** (1 {STEP} vadeli)")
 
 # =========================
 # GEÇMİŞ TAB
@@ -771,553 +742,323 @@ with tab_log:
     if not p["log"]:
         st.info("Henüz kayıt yok.")
     else:
-        for row in reversed(p["log"]):
+        # yalnızca seçili sayfadaki aylar çizilir; her satır bir kez biçimlenip önbellekte tutulur
+        n_pages = (len(p["log"]) + LOG_PAGE_SIZE - 1) // LOG_PAGE_SIZE
+        page = 1
+        if n_pages > 1:
+            page = int(st.number_input(f"Sayfa (en yeni {UNITS.lower()} önce)", min_value=1, max_value=n_pages,
+                                       value=1, step=1, key=f"log_page_{name}"))
+        stop = len(p["log"]) - (page - 1) * LOG_PAGE_SIZE
+        for row in reversed(p["log"][max(0, stop - LOG_PAGE_SIZE):stop]):
             ay = row.get("Ay", "-")
             asama = row.get("Aşama", "-")
-            with st.expander(f"Ay {ay} — {asama}", expanded=False):
+            with st.expander(f"{SCN.unit} {ay} — {asama}", expanded=False):
+                left_md, right_md = cached_log_blocks(tuple(row.items()))
                 cols = st.columns(2)
-                items = list(row.items())
-                half = (len(items) + 1) // 2
-                left_items = items[:half]
-                right_items = items[half:]
-
-                def render_kv(pairs, col):
-                    with col:
-                        for k, v in pairs:
-                            if isinstance(v, (int, float)):
-                                if "FGD" in str(k) or "Fiyatlar" in str(k):
-                                    st.markdown(f"**{k}:** {fmt_pct(float(v))}")
-                                else:
-                                    st.markdown(f"**{k}:** {fmt_tl(float(v))}")
-                            else:
-                                st.markdown(f"**{k}:** {v}")
-
-                render_kv(left_items, cols[0])
-                render_kv(right_items, cols[1])
+                cols[0].markdown(left_md)
+                cols[1].markdown(right_md)
 
 # =========================
 # KARAR EKRANI TAB
 # =========================
 with tab_game:
-    st.subheader("🎯 Bu Ay Kararları")
+    st.subheader(f"🎯 Bu {SCN.unit} Kararları")
 
     fee = float(CFG["TX_FEE"])
     pen = float(CFG["EARLY_BREAK_PENALTY"])
 
-    # 0) SATIŞ / BOZDURMA
-    st.markdown("#### 0) Yatırımı Sat / Mevduatı Çek (Opsiyonel)")
-    sell_inputs = {k: 0.0 for k in RISK_ASSETS}
-    sell_dd_amt = 0.0
-    sell_td_amt = 0.0
-    sell_dd_bank = None
-    sell_td_bank = None
-
-    colS1, colS2 = st.columns(2)
-    with colS1:
-        st.write("**Riskli varlık satışı (TL):**")
-        for k in RISK_ASSETS:
-            if k not in opened:
-                continue
-            max_sell = float(p["holdings"].get(k, 0.0))
-            rate = sell_cost_rate(k)
-            st.caption(f"{ASSETS[k]} | Maks: {fmt_tl(max_sell)} | Komisyon: {rate*100:.2f}%")
-            sell_amt = safe_number_input(f"{ASSETS[k]} Satış", f"sell_{k}_{name}_{month}", max_sell, 1000.0)
-            sell_inputs[k] = float(sell_amt)
-            st.caption(f"Net nakit girişi (tahmini): {fmt_tl(float(sell_amt) * (1.0 - rate))}")
-
-    with colS2:
-        st.write("**Mevduat çek/boz (TL):**")
-        if month < 4:
-            st.caption("Ay 1–3: mevduat yok.")
-        else:
-            dd_banks = [bk for bk, bal in p["dd_accounts"].items() if float(bal) > 0]
-            if dd_banks:
-                sell_dd_bank = st.selectbox("Vadesizden çekilecek banka", dd_banks, key=f"dd_with_bank_{name}_{month}")
-                max_dd = float(p["dd_accounts"].get(sell_dd_bank, 0.0))
-                st.caption(f"Vadesiz ({sell_dd_bank}) | Maks: {fmt_tl(max_dd)} | Komisyon: {fee*100:.2f}%")
-                sell_dd_amt = safe_number_input("Vadesiz Çekim", f"sell_dd_{name}_{month}", max_dd, 1000.0)
-                st.caption(f"Net nakit girişi (tahmini): {fmt_tl(float(sell_dd_amt) * (1.0 - fee))}")
-            else:
-                st.caption("Vadesiz mevduat yok.")
-
-            td_banks = [bk for bk, bal in p["td_accounts"].items() if float(bal) > 0]
-            if td_banks:
-                sell_td_bank = st.selectbox("Vadeliden bozulacak banka", td_banks, key=f"td_break_bank_{name}_{month}")
-                max_td = float(p["td_accounts"].get(sell_td_bank, 0.0))
-                st.caption(f"Vadeli ({sell_td_bank}) | Maks: {fmt_tl(max_td)} | Ceza: {pen*100:.2f}% + Komisyon: {fee*100:.2f}%")
-                sell_td_amt = safe_number_input("Vadeli Bozma", f"sell_td_{name}_{month}", max_td, 1000.0)
-                st.caption(f"Net nakit girişi (tahmini): {fmt_tl(float(sell_td_amt) * (1.0 - fee - pen))}")
-            else:
-                st.caption("Vadeli mevduat yok.")
-
-    projected_sell_cash_in = 0.0
-    for k, amt in sell_inputs.items():
-        amt = float(amt)
-        if amt <= 0:
-            continue
-        projected_sell_cash_in += amt * (1.0 - sell_cost_rate(k))
-    if month >= 4 and sell_dd_amt > 0:
-        projected_sell_cash_in += float(sell_dd_amt) * (1.0 - fee)
-    if month >= 4 and sell_td_amt > 0:
-        projected_sell_cash_in += float(sell_td_amt) * (1.0 - fee - pen)
-
-    st.info(f"Satış/bozma ile tahmini net nakit girişi: **{fmt_tl(projected_sell_cash_in)}**")
-    st.divider()
-
-    # 1) BÜTÇE
-    st.markdown("#### 1) Bütçe (Bu Ay)")
-    st.write(f"Gelir (bu ay): **{fmt_tl(income)}**")
-    st.write(f"Sabit gider (bu ay): **{fmt_tl(fixed_this_month)}**")
-    st.write(f"Ek harcama (bu ay): **{fmt_tl(extra_this_month)}**")
-
-    total_exp = float(fixed_this_month) + float(extra_this_month)
-    st.write(f"Toplam gider: **{fmt_tl(total_exp)}**")
-
-    available_without_borrow = float(p["holdings"]["cash"]) + projected_sell_cash_in + income
-    st.write(f"Nakit + satış(önizleme) + gelir: **{fmt_tl(available_without_borrow)}**")
-    st.write(f"Bütçe sonucu (gelir+nakit - gider): **{fmt_tl(available_without_borrow - total_exp)}**")
-
-    if (not can_borrow(month)) and (total_exp > available_without_borrow):
-        st.error("Ay 1–3'te borç yok. Bu ay giderler (nakit+gelir) sınırını aşıyor → temerrüt olur.")
-
-    st.divider()
-
-    # 2) BORÇ AL
-    st.markdown("#### 2) Bankadan Borç Al (1 ay vadeli) — Opsiyonel")
-    borrow_amt_input = 0.0
-    if can_borrow(month):
-        b_list_local = banks_for_month(month)
-        bank_map_local = {b["Bank"]: b for b in b_list_local}
-
-        if p.get("loan_bank") is None and bank_map_local:
-            p["loan_bank"] = sorted(b_list_local, key=lambda x: x["Loan_Rate"])[0]["Bank"]
+    with st.expander(f"🤖 Otomatik Pilot: talimat ver, birkaç {STEP} tek seferde kapat"):
+        orders = p.setdefault("standing_orders", default_orders())
+        with st.form(f"autopilot_{name}", border=False):
+            st.caption(f"Her {STEP} aynı plan uygulanır; temerrüt ya da banka batışı olursa pilot durur.")
+            remaining = int(CFG["MONTHS"]) - month + 1
+            ap_months = st.number_input(f"Kaç {STEP} ilerlensin?", min_value=1, max_value=remaining,
+                                        value=min(3, remaining), step=1, key=f"ap_months_{name}")
+            ap_td = st.number_input(f"Her adımda vadeli mevduat (TL, {SCN.unit} {int(CFG['BANK_STAGE_FROM'])}+)", min_value=0.0,
+                                    value=float(orders["td_amount"]), step=1000.0, key=f"ap_td_{name}")
+            bank_opts = ["(Bankalar sekmesindeki seçim)"] + [f"Banka {i + 1}" for i in range(max(SCN.bank_count(SCN.months), 0))]
+            ap_bank = st.selectbox("Vadeli banka", bank_opts,
+                                   index=bank_opts.index(orders["td_bank"]) if orders["td_bank"] in bank_opts else 0,
+                                   key=f"ap_td_bank_{name}")
+            st.write("**Kalan nakdin riskli varlıklara dağılımı (%):**")
+            ap_cols = st.columns(len(RISK_ASSETS))
+            ap_alloc = {}
+            for col, k in zip(ap_cols, RISK_ASSETS):
+                ap_alloc[k] = col.number_input(ASSETS[k], min_value=0.0, max_value=100.0,
+                                               value=float(orders["alloc"].get(k, 0.0)) * 100.0, step=5.0,
+                                               key=f"ap_{k}_{name}") / 100.0
+            ap_roll = st.checkbox(f"Vadesi gelen borcu yeni borçla çevir ({SCN.unit} {int(CFG['LOAN_ACTIVE_FROM_MONTH'])}+)", value=bool(orders["rollover"]),
+                                  key=f"ap_roll_{name}")
+            if st.form_submit_button("⏩ Talimatla İleri Sar", use_container_width=True):
+                orders = {"td_amount": float(ap_td), "td_bank": None if ap_bank == bank_opts[0] else ap_bank,
+                          "alloc": ap_alloc, "rollover": bool(ap_roll)}
+                p["standing_orders"] = orders
+                try:
+                    events, reason = commit_player(name, month, lambda q: fast_forward(
+                        q, name, get_market(), standing_orders(orders), int(ap_months), metrics.REGISTRY))
+                except ValueError as e:
+                    st.session_state.conflict_note = str(e)
+                    st.rerun()
+                p = st.session_state.players[name]
+                last_month = int(p["month"]) if p["finished"] else int(p["month"]) - 1
+                summary = {"type": "autopilot", "player": str(name), "month": month, "last_month": last_month, "reason": reason}
+                prune_month_keys(name, int(p["month"]))
+                st.session_state.notices = [summary] + [ev for ev in events if ev["type"] in NOTICE_BLOCKS]
+                st.rerun()
 
-        sel_bank = p.get("loan_bank")
-        sel_rate = float(bank_map_local[sel_bank]["Loan_Rate"]) if (bank_map_local and sel_bank in bank_map_local) else 0.03
-        borrow_max = float(income * CFG["LOAN_MAX_MULT_INCOME"])
+    # kararlar tek form: girişler yeniden çalıştırma tetiklemez, limitler gönderimde denetlenir
+    st.caption(f"Girişler **🔄 Önizle** ya da **✅ {SCN.unit} {month}: Tamamla** ile birlikte gönderilir; "
+               "önizleme satırları son gönderilen değerleri gösterir.")
+    with st.form(f"decisions_{name}_{month}", border=False):
+        # 0) SATIŞ / BOZDURMA
+        st.markdown("#### 0) Yatırımı Sat / Mevduatı Çek (Opsiyonel)")
+        sell_inputs = {k: 0.0 for k in RISK_ASSETS}
+        sell_dd_amt = 0.0
+        sell_td_amt = 0.0
+        sell_dd_bank = None
+        sell_td_bank = None
+        ticket = None
+
+        if SCN.bank_count(month) > 0:
+            with st.expander("🧾 Toplu Mevduat Emri: bütün bankalara tek seferde yatır / çek"):
+                st.caption(f"Her banka için tutar girin (TL). Çekimler satışlarla birlikte, yatırmalar işlemlerle "
+                           f"birlikte uygulanır. Komisyon {fee*100:.2f}%, vadeli bozma cezası {pen*100:.2f}%. "
+                           "Aşağıdaki tek banka alanlarıyla birlikte kullanılabilir.")
+                ticket_df = st.data_editor(
+                    views.ticket_frame(banks_for_month(month), p["dd_accounts"], p["td_accounts"]),
+                    key=f"ticket_{name}_{month}", hide_index=True, use_container_width=True,
+                    disabled=["Banka", "Güvence", "Vadeli Faiz", "Vadesiz Bakiye", "Vadeli Bakiye"],
+                    column_config={col: st.column_config.NumberColumn(col, min_value=0.0, step=1000.0, format="%.0f")
+                                   for col in views.TICKET_COLUMNS},
+                )
+                ticket = views.ticket_from_frame(ticket_df)
+
+        colS1, colS2 = st.columns(2)
+        with colS1:
+            st.write("**Riskli varlık satışı (TL):**")
+            for k in RISK_ASSETS:
+                if k not in opened:
+                    continue
+                max_sell = float(p["holdings"].get(k, 0.0))
+                rate = SCN.sell_rate[k]
+                st.caption(f"{ASSETS[k]} | Maks: {fmt_tl(max_sell)} | Komisyon: {rate*100:.2f}%")
+                sell_amt = safe_number_input(f"{ASSETS[k]} Satış", f"sell_{k}_{name}_{month}", max_sell, 1000.0)
+                sell_inputs[k] = float(sell_amt)
+                st.caption(f"Net nakit girişi (tahmini): {fmt_tl(float(sell_amt) * (1.0 - rate))}")
+
+        with colS2:
+            st.write("**Mevduat çek/boz (TL):**")
+            if SCN.bank_count(month) == 0:
+                st.caption(f"{BANKLESS}: mevduat yok.")
+            else:
+                dd_banks = [bk for bk, bal in p["dd_accounts"].items() if float(bal) > 0]
+                if dd_banks:
+                    # form içinde banka seçimi yeniden çalıştırmaz: üst sınır en büyük bakiye, banka bakiyesi gönderimde denetlenir
+                    sell_dd_bank = st.selectbox("Vadesizden çekilecek banka", dd_banks, key=f"dd_with_bank_{name}_{month}")
+                    max_dd = max(float(p["dd_accounts"][bk]) for bk in dd_banks)
+                    st.caption("Vadesiz | " + " · ".join(f"{bk}: {fmt_tl(float(p['dd_accounts'][bk]))}" for bk in dd_banks)
+                               + f" | Komisyon: {fee*100:.2f}%")
+                    sell_dd_amt = safe_number_input("Vadesiz Çekim", f"sell_dd_{name}_{month}", max_dd, 1000.0)
+                    st.caption(f"Net nakit girişi (tahmini): {fmt_tl(float(sell_dd_amt) * (1.0 - fee))}")
+                else:
+                    st.caption("Vadesiz mevduat yok.")
+
+                td_banks = [bk for bk, bal in p["td_accounts"].items() if float(bal) > 0]
+                if td_banks:
+                    sell_td_bank = st.selectbox("Vadeliden bozulacak banka", td_banks, key=f"td_break_bank_{name}_{month}")
+                    max_td = max(float(p["td_accounts"][bk]) for bk in td_banks)
+                    st.caption("Vadeli | " + " · ".join(f"{bk}: {fmt_tl(float(p['td_accounts'][bk]))}" for bk in td_banks)
+                               + f" | Ceza: {pen*100:.2f}% + Komisyon: {fee*100:.2f}%")
+                    sell_td_amt = safe_number_input("Vadeli Bozma", f"sell_td_{name}_{month}", max_td, 1000.0)
+                    st.caption(f"Net nakit girişi (tahmini): {fmt_tl(float(sell_td_amt) * (1.0 - fee - pen))}")
+                else:
+                    st.caption("Vadeli mevduat yok.")
 
-        st.caption(
-            f"Seçili banka: **{sel_bank}** | Faiz: **{sel_rate*100:.2f}% / ay** | "
-            f"Bu ay borç tavanı: **{fmt_tl(borrow_max)}** | "
-            f"Bu borç **Ay {month+1} sonunda** geri ödenmek zorundadır."
+        projected_sell_cash_in = projected_sell_cash(
+            p, {"sell": sell_inputs, "sell_dd_amt": sell_dd_amt, "sell_td_amt": sell_td_amt, "ticket": ticket}, CFG
         )
-        borrow_amt_input = safe_number_input("Bu ay alınacak borç (TL)", f"borrow_{name}_{month}", borrow_max, 1000.0)
-    else:
-        st.caption("Ay 1–3: bankadan borç alınamaz.")
 
-    st.divider()
+        st.info(f"Satış/bozma ile tahmini net nakit girişi: **{fmt_tl(projected_sell_cash_in)}**")
+        st.divider()
 
-    # 3) BORÇ ÖDEME
-    st.markdown("#### 3) Borç Ödeme (Ay Sonu)")
-    due_now = float(loan_due_amount(p, month))
-    if due_now <= 0:
-        st.caption("Bu ay vadesi gelen borç yok.")
-    else:
-        st.caption(f"Bu ay vadesi gelen toplam ödeme: **{fmt_tl(due_now)}** (anapara + 1 aylık faiz)")
-        st.number_input(
-            "Bu ay ödemek zorunda olduğunuz tutar (TL)",
-            min_value=0.0,
-            max_value=float(due_now),
-            value=float(due_now),
-            step=1000.0,
-            key=f"repay_{name}_{month}",
-            disabled=True,
-        )
+        # 1) BÜTÇE
+        st.markdown(f"#### 1) Bütçe (Bu {SCN.unit})")
+        st.write(f"Gelir (bu {STEP}): **{fmt_tl(income)}**")
+        st.write(f"Sabit gider (bu {STEP}): **{fmt_tl(fixed_this_month)}**")
+        st.write(f"Ek harcama (bu {STEP}): **{fmt_tl(extra_this_month)}**")
 
-    st.divider()
+        total_exp = float(fixed_this_month) + float(extra_this_month)
+        st.write(f"Toplam gider: **{fmt_tl(total_exp)}**")
 
-    # 4) İŞLEMLER
-    st.markdown("#### 4) İşlemler: Mevduat / Yatırım (TL)")
-    available_for_invest_preview = float(p["holdings"]["cash"]) + projected_sell_cash_in + income - total_exp + float(borrow_amt_input)
-    if not can_borrow(month):
-        available_for_invest_preview = max(0.0, available_for_invest_preview)
-    st.success(f"💰 Bu ay kullanılabilir tahmini MAX nakit: **{fmt_tl(available_for_invest_preview)}**")
-
-    inv_inputs = {}
-    max_buy = float(available_for_invest_preview)
-
-    c1, c2 = st.columns(2)
-    with c1:
-        if "dd" in opened and month >= 4:
-            inv_inputs["dd"] = safe_number_input(
-                f"Vadesiz MEVDUAT (TL) | Komisyon {float(CFG['TX_FEE'])*100:.2f}%",
-                f"buy_dd_{name}_{month}",
-                max_buy,
-                1000.0,
-            )
-        if "td" in opened and month >= 4:
-            inv_inputs["td"] = safe_number_input(
-                f"Vadeli MEVDUAT (TL) | Komisyon {float(CFG['TX_FEE'])*100:.2f}%",
-                f"buy_td_{name}_{month}",
-                max_buy,
-                1000.0,
-            )
-        if "fx" in opened:
-            inv_inputs["fx"] = safe_number_input(
-                f"Döviz (TL) | Komisyon {buy_cost_rate('fx')*100:.2f}%",
-                f"buy_fx_{name}_{month}",
-                max_buy,
-                1000.0,
-            )
-        if "pm" in opened:
-            inv_inputs["pm"] = safe_number_input(
-                f"Metal (TL) | Komisyon {buy_cost_rate('pm')*100:.2f}%",
-                f"buy_pm_{name}_{month}",
-                max_buy,
-                1000.0,
-            )
-    with c2:
-        if "eq" in opened:
-            inv_inputs["eq"] = safe_number_input(
-                f"Hisse (TL) | Komisyon {buy_cost_rate('eq')*100:.2f}%",
-                f"buy_eq_{name}_{month}",
-                max_buy,
-                1000.0,
-            )
-        if "cr" in opened:
-            inv_inputs["cr"] = safe_number_input(
-                f"Kripto (TL) | Komisyon {buy_cost_rate('cr')*100:.2f}%",
-                f"buy_cr_{name}_{month}",
-                max_buy,
-                1000.0,
-            )
-
-    st.divider()
-    btn_label = "✅ Ayı Tamamla" if month < CFG["MONTHS"] else "✅ 12. Ayı Tamamla ve Bitir"
+        available_without_borrow = float(p["holdings"]["cash"]) + projected_sell_cash_in + income
+        st.write(f"Nakit + satış(önizleme) + gelir: **{fmt_tl(available_without_borrow)}**")
+        st.write(f"Bütçe sonucu (gelir+nakit - gider): **{fmt_tl(available_without_borrow - total_exp)}**")
 
-    if st.button(btn_label, use_container_width=True):
-        rng = rng_for_player(name, month)
+        if (not SCN.can_borrow(month)) and (total_exp > available_without_borrow):
+            st.error(f"{NO_LOAN} arasında borç yok. Bu {STEP} giderler (nakit+gelir) sınırını aşıyor → temerrüt olur.")
 
-        theft_loss = 0.0
-        bank_loss = 0.0
-        bankruptcy_loss = 0.0
-        td_interest = 0.0
-        tx_fee_total = 0.0
-        spread_cost_total = 0.0
-        early_break_penalty_total = 0.0
+        st.divider()
 
-        bank_map_local = {}
-        if month >= 4:
+        # 2) BORÇ AL
+        st.markdown(f"#### 2) Bankadan Borç Al (1 {STEP} vadeli) — Opsiyonel")
+        borrow_amt_input = 0.0
+        borrow_max = 0.0
+        if SCN.can_borrow(month):
             b_list_local = banks_for_month(month)
             bank_map_local = {b["Bank"]: b for b in b_list_local}
 
-        # A) satış/bozma
-        for k, amt in sell_inputs.items():
-            amt = float(amt)
-            if amt <= 0:
-                continue
-            amt = min(amt, float(p["holdings"].get(k, 0.0)))
-            rate = sell_cost_rate(k)
-            fee_part = amt * float(CFG["TX_FEE"])
-            spr_part = amt * (float(CFG["SPREAD"].get(k, 0.0)) / 2.0)
-            net_cash = amt * (1.0 - rate)
-
-            p["holdings"][k] -= amt
-            p["holdings"]["cash"] += max(net_cash, 0.0)
-
-            tx_fee_total += fee_part
-            spread_cost_total += spr_part
-
-        if month >= 4 and sell_dd_amt > 0 and sell_dd_bank:
-            bal = float(p["dd_accounts"].get(sell_dd_bank, 0.0))
-            amt = float(min(sell_dd_amt, bal))
-            fee_part = amt * float(CFG["TX_FEE"])
-            net_cash = amt * (1.0 - float(CFG["TX_FEE"]))
-            p["dd_accounts"][sell_dd_bank] = bal - amt
-            p["holdings"]["cash"] += max(net_cash, 0.0)
-            tx_fee_total += fee_part
-
-        if month >= 4 and sell_td_amt > 0 and sell_td_bank:
-            bal = float(p["td_accounts"].get(sell_td_bank, 0.0))
-            amt = float(min(sell_td_amt, bal))
-            pen_part = amt * float(CFG["EARLY_BREAK_PENALTY"])
-            fee_part = amt * float(CFG["TX_FEE"])
-            net_cash = amt * (1.0 - float(CFG["EARLY_BREAK_PENALTY"]) - float(CFG["TX_FEE"]))
-            p["td_accounts"][sell_td_bank] = bal - amt
-            p["holdings"]["cash"] += max(net_cash, 0.0)
-            early_break_penalty_total += pen_part
-            tx_fee_total += fee_part
-
-        # B) gelir/gider
-        p["holdings"]["cash"] += income
-        p["holdings"]["cash"] -= float(fixed_this_month + extra_this_month)
-
-        # C) borç al
-        new_borrow_taken = 0.0
-        if can_borrow(month) and float(borrow_amt_input) > 0:
-            sel_bank = p.get("loan_bank")
-            loan_rate = float(bank_map_local[sel_bank]["Loan_Rate"]) if (bank_map_local and sel_bank in bank_map_local) else 0.03
-            new_borrow_taken = float(borrow_amt_input)
-
-            p["holdings"]["cash"] += new_borrow_taken
-            due_amt = float(new_borrow_taken * (1.0 + loan_rate))
-            p["loans"].append({
-                "principal": float(new_borrow_taken),
-                "rate": float(loan_rate),
-                "bank": str(sel_bank),
-                "taken_month": int(month),
-                "due_month": int(month + 1),
-            })
-
-            st.session_state.loan_popup = {
-                "player": str(name),
-                "month": int(month),
-                "principal": float(new_borrow_taken),
-                "rate": float(loan_rate),
-                "due": float(due_amt),
-            }
-
-        # D) açık -> temerrüt
-        if p["holdings"]["cash"] < 0:
-            p["holdings"]["cash"] = 0.0
-            p["defaulted"] = True
-            p["finished"] = True
-            st.error("⛔ Bu ay açık oluştu: TEMERRÜT!")
-            st.rerun()
+            if p.get("loan_bank") is None and bank_map_local:
+                p["loan_bank"] = sorted(b_list_local, key=lambda x: x["Loan_Rate"])[0]["Bank"]
 
-        # E) işlemler / mevduat-yatırım
-        for k, buy_amt in inv_inputs.items():
-            buy_amt = float(buy_amt)
-            if buy_amt <= 0:
-                continue
-
-            p["holdings"]["cash"] -= buy_amt
-            if p["holdings"]["cash"] < 0:
-                p["holdings"]["cash"] = 0.0
-                p["defaulted"] = True
-                p["finished"] = True
-                st.error("⛔ İşlemler nakdi aştı: TEMERRÜT!")
-                st.rerun()
+            sel_bank = p.get("loan_bank")
+            sel_rate = float(bank_map_local[sel_bank]["Loan_Rate"]) if (bank_map_local and sel_bank in bank_map_local) else 0.03
+            borrow_max = float(income * CFG["LOAN_MAX_MULT_INCOME"])
 
-            if k in DEPOSIT_ASSETS and month >= 4:
-                fee_part = buy_amt * float(CFG["TX_FEE"])
-                net = buy_amt * (1.0 - float(CFG["TX_FEE"]))
-                tx_fee_total += fee_part
-                if k == "dd":
-                    bank = p.get("last_dd_bank") or "Banka 1"
-                    p["dd_accounts"][bank] = float(p["dd_accounts"].get(bank, 0.0) + max(net, 0.0))
-                else:
-                    bank = p.get("last_td_bank") or "Banka 1"
-                    p["td_accounts"][bank] = float(p["td_accounts"].get(bank, 0.0) + max(net, 0.0))
-            else:
-                spr_half = float(CFG["SPREAD"].get(k, 0.0)) / 2.0
-                fee_part = buy_amt * float(CFG["TX_FEE"])
-                spr_part = buy_amt * spr_half
-                net = buy_amt * (1.0 - (float(CFG["TX_FEE"]) + spr_half))
-                tx_fee_total += fee_part
-                spread_cost_total += spr_part
-                p["holdings"][k] += max(net, 0.0)
-
-        # F) hırsızlık
-        theft_trigger = False
-        if month in p.get("theft_months", []) and float(p["holdings"]["cash"]) > 0:
-            theft_trigger = True
+            st.caption(
+                f"Seçili banka: **{sel_bank}** | Faiz: **{sel_rate*100:.2f}% / {STEP}** | "
+                f"Bu {STEP} borç tavanı: **{fmt_tl(borrow_max)}** | "
+                f"Bu borç **{SCN.unit} {month+1} sonunda** geri ödenmek zorundadır."
+            )
+            borrow_amt_input = safe_number_input(f"Bu {STEP} alınacak borç (TL)", f"borrow_{name}_{month}", borrow_max, 1000.0)
         else:
-            prob = CFG["CASH_THEFT_PROB_STAGE1"] if month <= 3 else CFG["CASH_THEFT_PROB_STAGE2"]
-            if float(p["holdings"]["cash"]) > 0 and rng.random() < prob:
-                theft_trigger = True
-
-        if theft_trigger and float(p["holdings"]["cash"]) > 0:
-            sev = float(rng.uniform(CFG["CASH_THEFT_SEV_MIN"], CFG["CASH_THEFT_SEV_MAX"]))
-            theft_loss = float(p["holdings"]["cash"]) * sev
-            p["holdings"]["cash"] -= theft_loss
-            st.session_state.theft_popup = {
-                "loss": float(theft_loss),
-                "remain": float(p["holdings"]["cash"]),
-                "month": int(month),
-                "player": str(name),
-            }
-
-        # G) banka batışı (para olan bankada) + küçük olay + vadeli faiz
-        if month >= 4 and bank_map_local:
-            # ✅ bu ay batacak banka(lar)ı oyuncunun mevduatı olan bankadan seç
-            bad_banks = choose_bankruptcy_for_player_month(p, month, bank_map_local, rng)
-
-            # BATIŞ uygula
-            for bank in sorted(list(bad_banks)):
-                guar = float(bank_map_local[bank]["Guarantee"])
-                dd_before = float(p["dd_accounts"].get(bank, 0.0))
-                td_before = float(p["td_accounts"].get(bank, 0.0))
-                total_before = dd_before + td_before
-
-                # garanti altındaki kısım kalır
-                dd_after = dd_before * guar
-                td_after = td_before * guar
-                loss_here = (dd_before - dd_after) + (td_before - td_after)
-
-                # oyuncunun gerçekten parası olduğu için mutlaka etkisi var
-                p["dd_accounts"][bank] = float(dd_after)
-                p["td_accounts"][bank] = float(td_after)
-
-                bankruptcy_loss += float(loss_here)
-                bank_loss += float(loss_here)
-
-                # oyuncu bazlı sayacı artır
-                p["bankruptcies_seen"] = int(p.get("bankruptcies_seen", 0)) + 1
-                if bank not in p.get("bankrupt_banks_history", []):
-                    p["bankrupt_banks_history"].append(bank)
-
-                # popup
-                st.session_state.bankruptcy_queue.append({
-                    "player": str(name),
-                    "month": int(month),
-                    "bank": str(bank),
-                    "guarantee": float(guar),
-                    "dd_before": float(dd_before),
-                    "td_before": float(td_before),
-                    "loss": float(loss_here),
-                    "remain": float(dd_after + td_after),
-                })
-
-            # küçük banka olayı (batık olmayan)
-            for bank, bal in list(p["dd_accounts"].items()):
-                if float(bal) <= 0 or bank not in bank_map_local:
-                    continue
-                if bank in bad_banks:
-                    continue
-                if rng.random() < float(CFG["BANK_INCIDENT_PROB"]):
-                    guar = float(bank_map_local[bank]["Guarantee"])
-                    loss = float(bal * (1.0 - guar))
-                    p["dd_accounts"][bank] = float(max(0.0, bal - loss))
-                    bank_loss += loss
-
-            for bank, bal in list(p["td_accounts"].items()):
-                if float(bal) <= 0 or bank not in bank_map_local:
-                    continue
-                if bank in bad_banks:
-                    continue
-                if rng.random() < float(CFG["BANK_INCIDENT_PROB"]):
-                    guar = float(bank_map_local[bank]["Guarantee"])
-                    loss = float(bal * (1.0 - guar))
-                    p["td_accounts"][bank] = float(max(0.0, bal - loss))
-                    bank_loss += loss
-
-            # vadeli faiz (batık olmayan)
-            for bank, bal in list(p["td_accounts"].items()):
-                if float(bal) > 0 and bank in bank_map_local and bank not in bad_banks:
-                    before = float(bal)
-                    rate = float(bank_map_local[bank]["TD_Rate"])
-                    after = float(before * (1.0 + rate))
-                    p["td_accounts"][bank] = after
-                    td_interest += (after - before)
-
-        # H) piyasa getirileri
-        if "eq" in opened:
-            eq_r = float(rng.normal(CFG["EQ_MU"], CFG["EQ_SIG"]))
-            if month == CFG["CRISIS_MONTH"]:
-                eq_r += CFG["CRISIS_EQ"]
-            p["holdings"]["eq"] *= (1.0 + eq_r)
-
-        if "cr" in opened:
-            cr_r = float(rng.normal(CFG["CR_MU"], CFG["CR_SIG"]))
-            if month == CFG["CRISIS_MONTH"]:
-                cr_r += CFG["CRISIS_CR"]
-            p["holdings"]["cr"] *= (1.0 + cr_r)
-
-        if "pm" in opened:
-            pm_r = float(rng.normal(CFG["PM_MU"], CFG["PM_SIG"]))
-            if month == CFG["CRISIS_MONTH"]:
-                pm_r += CFG["CRISIS_PM"]
-            p["holdings"]["pm"] *= (1.0 + pm_r)
-
-        if "fx" in opened:
-            fx_r = float(rng.normal(CFG["FX_MU"], CFG["FX_SIG"]))
-            if month == CFG["CRISIS_MONTH"]:
-                fx_r += CFG["CRISIS_FX"]
-            p["holdings"]["fx"] *= (1.0 + fx_r)
-
-        # I) borç ödeme
-        due_now_actual = float(loan_due_amount(p, month))
-        repay_done = 0.0
-        if due_now_actual > 0:
-            if float(p["holdings"]["cash"]) + 1e-9 < due_now_actual:
-                p["defaulted"] = True
-                p["finished"] = True
-                st.error("⛔ Vadesi gelen 1 aylık borç ödenemedi: TEMERRÜT!")
-                st.rerun()
-            p["holdings"]["cash"] -= due_now_actual
-            repay_done = due_now_actual
-            remove_due_loans(p, month)
-
-        # J) log
-        end_cash = float(p["holdings"]["cash"])
-        end_inv = float(total_investments(p))
-        end_total_debt_view = float(total_debt_display(p, month))
-        end_total = float(end_cash + end_inv - loan_outstanding_principal(p))
-
-        p["log"].append({
-            "Ay": int(month),
-            "Aşama": stage_label(month),
-            "FiyatlarGenelDuzeyi": float(pgl),
-            "Gelir(TL)": float(income),
-            "SabitGider(TL)": float(fixed_this_month),
-            "EkHarcama(TL)": float(extra_this_month),
-            "SatışNetNakitGirişi(TL)": float(projected_sell_cash_in),
-            "YeniBorç(1ay)(TL)": float(new_borrow_taken),
-            "VadesiGelenBorçÖdeme(TL)": float(repay_done),
-            "İşlemÜcreti(TL)": float(tx_fee_total),
-            "SpreadMaliyeti(TL)": float(spread_cost_total),
-            "VadeliBozmaCezası(TL)": float(early_break_penalty_total),
-            "VadeliFaizGeliri(TL)": float(td_interest),
-            "BankaKayıp(TL)": float(bank_loss),
-            "BankaBatışıKayıp(TL)": float(bankruptcy_loss),
-            "NakitHırsızlıkKayıp(TL)": float(theft_loss),
-            "DönemSonuNakit(TL)": float(end_cash),
-            "DönemSonuYatırım(TL)": float(end_inv),
-            "Borç(Anapara)(TL)": float(loan_outstanding_principal(p)),
-            "Borç(Görünüm)(TL)": float(end_total_debt_view),
-            "ToplamServet(TL)": float(end_total),
-            "BankaBatışı_Sayı": int(p.get("bankruptcies_seen", 0)),
-        })
-
-        # K) PGL update
-        if month < CFG["MONTHS"]:
-            next_rng = rng_for_player(name, month + 1)
-
-            pgl_prev = float(p["pgl_current"])
-            fixed_prev = float(p["fixed_current"])
-            extra_prev = float(p["extra_current"])
-
-            pgl_next, realized_delta = next_pgl(pgl_prev, next_rng)
-
-            fixed_next = float(max(0.0, fixed_prev * (1.0 + realized_delta)))
-            extra_next = float(max(0.0, extra_prev * (1.0 + realized_delta)))
-
-            p["pgl_current"] = float(pgl_next)
-            p["fixed_current"] = float(fixed_next)
-            p["extra_current"] = float(extra_next)
-
-            st.session_state.pgl_popup = {
-                "player": str(name),
-                "from_month": int(month),
-                "to_month": int(month + 1),
-                "pgl_prev": float(pgl_prev),
-                "pgl_new": float(pgl_next),
-                "step_used": float(realized_delta),
-                "fixed_prev": float(fixed_prev),
-                "fixed_new": float(fixed_next),
-                "extra_prev": float(extra_prev),
-                "extra_new": float(extra_next),
-            }
-
-        # L) ay ilerlet
-        if month >= CFG["MONTHS"]:
-            p["finished"] = True
+            st.caption(f"{NO_LOAN}: bankadan borç alınamaz.")
+
+        st.divider()
+
+        # 3) BORÇ ÖDEME
+        st.markdown(f"#### 3) Borç Ödeme ({SCN.unit} Sonu)")
+        due_now = float(loan_due_amount(p, month))
+        if due_now <= 0:
+            st.caption(f"Bu {STEP} vadesi gelen borç yok.")
         else:
-            p["month"] += 1
+            st.caption(f"Bu {STEP} vadesi gelen toplam ödeme: **{fmt_tl(due_now)}** (anapara + 1 {STEP} faizi)")
+            st.number_input(
+                f"Bu {STEP} ödemek zorunda olduğunuz tutar (TL)",
+                min_value=0.0,
+                max_value=float(due_now),
+                value=float(due_now),
+                step=1000.0,
+                key=f"repay_{name}_{month}",
+                disabled=True,
+            )
 
-        st.rerun()
+        st.divider()
+
+        # 4) İŞLEMLER
+        st.markdown("#### 4) İşlemler: Mevduat / Yatırım (TL)")
+        available_for_invest_preview = float(p["holdings"]["cash"]) + projected_sell_cash_in + income - total_exp + float(borrow_amt_input)
+        if not SCN.can_borrow(month):
+            available_for_invest_preview = max(0.0, available_for_invest_preview)
+        st.success(f"💰 Bu {STEP} kullanılabilir tahmini MAX nakit: **{fmt_tl(available_for_invest_preview)}**")
+        ticket_in = sum(float(v) for side in ("dd_in", "td_in") for v in (ticket or {}).get(side, {}).values())
+        if ticket_in > 0:
+            st.caption(f"Toplu mevduat emriyle yatırılacak: **{fmt_tl(ticket_in)}** (aşağıdaki işlemlerle birlikte bu nakitten düşülür)")
+
+        inv_inputs = {}
+        # girişlerin üst sınırı: bu ay bulunabilecek en fazla nakit (gönderimde gerçek limitle denetlenir)
+        max_buy = max(float(available_for_invest_preview),
+                      float(p["holdings"]["cash"]) + income + borrow_max + total_investments(p))
+
+        c1, c2 = st.columns(2)
+        with c1:
+            if "dd" in opened and SCN.bank_count(month) > 0:
+                inv_inputs["dd"] = safe_number_input(
+                    f"Vadesiz MEVDUAT (TL) | Komisyon {float(CFG['TX_FEE'])*100:.2f}%",
+                    f"buy_dd_{name}_{month}",
+                    max_buy,
+                    1000.0,
+                )
+            if "td" in opened and SCN.bank_count(month) > 0:
+                inv_inputs["td"] = safe_number_input(
+                    f"Vadeli MEVDUAT (TL) | Komisyon {float(CFG['TX_FEE'])*100:.2f}%",
+                    f"buy_td_{name}_{month}",
+                    max_buy,
+                    1000.0,
+                )
+            if "fx" in opened:
+                inv_inputs["fx"] = safe_number_input(
+                    f"Döviz (TL) | Komisyon {SCN.buy_rate['fx']*100:.2f}%",
+                    f"buy_fx_{name}_{month}",
+                    max_buy,
+                    1000.0,
+                )
+            if "pm" in opened:
+                inv_inputs["pm"] = safe_number_input(
+                    f"Metal (TL) | Komisyon {SCN.buy_rate['pm']*100:.2f}%",
+                    f"buy_pm_{name}_{month}",
+                    max_buy,
+                    1000.0,
+                )
+        with c2:
+            if "eq" in opened:
+                inv_inputs["eq"] = safe_number_input(
+                    f"Hisse (TL) | Komisyon {SCN.buy_rate['eq']*100:.2f}%",
+                    f"buy_eq_{name}_{month}",
+                    max_buy,
+                    1000.0,
+                )
+            if "cr" in opened:
+                inv_inputs["cr"] = safe_number_input(
+                    f"Kripto (TL) | Komisyon {SCN.buy_rate['cr']*100:.2f}%",
+                    f"buy_cr_{name}_{month}",
+                    max_buy,
+                    1000.0,
+                )
+
+        decisions = empty_decisions()
+        decisions["sell"] = {k: float(v) for k, v in sell_inputs.items()}
+        decisions["sell_dd_bank"] = sell_dd_bank
+        decisions["sell_dd_amt"] = float(sell_dd_amt)
+        decisions["sell_td_bank"] = sell_td_bank
+        decisions["sell_td_amt"] = float(sell_td_amt)
+        decisions["borrow"] = float(borrow_amt_input)
+        decisions["buy"] = {k: float(v) for k, v in inv_inputs.items()}
+        decisions["ticket"] = ticket
+
+        # 5) ÖNİZLEME
+        st.divider()
+        st.markdown(f"#### 5) {SCN.unit} Sonu Net Servet Önizlemesi ({montecarlo.PREVIEW_DRAWS} senaryo)")
+        mc_key = montecarlo.preview_key(p, decisions, get_market().bank_map(month), CFG)
+        mc = cached_month_preview(mc_key, _room.cfg_key, CFG)
+        q5, q25, q50, q75, q95 = mc["quantiles"]
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Kötü senaryo (%5)", fmt_tl(q5))
+        m2.metric("Medyan", fmt_tl(q50))
+        m3.metric("İyi senaryo (%95)", fmt_tl(q95))
+        m4.metric("Temerrüt olasılığı", fmt_pct(mc["p_default"]))
+        st.caption(f"Orta %50 aralığı: {fmt_tl(q25)} – {fmt_tl(q75)}. Hırsızlık, banka olayı/batışı ve piyasa getirisi "
+                   "olasılıklarıyla hesaplanır; gerçek sonuç farklı olabilir. Girişleri değiştirdikten sonra "
+                   "**🔄 Önizle** ile güncelleyin.")
+
+        st.divider()
+        btn_label = f"✅ {SCN.unit} {month}: Tamamla" if month < SCN.months else f"✅ {SCN.unit} {month}: Tamamla ve Bitir"
+
+        b1, b2 = st.columns([1, 2])
+        b1.form_submit_button("🔄 Önizle", use_container_width=True)
+        if b2.form_submit_button(btn_label, use_container_width=True, type="primary"):
+            errors = validate_decisions(p, decisions, CFG)
+            if errors:
+                st.error("Kararlar gönderilemedi:\n\n" + "\n".join(f"- {e}" for e in errors))
+            else:
+                try:
+                    events = commit_player(name, month, lambda q: settle_month(q, name, decisions, get_market(), metrics.REGISTRY))
+                except ValueError as e:
+                    st.session_state.conflict_note = str(e)
+                    st.rerun()
+                st.session_state.notices = [ev for ev in events if ev["type"] in NOTICE_BLOCKS]
+                prune_month_keys(name, int(st.session_state.players[name]["month"]))
+                st.rerun()
 
 # =========================
 # GRAFİK
 # =========================
 st.divider()
-st.subheader("📈 Toplam Servet (Net) — Aylar İçinde Değişim (Grafik)")
+st.subheader(f"📈 Toplam Servet (Net) — {UNITS} İçinde Değişim (Grafik)")
 
 if p["log"]:
-    df = pd.DataFrame(p["log"]).copy()
-    df_plot = df[["Ay", "ToplamServet(TL)"]].sort_values("Ay")
-    df_plot = df_plot.rename(columns={"ToplamServet(TL)": "Toplam Servet (Net) - TL"})
-    st.line_chart(df_plot.set_index("Ay")["Toplam Servet (Net) - TL"])
+    q = cached_wealth_quantiles(int(st.session_state.seed), _room.cfg_key, CFG)
+    st.altair_chart(views.wealth_chart(p["log"], q, QUANTILES, SCN.unit), use_container_width=True)
+    st.caption("Kırmızı çizgi: sizin net servetiniz. Mavi bantlar: aynı seed ve kurallarla oynayan "
+               "referans oyuncuların %5–%95 ve %25–%75 aralığı, kesikli çizgi: medyan.")
 else:
-    st.info("Grafiğin oluşması için en az 1 ayı tamamlayın.")
+    st.info(f"Grafiğin oluşması için en az 1 {STEP} tamamlayın.")
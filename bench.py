@@ -0,0 +1,306 @@
+"""
+Performans ölçümleri (mikro + makro) ve eşik kontrolü.
+
+    python -m bench run                          # bench_results.json
+    python -m bench run --out bench_baseline.json  # yeni referans (baseline) kaydet
+    python -m bench compare                      # bench_results.json'u bench_baseline.json ile karşılaştır
+    python -m bench compare --threshold 0.15     # %15'ten fazla yavaşlayanları işaretle (çıkış kodu 1)
+    python -m bench coldstart --runs 5           # yeni süreçte ilk oturumun ilk çizim süresi
+                                                 # (bench_coldstart.json: tembel pandas/altair öncesi/sonrası rapor)
+
+Her ölçüm medyan süreyi (çağrı başına saniye) yazar; karşılaştırma medyanlar üzerinden yapılır.
+Baseline aynı makinede alınmalıdır.
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from bots import player_view, td_ladder
+from engine import Market, CFG, choose_bankruptcy_for_player_month, month_draws, settle_month, rng_for_player
+import metrics
+from playerstore import PlayerStore, transact
+from sim import play_game
+import views
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = "bench_results.json"
+DEFAULT_BASELINE = os.path.join(HERE, "bench_baseline.json")
+SEED = 20260209
+
+# =========================
+# ÖLÇÜM
+# =========================
+def measure(fn, setup=None, repeat: int = 7, number: int = 50) -> dict:
+    """
+    fn(arg) çağrısını `repeat` tur x `number` kez ölçer; setup() her çağrıdan önce (süreye katılmadan) çalışır.
+    Sonuç: çağrı başına medyan/min saniye.
+    """
+    per_call = []
+    for _ in range(repeat):
+        args = [setup() for _ in range(number)] if setup else [None] * number
+        t0 = time.perf_counter()
+        for a in args:
+            fn(a)
+        per_call.append((time.perf_counter() - t0) / number)
+    return {"median_s": statistics.median(per_call), "min_s": min(per_call), "calls": repeat * number}
+
+def _player_at(month: int, market: Market, name: str = "Bench"):
+    """td_ladder botuyla `month` ayına kadar oynatılmış oyuncu."""
+    for p, _row, _ev in play_game(name, market, td_ladder):
+        if p["month"] >= month or p["finished"]:
+            return p
+    return p
+
+def _log_rows(n: int) -> list:
+    base = _player_at(CFG["MONTHS"] + 1, Market(SEED))["log"]
+    return [dict(base[i % len(base)], Ay=i + 1) for i in range(n)]
+
+# =========================
+# ÖLÇÜMLER
+# =========================
+def bench_banks_for_month_cold():
+    # her çağrı boş banka yoluyla başlar: ay 4..12 zinciri üretilir
+    def run(_):
+        m = Market(SEED)
+        for month in range(4, CFG["MONTHS"] + 1):
+            m.banks_for_month(month)
+    return measure(run, number=20)
+
+def bench_banks_for_month_warm():
+    m = Market(SEED)
+    for month in range(4, CFG["MONTHS"] + 1):
+        m.banks_for_month(month)
+    return measure(lambda _: m.banks_for_month(CFG["MONTHS"]), number=2000)
+
+def bench_banks_df():
+    m = Market(SEED)
+    for month in range(4, CFG["MONTHS"] + 1):
+        m.banks_for_month(month)
+    banks = m.banks_for_month(CFG["MONTHS"])
+    return measure(lambda _: views.banks_df(banks), number=50)
+
+def bench_choose_bankruptcy():
+    market = Market(SEED)
+    p = _player_at(7, market)
+    bank_map = market.bank_map(7)
+    draws = month_draws(rng_for_player("Bench", 7, SEED), len(bank_map))["bankruptcy"]
+    return measure(lambda _: choose_bankruptcy_for_player_month(p, 7, bank_map, draws), number=2000)
+
+def bench_settle_month():
+    market = Market(SEED)
+    p0 = _player_at(8, market)
+    decisions = td_ladder(player_view(p0, market))
+    return measure(lambda p: settle_month(p, "Bench", decisions, market), setup=lambda: copy.deepcopy(p0), number=500)
+
+def bench_settle_month_metered():
+    # aşama süreleri + olay sayaçları açık (uygulamadaki ve sim --metrics yolu)
+    market = Market(SEED)
+    p0 = _player_at(8, market)
+    decisions = td_ladder(player_view(p0, market))
+    reg = metrics.Registry()
+    return measure(lambda p: settle_month(p, "Bench", decisions, market, reg), setup=lambda: copy.deepcopy(p0),
+                   number=500)
+
+def bench_settle_month_shared():
+    # sürümlü paylaşılan kayıt üzerinden: kopya al + kapat (ölçümlü) + CAS ile yaz (uygulamadaki yol)
+    market = Market(SEED)
+    p0 = _player_at(8, market)
+    decisions = td_ladder(player_view(p0, market))
+    reg = metrics.Registry()
+    store = PlayerStore()
+    counter = iter(range(10**9))
+
+    def setup():
+        key = ("Bench", next(counter))
+        store.commit(key, 0, p0)
+        return key
+    return measure(lambda key: transact(store, key, lambda p: settle_month(p, "Bench", decisions, market, reg)),
+                   setup=setup, number=500)
+
+def bench_full_game():
+    market = Market(SEED)
+    counter = iter(range(10**9))
+
+    def run(_):
+        for _ in play_game(f"G{next(counter)}", market, td_ladder):
+            pass
+    return measure(run, number=100)
+
+def bench_log_frame_12():
+    rows = _log_rows(12)
+    return measure(lambda _: views.wealth_frame(rows), number=200)
+
+def bench_log_frame_1000():
+    rows = _log_rows(1000)
+    return measure(lambda _: views.wealth_frame(rows), number=20)
+
+def bench_app_rerun():
+    # kararlı durum: oda ve oyuncu oturumda hazır, ilk çalıştırma kaydı paylaşılan depoya yazar
+    from streamlit.testing.v1 import AppTest
+    from rooms import Room, load_rooms
+
+    room_name, spec = next(iter(load_rooms().items()))
+    room = Room(room_name, spec["seed"], spec["overrides"])
+    p = _player_at(8, room.market)
+    at = AppTest.from_file(os.path.join(HERE, "app.py"), default_timeout=60)
+    at.session_state["room"] = room_name
+    at.session_state["players"] = {"Bench": p}
+    at.session_state["player_name"] = "Bench"
+    at.run()
+    if at.exception or int(at.session_state["players"]["Bench"]["month"]) != int(p["month"]):
+        raise RuntimeError("app_rerun: oturum hazır oyuncuyla açılmadı")
+    return measure(lambda _: at.run(), repeat=5, number=5)
+
+BENCHES = {
+    "banks_for_month_cold": bench_banks_for_month_cold,
+    "banks_for_month_warm": bench_banks_for_month_warm,
+    "banks_df": bench_banks_df,
+    "choose_bankruptcy_for_player_month": bench_choose_bankruptcy,
+    "settle_month": bench_settle_month,
+    "settle_month_metered": bench_settle_month_metered,
+    "settle_month_shared": bench_settle_month_shared,
+    "full_game_12_months": bench_full_game,
+    "log_to_dataframe_12": bench_log_frame_12,
+    "log_to_dataframe_1000": bench_log_frame_1000,
+    "app_rerun_apptest": bench_app_rerun,
+}
+
+# =========================
+# SOĞUK BAŞLANGIÇ
+# =========================
+# Ayrı süreçte çalışır (modül önbelleği boş): sunucu yeni başladığında gelen ilk öğrenci ve hemen ardından ikincisi.
+COLDSTART_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+t2 = time.perf_counter()
+heavy = [m for m in ("pandas", "altair", "pyarrow") if m in sys.modules]
+at.text_input[0].set_value("Soguk").run()
+t3 = time.perf_counter()
+heavy_game = [m for m in ("pandas", "altair", "pyarrow") if m in sys.modules]
+at2 = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+at2.text_input[0].set_value("Ilik").run()
+t4 = time.perf_counter()
+print(json.dumps({"streamlit_import_ms": (t1 - t0) * 1e3, "first_render_ms": (t2 - t1) * 1e3,
+                  "game_screen_ms": (t3 - t2) * 1e3, "warm_session_ms": (t4 - t3) * 1e3,
+                  "heavy_at_first_render": heavy, "heavy_at_game_screen": heavy_game}))
+"""
+COLDSTART_FIELDS = ("streamlit_import_ms", "first_render_ms", "game_screen_ms", "warm_session_ms")
+
+def coldstart(runs: int = 5, app_path: str = None) -> dict:
+    """
+    runs kez yeni Python süreci: ilk çizim (ad sorusu), ilk oyun ekranı ve ısınmış süreçte yeni oturum (ms, medyan).
+    Öğrencinin gördüğü ilk çizim süresi = first_render_ms + game_screen_ms (streamlit içe aktarımı sunucu açılışındadır).
+    """
+    app_path = app_path or os.path.join(HERE, "app.py")
+    samples = []
+    for _ in range(int(runs)):
+        out = subprocess.run([sys.executable, "-c", COLDSTART_PROBE, app_path], capture_output=True, text=True,
+                             cwd=HERE, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    res = {f: statistics.median(s[f] for s in samples) for f in COLDSTART_FIELDS}
+    res["heavy_at_first_render"] = samples[-1]["heavy_at_first_render"]
+    res["heavy_at_game_screen"] = samples[-1]["heavy_at_game_screen"]
+    res["runs"] = len(samples)
+    return res
+
+# =========================
+# KOMUTLAR
+# =========================
+def run(names, out_path: str) -> dict:
+    results = {}
+    for name in names:
+        res = BENCHES[name]()
+        results[name] = res
+        print(f"{name:<38} {res['median_s'] * 1e6:>12.1f} µs (min {res['min_s'] * 1e6:.1f})")
+    doc = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+    print(f"-> {out_path}")
+    return doc
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Medyanı baseline'a göre `threshold` oranından fazla artan ölçümlerin listesi."""
+    regressions = []
+    print(f"{'ölçüm':<38} {'baseline µs':>12} {'şimdi µs':>12} {'oran':>7}")
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<38} {'-':>12} {cur['median_s'] * 1e6:>12.1f} {'yeni':>7}")
+            continue
+        ratio = cur["median_s"] / max(base["median_s"], 1e-12)
+        flag = ratio > 1.0 + threshold
+        if flag:
+            regressions.append(name)
+        print(f"{name:<38} {base['median_s'] * 1e6:>12.1f} {cur['median_s'] * 1e6:>12.1f} {ratio:>6.2f}x{'  ⚠️' if flag else ''}")
+    return regressions
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench", description="Performans ölçümleri ve regresyon kontrolü.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="ölçümleri çalıştır")
+    r.add_argument("--out", default=DEFAULT_RESULTS)
+    r.add_argument("--only", help="virgülle ayrılmış ölçüm adları")
+    c = sub.add_parser("compare", help="sonuçları baseline ile karşılaştır")
+    c.add_argument("--baseline", default=DEFAULT_BASELINE)
+    c.add_argument("--current", default=DEFAULT_RESULTS)
+    c.add_argument("--threshold", type=float, default=0.25, help="izin verilen yavaşlama oranı (0.25 = %%25)")
+    cs = sub.add_parser("coldstart", help="yeni süreçte ilk oturumun ilk çizim süresi (ms)")
+    cs.add_argument("--runs", type=int, default=5)
+    cs.add_argument("--out", help="sonucu JSON olarak yaz")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "coldstart":
+        res = coldstart(args.runs)
+        for f in COLDSTART_FIELDS:
+            print(f"{f:<38} {res[f]:>10.1f} ms")
+        print(f"{'ilk çizimde yüklü ağır modüller':<38} {', '.join(res['heavy_at_first_render']) or '-'}")
+        print(f"{'oyun ekranında yüklü ağır modüller':<38} {', '.join(res['heavy_at_game_screen']) or '-'}")
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(res, f, indent=2)
+        return 0
+
+    if args.cmd == "run":
+        names = [n.strip() for n in args.only.split(",")] if args.only else list(BENCHES)
+        unknown = [n for n in names if n not in BENCHES]
+        if unknown:
+            ap.error(f"bilinmeyen ölçüm: {', '.join(unknown)}")
+        run(names, args.out)
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} ölçümde %{args.threshold * 100:.0f} üzeri yavaşlama: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Bot stratejileri.
+
+Strateji, öğrencinin ekranda gördüklerini içeren bir görünümü (player_view) alıp
+karar ekranının topladığı kararları (engine.empty_decisions biçiminde) döndüren bir fonksiyondur:
+
+    def my_bot(view: dict) -> dict: ...
+
+Görünüm kopyadır; strateji oyuncu durumunu değiştiremez. Dış bir strateji
+"paket.modul:fonksiyon" biçiminde load_strategy ile yüklenebilir.
+"""
+import importlib
+import math
+from types import MappingProxyType
+
+from engine import (
+    RISK_ASSETS, Market, empty_decisions, loan_due_amount, sell_cost_rate, validate_decisions, settle_month,
+)
+
+# =========================
+# GÖRÜNÜM
+# =========================
+def readonly_cfg(scenario) -> MappingProxyType:
+    """Senaryo CFG'sinin yazmaya kapalı görünümü (iç tablolar dahil); Scenario zaten dondurulmuş tutar."""
+    return scenario.cfg
+
+def player_view(p: dict, market: Market) -> dict:
+    """Karar ekranında görünen bilgiler (ay, açık varlıklar, banka tablosu, varlıklar, borç, gelir, gider)."""
+    cfg = market.cfg
+    sc = market.scenario
+    month = int(p["month"])
+    income = sc.income(p["income_base"], month)
+    borrow_open = sc.can_borrow(month)
+    return {
+        "month": month,
+        "months": sc.months,
+        "open_assets": list(sc.open_assets[sc.row(month)]),
+        "banks": [dict(b) for b in market.banks_for_month(month)],
+        "holdings": dict(p["holdings"]),
+        "dd_accounts": dict(p.get("dd_accounts", {})),
+        "td_accounts": dict(p.get("td_accounts", {})),
+        "due_loans": float(loan_due_amount(p, month)),
+        "income": float(income),
+        "expenses": float(p["fixed_current"]) + float(p["extra_current"]),
+        "can_borrow": borrow_open,
+        "borrow_max": float(income * cfg["LOAN_MAX_MULT_INCOME"]) if borrow_open else 0.0,
+        "cfg": readonly_cfg(sc),
+    }
+
+def spare_cash(view: dict) -> float:
+    """Nakit + gelir - gider - vadesi gelen borç (tam TL'ye aşağı yuvarlanmış)."""
+    return float(math.floor(view["holdings"]["cash"] + view["income"] - view["expenses"] - view["due_loans"]))
+
+def cover_shortfall(view: dict, d: dict, shortfall: float):
+    """
+    Açığı kapatmak için sırayla riskli varlık, vadeli ve vadesiz satar.
+    Karar ekranında ayda bir vadeli + bir vadesiz banka seçilebildiği için en büyük bakiyeli hesaplar kullanılır.
+    """
+    cfg = view["cfg"]
+    need = float(shortfall)
+    for k in RISK_ASSETS:
+        if need <= 0:
+            return
+        bal = float(view["holdings"].get(k, 0.0))
+        if bal <= 0:
+            continue
+        keep = 1.0 - sell_cost_rate(k, cfg)
+        amt = min(bal, math.ceil(need / keep) + 1.0)
+        d["sell"][k] = float(amt)
+        need -= amt * keep
+    for acc, slot, keep in (
+        ("td_accounts", "sell_td", 1.0 - float(cfg["TX_FEE"]) - float(cfg["EARLY_BREAK_PENALTY"])),
+        ("dd_accounts", "sell_dd", 1.0 - float(cfg["TX_FEE"])),
+    ):
+        if need <= 0 or not view[acc]:
+            continue
+        bank, bal = max(view[acc].items(), key=lambda kv: kv[1])
+        if bal <= 0:
+            continue
+        amt = min(float(bal), math.ceil(need / keep) + 1.0)
+        d[slot + "_bank"] = bank
+        d[slot + "_amt"] = float(amt)
+        need -= amt * keep
+
+def _riskiest_open(view: dict):
+    open_risk = [k for k in RISK_ASSETS if k in view["open_assets"]]
+    if not open_risk:
+        return None
+    cfg = view["cfg"]
+    return max(open_risk, key=lambda k: float(cfg[f"{k.upper()}_SIG"]))
+
+# =========================
+# HAZIR BOTLAR
+# =========================
+def all_cash(view: dict) -> dict:
+    """Hiçbir kuruma güvenme: her şey nakitte."""
+    return empty_decisions()
+
+def td_ladder(view: dict) -> dict:
+    """
+    Artan nakdi her ay faiz sırasına göre sıradaki bankaya vadeli yatır (merdiven):
+    mevduat bankalara yayılır, tek banka batışının etkisi azalır.
+    """
+    d = empty_decisions()
+    spare = spare_cash(view)
+    if spare < 0:
+        cover_shortfall(view, d, -spare)
+        return d
+    if not view["banks"] or "td" not in view["open_assets"]:
+        return d
+    ranked = sorted(view["banks"], key=lambda b: b["TD_Rate"], reverse=True)
+    rung = ranked[view["month"] % len(ranked)]
+    d["td_bank"] = rung["Bank"]
+    if spare > 0:
+        d["buy"]["td"] = spare
+    return d
+
+def max_risk(view: dict) -> dict:
+    """Artan nakdi açık olan en oynak varlığa koy; piyasa kapalıyken vadeliye."""
+    d = empty_decisions()
+    spare = spare_cash(view)
+    if spare < 0:
+        cover_shortfall(view, d, -spare)
+        return d
+    target = _riskiest_open(view)
+    if target is None and "td" in view["open_assets"] and view["banks"]:
+        d["td_bank"] = max(view["banks"], key=lambda b: b["TD_Rate"])["Bank"]
+        target = "td"
+    if target and spare > 0:
+        d["buy"][target] = spare
+    return d
+
+def borrow_to_invest(view: dict) -> dict:
+    """
+    Her ay tavana kadar borç al, tamamını en oynak açık varlığa yatır.
+    Vadesi gelen borç yeni borçla çevrilir; piyasa kötü giderse temerrüt kaçınılmaz.
+    """
+    d = empty_decisions()
+    if view["can_borrow"] and view["banks"]:
+        d["loan_bank"] = min(view["banks"], key=lambda b: b["Loan_Rate"])["Bank"]
+        d["borrow"] = float(math.floor(view["borrow_max"]))
+    spare = spare_cash(view) + d["borrow"]
+    if spare < 0:
+        cover_shortfall(view, d, -spare)
+        return d
+    target = _riskiest_open(view)
+    if target is None and "td" in view["open_assets"] and view["banks"]:
+        d["td_bank"] = max(view["banks"], key=lambda b: b["TD_Rate"])["Bank"]
+        target = "td"
+    if target and spare > 0:
+        d["buy"][target] = spare
+    return d
+
+STRATEGIES = {
+    "all_cash": all_cash,
+    "td_ladder": td_ladder,
+    "max_risk": max_risk,
+    "borrow_to_invest": borrow_to_invest,
+}
+
+# =========================
+# OTOMATİK PİLOT (TALİMATLAR + İLERİ SARMA)
+# =========================
+def default_orders() -> dict:
+    """Talimat: aylık sabit vadeli tutarı, riskli varlık yüzdeleri (kalan nakde), vadesi gelen borcu çevirme."""
+    return {"td_amount": 0.0, "td_bank": None, "alloc": {k: 0.0 for k in RISK_ASSETS}, "rollover": False}
+
+def standing_orders(orders: dict):
+    """Talimatları her ay aynı kararı üreten bir stratejiye çevirir."""
+    def strategy(view: dict) -> dict:
+        d = empty_decisions()
+        spare = spare_cash(view)
+        if orders.get("rollover") and view["due_loans"] > 0 and view["can_borrow"] and view["banks"]:
+            d["borrow"] = float(min(math.ceil(view["due_loans"]), math.floor(view["borrow_max"])))
+            spare += d["borrow"]
+        if spare < 0:
+            cover_shortfall(view, d, -spare)
+            return d
+        names = [b["Bank"] for b in view["banks"]]
+        if "td" in view["open_assets"] and names and float(orders.get("td_amount") or 0.0) > 0:
+            amt = float(min(float(orders["td_amount"]), spare))
+            if amt > 0:
+                d["buy"]["td"] = amt
+                d["td_bank"] = orders.get("td_bank") if orders.get("td_bank") in names else None
+                spare -= amt
+        alloc = orders.get("alloc") or {}
+        for k in RISK_ASSETS:
+            pct = float(alloc.get(k, 0.0))
+            if k in view["open_assets"] and pct > 0 and spare > 0:
+                d["buy"][k] = float(math.floor(spare * min(pct, 1.0)))
+        # yüzdeler toplamı 1'i aşarsa alımlar kalan nakde orantılı küçültülür
+        total = sum(v for k, v in d["buy"].items() if k in RISK_ASSETS)
+        if total > spare > 0:
+            for k in RISK_ASSETS:
+                if k in d["buy"]:
+                    d["buy"][k] = float(math.floor(d["buy"][k] * spare / total))
+        return d
+    return strategy
+
+STOP_EVENTS = ("default", "bankruptcy")
+
+def fast_forward(p: dict, name: str, market: Market, strategy, months: int, registry=None):
+    """
+    En fazla `months` ayı arka arkaya kapatır (p yerinde güncellenir); registry settle_month'a iletilir.
+    Dönen (olaylar, durma nedeni): temerrüt/batış olayında, geçersiz kararda ya da oyun bitince erken durur.
+    """
+    events = []
+    for _ in range(int(months)):
+        if p["finished"]:
+            return events, "finished"
+        d = strategy(player_view(p, market))
+        errors = validate_decisions(p, d, market.cfg)
+        if errors:
+            return events, "; ".join(errors)
+        month_events = settle_month(p, name, d, market, registry)
+        events.extend(month_events)
+        stops = [ev["type"] for ev in month_events if ev["type"] in STOP_EVENTS]
+        if stops:
+            # batışın ardından gelen temerrüt oyunu bitirir: neden temerrüttür
+            return events, "default" if "default" in stops else stops[0]
+    return events, "finished" if p["finished"] else None
+
+def load_strategy(spec: str):
+    """Hazır bot adı ya da "paket.modul:fonksiyon"."""
+    if spec in STRATEGIES:
+        return STRATEGIES[spec]
+    mod_name, sep, fn_name = str(spec).partition(":")
+    if not sep:
+        raise ValueError(f"Bilinmeyen strateji: {spec} (hazır botlar: {', '.join(sorted(STRATEGIES))})")
+    fn = getattr(importlib.import_module(mod_name), fn_name, None)
+    if not callable(fn):
+        raise ValueError(f"Strateji bulunamadı: {spec}")
+    return fn
@@ -0,0 +1,101 @@
+"""
+Süreç içi yayınla/abone ol (pub/sub) olay yolu.
+
+Her abonenin konu başına sınırlı bir kuyruğu vardır (deque(maxlen)); dolunca en eski olay düşer.
+Oturum kendi kuyruğunu bir sonraki yeniden çalıştırmada boşaltır (drain); global durum taranmaz.
+Uzun süre drain etmeyen aboneler (kapanmış sekmeler) o konudaki subscribe/drain/publish sırasında silinir.
+
+Arka uç değiştirilebilir: aşağıdaki dört metodu (subscribe, unsubscribe, publish, drain) sağlayan
+her nesne Bus'a verilebilir. LocalBackend tek süreçlik yerel karşılıktır; çok süreçli kurulumda
+aynı arayüzle gerçek bir aracı (broker) kullanan bir arka uç yazılır.
+"""
+import collections
+import itertools
+import threading
+import time
+
+DEFAULT_QUEUE_LEN = 50
+DEFAULT_IDLE_TTL = 6 * 3600  # sn; bu süre drain etmeyen abone silinir (kapanmış sekmeler)
+
+class LocalBackend:
+    """Tek süreçlik arka uç: konu -> abone -> sınırlı deque. Bütün metotlar iş parçacığı güvenlidir."""
+
+    def __init__(self, maxlen: int = DEFAULT_QUEUE_LEN, idle_ttl: float = DEFAULT_IDLE_TTL):
+        self.maxlen = int(maxlen)
+        self.idle_ttl = float(idle_ttl)
+        self._lock = threading.Lock()
+        self._queues = {}     # konu -> {abone: deque}
+        self._last_seen = {}  # (konu, abone) -> son drain zamanı
+        self.dropped = 0      # dolu kuyruktan düşen olay sayısı
+
+    def _prune(self, topic: str, now: float):
+        """idle_ttl boyunca drain etmeyen aboneleri siler (kilit altında çağrılır); boş konu da silinir."""
+        subs = self._queues.get(topic)
+        if subs is None:
+            return
+        for sub_id in [s for s in subs if now - self._last_seen.get((topic, s), now) > self.idle_ttl]:
+            del subs[sub_id]
+            self._last_seen.pop((topic, sub_id), None)
+        if not subs:
+            del self._queues[topic]
+
+    def subscribe(self, topic: str, sub_id: str):
+        now = time.monotonic()
+        with self._lock:
+            self._queues.setdefault(topic, {}).setdefault(sub_id, collections.deque(maxlen=self.maxlen))
+            self._last_seen[(topic, sub_id)] = now
+            self._prune(topic, now)
+
+    def unsubscribe(self, topic: str, sub_id: str):
+        with self._lock:
+            self._queues.get(topic, {}).pop(sub_id, None)
+            self._last_seen.pop((topic, sub_id), None)
+
+    def publish(self, topic: str, event: dict) -> int:
+        """Olayı konunun bütün abonelerine ekler; ulaşılan abone sayısını döndürür."""
+        now = time.monotonic()
+        with self._lock:
+            self._prune(topic, now)
+            subs = self._queues.get(topic, {})
+            for q in subs.values():
+                if len(q) == q.maxlen:
+                    self.dropped += 1
+                q.append(event)
+            return len(subs)
+
+    def drain(self, topic: str, sub_id: str) -> list:
+        now = time.monotonic()
+        with self._lock:
+            q = self._queues.get(topic, {}).get(sub_id)
+            if q is None:
+                return []
+            self._last_seen[(topic, sub_id)] = now
+            self._prune(topic, now)
+            if not q:
+                return []
+            out = list(q)
+            q.clear()
+            return out
+
+class Bus:
+    """Olaylara sıra numarası ve zaman damgası ekleyip arka uca iletir."""
+
+    def __init__(self, backend=None):
+        self.backend = LocalBackend() if backend is None else backend
+        self._seq = itertools.count(1)
+
+    def subscribe(self, topic: str, sub_id: str):
+        self.backend.subscribe(topic, sub_id)
+
+    def unsubscribe(self, topic: str, sub_id: str):
+        self.backend.unsubscribe(topic, sub_id)
+
+    def publish(self, topic: str, event: dict) -> int:
+        return self.backend.publish(topic, {**event, "seq": next(self._seq), "ts": time.time()})
+
+    def drain(self, topic: str, sub_id: str) -> list:
+        return self.backend.drain(topic, sub_id)
+
+def class_topic(room: str) -> str:
+    """Odanın (sınıfın) duyuru konusu; aynı seed'i kullanan iki oda birbirinin duyurusunu görmez."""
+    return f"class:{room}"
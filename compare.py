@@ -0,0 +1,342 @@
+"""
+İki stratejinin varyans azaltmalı karşılaştırması: E[net servet(A) - net servet(B)] için güven aralığı.
+
+    python -m compare td_ladder max_risk --half-width 250 --workers 8
+    python -m compare all_cash td_ladder --seeds 4 --json sonuc.json
+    python -m compare td_ladder max_risk --random-worlds --antithetic --rel 0.05
+
+Bağımsız oyunlarda iki strateji arasındaki fark hırsızlık, banka batışı ve FGD gürültüsünün altında
+kalır. Birim = bir oyuncu (ad) ve dünyası (seed); her birimde:
+- ortak rastgele sayılar: iki strateji aynı seed ve adla oynar. Ayın çekilişleri akışta sabit sırada
+  olduğundan (engine.month_draws) iki oyun aynı sayıları görür;
+- kontrol değişkenleri: oyuncunun beklentisi bilinen girdileri (hırsızlık ayları, aylık hırsızlık,
+  batış ve küçük olay çekilişleri, FGD adımları) üzerine regresyon düzeltmesi;
+- karşıt piyasa (--random-worlds --antithetic): her birim kendi seed'inde oynar ve ayna getirili piyasada
+  (Market(antithetic=True)) bir kez daha; getiri şokları da kontrol değişkeni olur.
+Varsayılan hedef verilen dünyalardır (oda ya da turnuva seed'leri, --seed/--seeds): fiyatlar orada sabittir,
+birimler dünyalara eşit dağılır ve tahmin dünya içi (tabakalı) yapılır.
+Birimler partiler halinde eklenir; farkın güven aralığı yarı genişliği hedefe inince durulur.
+
+Kazanç stratejiye bağlıdır; estimate'in aynı örnekten kestirdiği "gain" iyimserdir. Tek dünyada ölçülen
+(python -m compare A B --measure-gain 30 --batch 1000; 30 tekrar x 2000 oyun, bağımsız oyunlara göre
+aynı kesinlik için oyun oranı): td_ladder/max_risk 7.8x (kontrolsüz 7.6x), all_cash/td_ladder 10.6x
+(kontrolsüz 1.0x), borrow_to_invest/max_risk 1.6x.
+
+Öğrencinin kendi oyunu tek bir birimdir: aynı ad ve odanın piyasasında oynanan bot (benchmark_wealth)
+birebir aynı dünyayı görür, fark gürültüsüzdür.
+"""
+import argparse
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from bots import STRATEGIES, load_strategy
+from sim import player_name, play_game, parse_overrides
+from engine import (
+    Market, Scenario, cfg_with_overrides, scenario_overrides, net_wealth, new_player, rng_for_player,
+    month_draws, signed_pgl_step,
+)
+
+# =========================
+# BİRİM
+# =========================
+def unit_seed(base: int, i: int, months: int) -> int:
+    """
+    --random-worlds'te i. birimin seed'i. rng_for_player(ad, ay, seed) = ad özeti (< 10000) + ay*1000 + seed
+    olduğundan ardışık seed'ler başka birimin başka ayıyla aynı akışı verebilir; adım bu aralıktan geniş tutulur.
+    """
+    return int(base) + int(i) * (10000 + 1000 * (int(months) + 1))
+
+def benchmark_wealth(name: str, market: Market, strategy) -> float:
+    """Botun aynı ad ve piyasadaki (aynı hırsızlık, batış, FGD ve fiyatlar) son net serveti."""
+    p = None
+    for p, _row, _events in play_game(name, market, strategy):
+        pass
+    return net_wealth(p)
+
+def player_controls(market: Market, name: str) -> list:
+    """
+    Oyuncunun stratejiden bağımsız, beklentisi 0 olan girdileri; ay başına: kesin hırsızlık ayı mı (- c/AY),
+    şiddet sapması, rastgele hırsızlık tetiği (- olasılık), tetik x şiddet sapması; bankalar açıksa batış
+    seçimi (- 1/2) ve banka başına küçük olay tetikleri (- olasılık); FGD adımı. Servet bunlara aydan aya ve
+    bankadan bankaya farklı ağırlıkla bağlıdır (nakit birikir, mevduat belirli bankalardadır).
+    """
+    sc, cfg = market.scenario, market.cfg
+    months = sc.months
+    theft_months = set(new_player(name, market.seed, cfg)["theft_months"])
+    share = len(theft_months) / months
+    sev_mean = (float(cfg["CASH_THEFT_SEV_MIN"]) + float(cfg["CASH_THEFT_SEV_MAX"])) / 2.0
+    cols = []
+    for month in range(1, months + 1):
+        draws = month_draws(rng_for_player(name, month, market.seed), sc.bank_count(month), cfg)
+        sure = float(month in theft_months)
+        p = float(sc.theft_prob[sc.row(month)])
+        hit = float(draws["theft"] < p)
+        dev = draws["severity"] - sev_mean
+        cols += [sure - share, sure * dev, hit - p, hit * dev]
+        if "incident" in draws:
+            cols.append(draws["bankruptcy"][1] - 0.5)
+            cols += ((draws["incident"] < sc.incident_prob) - sc.incident_prob).ravel().tolist()
+    if market.pgl_path() is None:
+        cols += [signed_pgl_step(rng_for_player(name, month + 1, market.seed), cfg) for month in range(1, months)]
+    return cols
+
+def market_controls(market: Market, antithetic: bool) -> list:
+    """
+    Getiri şokları: varlık başına S = Σz/√T ve S² - 1 (beklenti 0). Karşıt çiftte S birbirini götürür,
+    yalnızca S² - 1 kalır. Tarihsel pencerede piyasa rastgele değildir.
+    """
+    z = market.return_shocks()
+    if z is None:
+        return []
+    s = z.sum(axis=0) / np.sqrt(z.shape[0])
+    return ([] if antithetic else list(s)) + list(s * s - 1.0)
+
+_WORKER_SCENARIOS = {}
+
+def _scenario_for(overrides: dict) -> Scenario:
+    key = json.dumps(overrides, sort_keys=True)
+    if key not in _WORKER_SCENARIOS:
+        _WORKER_SCENARIOS[key] = Scenario(cfg_with_overrides(overrides))
+    return _WORKER_SCENARIOS[key]
+
+_WORKER_MARKETS = {}
+
+def _world(seed: int, sc: Scenario) -> Market:
+    # sabit dünyalar işçi başına bir kez kurulur (banka yolu ve fiyatlar bütün birimlerde ortak)
+    key = (int(seed), sc.key)
+    if key not in _WORKER_MARKETS:
+        _WORKER_MARKETS[key] = Market(seed, sc)
+    return _WORKER_MARKETS[key]
+
+def play_units(job: tuple):
+    """
+    job = (strateji A, strateji B, seed'ler, overrides, başlangıç, bitiş, random_worlds, antithetic).
+    i. birim: oyuncu player_name(i); dünyası seed'ler[i % len] ya da (random_worlds) unit_seed(seed'ler[0], i).
+    Dönen (servet (n, ikiz, 2), kontroller (n, q)); ikiz 0 = asıl piyasa, 1 = ayna piyasa.
+    """
+    a, b, seeds, overrides, start, stop, random_worlds, antithetic = job
+    sc = _scenario_for(overrides)
+    strategies = (load_strategy(a), load_strategy(b))
+    twins = (False, True) if random_worlds and antithetic else (False,)
+    wealth = np.empty((stop - start, len(twins), 2), dtype=np.float64)
+    ctrl = []
+    for j, i in enumerate(range(start, stop)):
+        name = player_name(i)
+        for t, mirror in enumerate(twins):
+            if random_worlds:
+                market = Market(unit_seed(seeds[0], i, sc.months), sc, antithetic=mirror)
+            else:
+                market = _world(seeds[i % len(seeds)], sc)
+            for k, strategy in enumerate(strategies):
+                wealth[j, t, k] = benchmark_wealth(name, market, strategy)
+            if not mirror:
+                ctrl.append(player_controls(market, name)
+                            + (market_controls(market, len(twins) > 1) if random_worlds else []))
+    return wealth, np.array(ctrl, dtype=np.float64).reshape(stop - start, -1)
+
+# =========================
+# TAHMİN
+# =========================
+def _within(v: np.ndarray, strata: np.ndarray, k: int) -> np.ndarray:
+    """v'den tabaka (dünya) ortalamaları çıkarılmış hali."""
+    if k == 1:
+        return v - v.mean(axis=0)
+    means = np.stack([v[strata == s].mean(axis=0) for s in range(k)])
+    return v - means[strata]
+
+def estimate(wealth: np.ndarray, ctrl: np.ndarray, level: float = 0.95, control: bool = True,
+             strata: np.ndarray = None) -> dict:
+    """
+    Farkın ortalaması ve güven aralığı. strata (birim başına dünya sırası) verilirse varyanslar dünya
+    içidir; birimler dünyalara eşit dağıldığından düz ortalama tabakalı ortalamadır. Kontrol katsayıları
+    birimlerden en küçük kareler ile kestirilir (kontrollerin gerçek ortalaması 0). Katsayı kestirimi
+    varyansı (n-2)/(n-q-2) kat büyütür; birim sayısı kontrol sayısının 5 katından azsa kontroller kullanılmaz.
+    gain: aynı kesinlik için bağımsız oyunlara (A ve B farklı oyuncularda) göre kaç kat az oyun gerektiği;
+    ortak rastgele sayı, + karşıt piyasa (varsa) ve + kontrol değişkenleri ayrı ayrı.
+    """
+    n, twins = wealth.shape[0], wealth.shape[1]
+    strata = np.zeros(n, dtype=int) if strata is None else np.asarray(strata)
+    k = int(strata.max()) + 1 if n else 1
+    dof = max(n - k, 1)
+    diff = (wealth[:, :, 0] - wealth[:, :, 1]).mean(axis=1)
+    x = ctrl[:, ctrl.std(axis=0) > 0] if control else ctrl[:, :0]
+    if n < 5 * x.shape[1]:
+        x = x[:, :0]
+    q = x.shape[1]
+    dc, xc = _within(diff, strata, k), _within(x, strata, k)
+    beta = np.linalg.lstsq(xc, dc, rcond=None)[0] if q else np.zeros(0)
+    est = float(diff.mean() - x.mean(axis=0) @ beta)
+    resid = dc - xc @ beta
+    var_unit = float(resid @ resid) / max(dof - q, 1) * (max(n - 2, 1) / max(n - q - 2, 1) if q else 1.0)
+    half = statistics.NormalDist().inv_cdf(0.5 + level / 2.0) * float(np.sqrt(var_unit / max(n, 1)))
+
+    # oyun sayısı x birim başı varyans: aynı kesinlik için gereken oyun sayısıyla orantılı
+    def var(v):
+        w = _within(v, strata, k)
+        return float(w @ w) / dof
+
+    games = 2 * twins
+    cost = {
+        "independent": 2.0 * (var(wealth[:, 0, 0]) + var(wealth[:, 0, 1])),
+        "crn": 2.0 * var(wealth[:, 0, 0] - wealth[:, 0, 1]),
+    }
+    if twins > 1:
+        cost["crn_antithetic"] = games * var(diff)
+    if q:
+        cost["crn_antithetic_cv" if twins > 1 else "crn_cv"] = games * var_unit
+    return {
+        "diff": est,
+        "ci": [est - half, est + half],
+        "half_width": half,
+        "level": level,
+        "units": int(n),
+        "games": int(n * games),
+        "mean_a": float(wealth[:, :, 0].mean()),
+        "mean_b": float(wealth[:, :, 1].mean()),
+        "controls": int(q),
+        "gain": {k: cost["independent"] / max(v, 1e-12) for k, v in cost.items()},
+    }
+
+def measure_gain(a: str, b: str, seed: int, overrides: dict = None, units: int = 200, reps: int = 20,
+                 control: bool = True) -> dict:
+    """
+    Kazancın doğrudan ölçümü (estimate'in "gain" alanı ise aynı örnekten kestirimdir): reps tekrarın her biri
+    aynı oyun bütçesiyle (2 x units oyun) iki tahmin üretir: ortak rastgele sayı (+ kontrol) ve bağımsız oyunlar
+    (A ve B ayrı oyuncularda). Tahminlerin tekrarlar arası varyans oranı, aynı kesinlik için gereken oyun
+    sayısı oranıdır. Tekrarlar ayrı ad bloklarında oynar; seed sabit dünyadır.
+    """
+    overrides = overrides or {}
+    paired, independent = [], []
+    for r in range(max(int(reps), 2)):
+        start = 2 * int(units) * r
+        w, c = play_units((a, b, (int(seed),), overrides, start, start + units, False, False))
+        paired.append(estimate(w, c, control=control)["diff"])
+        w2, _ = play_units((a, b, (int(seed),), overrides, start + units, start + 2 * units, False, False))
+        independent.append(float(w[:, 0, 0].mean() - w2[:, 0, 1].mean()))
+    var_paired = statistics.variance(paired)
+    var_independent = statistics.variance(independent)
+    return {"a": a, "b": b, "seed": int(seed), "units": int(units), "reps": len(paired),
+            "diff_paired": statistics.fmean(paired), "diff_independent": statistics.fmean(independent),
+            "var_paired": var_paired, "var_independent": var_independent,
+            "gain": var_independent / max(var_paired, 1e-12)}
+
+def run_compare(a: str, b: str, seeds, overrides: dict = None, half_width: float = 250.0, rel: float = None,
+                level: float = 0.95, batch: int = 200, min_units: int = 400, max_units: int = 20000,
+                random_worlds: bool = False, antithetic: bool = False, control: bool = True, workers: int = 1) -> dict:
+    """
+    Birimleri `batch`'lik partilerle ekler; yarı genişlik half_width'e (rel verilirse |fark| x rel'e) inince
+    ya da max_units'e ulaşınca durur. Parti dünyalara eşit bölünür ve işçi sayısından bağımsızdır
+    (sonuç tekrarlanabilir).
+    """
+    overrides = overrides or {}
+    seeds = tuple(int(s) for s in seeds)
+    k = 1 if random_worlds else len(seeds)
+    batch = -(-max(int(batch), 1) // k) * k
+    max_units = max(int(max_units) // k, 1) * k
+    chunk = max(-(-batch // max(workers, 1)), 1)
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    wealth, ctrl = [], []
+    res = None
+    try:
+        n = 0
+        while n < max_units:
+            stop = min(n + batch, max_units)
+            jobs = [(a, b, seeds, overrides, s, min(s + chunk, stop), random_worlds, antithetic)
+                    for s in range(n, stop, chunk)]
+            for w, c in (pool.imap(play_units, jobs) if pool else map(play_units, jobs)):
+                wealth.append(w)
+                ctrl.append(c)
+            n = stop
+            if n < min(min_units, max_units):
+                continue
+            res = estimate(np.concatenate(wealth), np.concatenate(ctrl), level, control, np.arange(n) % k)
+            if res["half_width"] <= (abs(res["diff"]) * rel if rel else half_width):
+                break
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    if res is None or res["units"] != n:
+        res = estimate(np.concatenate(wealth), np.concatenate(ctrl), level, control, np.arange(n) % k)
+    res.update({"a": a, "b": b, "seeds": list(seeds), "random_worlds": bool(random_worlds)})
+    return res
+
+# =========================
+# KOMUT
+# =========================
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m compare",
+                                 description="İki stratejiyi ortak rastgele sayılar ve kontrol değişkenleriyle karşılaştırır.")
+    ap.add_argument("a", help=f"hazır bot ({', '.join(sorted(STRATEGIES))}) ya da paket.modul:fonksiyon")
+    ap.add_argument("b", help="karşılaştırılan ikinci strateji")
+    ap.add_argument("--seed", type=int, default=20260209, help="ilk seed")
+    ap.add_argument("--seeds", type=int, default=1, help="dünya sayısı (seed, seed+1, ...); birimler sırayla dağılır")
+    ap.add_argument("--random-worlds", action="store_true",
+                    help="her birim kendi seed'inde (dünyalar üzerinden beklenti)")
+    ap.add_argument("--antithetic", action="store_true",
+                    help="--random-worlds'te her birimi ayna getirili piyasada da oynat (piyasaya açık stratejiler için)")
+    ap.add_argument("--no-control", action="store_true", help="kontrol değişkenlerini kapat")
+    ap.add_argument("--half-width", type=float, default=250.0, help="hedef güven aralığı yarı genişliği (TL)")
+    ap.add_argument("--rel", type=float, help="hedef yarı genişlik farkın bu oranı (ör. 0.05); --half-width yerine")
+    ap.add_argument("--level", type=float, default=0.95, help="güven düzeyi")
+    ap.add_argument("--batch", type=int, default=200, help="her adımda eklenen birim sayısı")
+    ap.add_argument("--min-units", type=int, default=400)
+    ap.add_argument("--max-units", type=int, default=20000)
+    ap.add_argument("--scenario", metavar="DOSYA", help="senaryo dosyası (.toml/.json); --set değerleri bunun üstüne yazılır")
+    ap.add_argument("--set", dest="overrides", action="append", metavar="KEY=VALUE", help="CFG değişikliği")
+    ap.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    ap.add_argument("--measure-gain", type=int, metavar="TEKRAR",
+                    help="kazancı tekrarlarla doğrudan ölç (her tekrar --batch birim); karşılaştırma yapılmaz")
+    ap.add_argument("--json", dest="json_out", help="sonucu JSON olarak bu dosyaya da yaz")
+    args = ap.parse_args(argv)
+
+    try:
+        overrides = {**(scenario_overrides(args.scenario) if args.scenario else {}), **parse_overrides(args.overrides)}
+        Scenario(cfg_with_overrides(overrides))
+        load_strategy(args.a)
+        load_strategy(args.b)
+    except (OSError, ValueError, KeyError, ImportError) as e:
+        ap.error(str(e))
+
+    if args.measure_gain:
+        t0 = time.perf_counter()
+        res = measure_gain(args.a, args.b, args.seed, overrides, max(args.batch, 1), args.measure_gain,
+                           not args.no_control)
+        print(f"{args.a} - {args.b}: {res['reps']} tekrar x {2 * res['units']} oyun, "
+              f"{time.perf_counter() - t0:.1f} sn")
+        print(f"  tahmin varyansı: bağımsız {res['var_independent']:,.0f}, eşli {res['var_paired']:,.0f}")
+        print(f"  ölçülen kazanç: {res['gain']:.1f}x")
+        if args.json_out:
+            with open(args.json_out, "w", encoding="utf-8") as f:
+                json.dump({**res, "overrides": overrides}, f, ensure_ascii=False, indent=2)
+        return 0
+
+    seeds = [args.seed + i for i in range(max(args.seeds, 1))]
+    t0 = time.perf_counter()
+    res = run_compare(args.a, args.b, seeds, overrides, args.half_width, args.rel, args.level,
+                      args.batch, max(args.min_units, 1), max(args.max_units, 1), args.random_worlds,
+                      args.antithetic, not args.no_control, max(args.workers, 1))
+    res["elapsed_sec"] = time.perf_counter() - t0
+
+    lo, hi = res["ci"]
+    print(f"{args.a} - {args.b}: {res['diff']:,.0f} TL  (%{res['level'] * 100:.0f} GA {lo:,.0f} .. {hi:,.0f}, "
+          f"±{res['half_width']:,.0f})")
+    print(f"ortalama net servet: {args.a} {res['mean_a']:,.0f} TL, {args.b} {res['mean_b']:,.0f} TL")
+    print(f"{res['units']} birim, {res['games']} oyun, {res['controls']} kontrol, {res['elapsed_sec']:.2f} sn")
+    print("aynı kesinlik için bağımsız oyunlara göre kazanç:")
+    for k, g in res["gain"].items():
+        print(f"  {k:<20} {g:>8.1f}x")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({**res, "overrides": overrides}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Bankalar arası bulaşma (sistemik risk modu).
+
+Her ay için bankalar arası alacak ağı seyrek (COO) dizilerle tutulur: rows[e] borç veren,
+cols[e] borç alan banka, vals[e] alacak tutarı (borç verenin sermayesi cinsinden).
+Bir batış, borç verenlere LGD x alacak kadar zarar yazdırır; zararı sermayesini aşan banka da batar.
+Sabit noktaya kadar tekrarlanır; her tur tek bir np.bincount (seyrek matris-vektör çarpımı),
+en fazla n tur sürer. Streamlit ve oyun motorundan bağımsızdır.
+"""
+import numpy as np
+
+
+def exposure_network(n: int, rng: np.random.Generator, degree: int, exposure: float):
+    """
+    n banka, her banka `degree` farklı bankaya borç verir (kendine değil).
+    Dönen (rows, cols, vals) seyrek alacak matrisidir. Karşı taraflar iadesiz çekilir: her satırda
+    1..n-1 kaydırmalarının rastgele bir permütasyonunun ilk `degree` tanesi.
+    """
+    degree = int(min(max(degree, 0), max(n - 1, 0)))
+    if n < 2 or degree == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0)
+    rows = np.repeat(np.arange(n), degree)
+    offsets = np.argsort(rng.random((n, n - 1)), axis=1)[:, :degree] + 1
+    cols = (rows + offsets.ravel()) % n
+    vals = float(exposure) * rng.uniform(0.5, 1.5, size=rows.size)
+    return rows, cols, vals
+
+def cascade(rows: np.ndarray, cols: np.ndarray, vals: np.ndarray, capital: np.ndarray,
+            initial: np.ndarray, lgd: float) -> np.ndarray:
+    """
+    initial (bool, n) batışından başlayıp bulaşmayı sabit noktaya kadar yürütür.
+    Dönen bool dizi batan bankaların tamamıdır (initial dahil).
+    """
+    n = capital.size
+    failed = np.asarray(initial, dtype=bool).copy()
+    if rows.size == 0:
+        return failed
+    for _ in range(n):
+        loss = np.bincount(rows, weights=vals * failed[cols], minlength=n) * float(lgd)
+        nxt = failed | (loss >= capital)
+        if np.array_equal(nxt, failed):
+            break
+        failed = nxt
+    return failed
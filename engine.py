@@ -0,0 +1,1463 @@
+"""
+Oyun kuralları (Streamlit'ten bağımsız).
+
+app.py arayüzü bu modüldeki kuralları çağırır; komut satırı simülasyonu (sim.py)
+aynı kuralları tarayıcı açmadan çalıştırır.
+"""
+import base64
+import binascii
+import bisect
+import hashlib
+import itertools
+import json
+import struct
+import zlib
+from collections.abc import Mapping
+from types import MappingProxyType
+
+import numpy as np
+
+import contagion
+import metrics
+import stress
+
+# =========================
+# SABİT (ÖĞRENCİ DEĞİŞTİREMEZ)
+# =========================
+DEFAULT_MONTHLY_INCOME = 60000
+START_FIXED_COST = 30000
+START_EXTRA_COST = 5000
+
+# ✅ Vergi dilimi etkisi: 2. aydan itibaren gelir her ay %5 azalır
+TAX_DROP_RATE = 0.05
+
+
+# =========================
+# OYUN PARAMETRELERİ
+# =========================
+CFG = {
+    "MONTHS": 12,
+
+    # Ufuk: "ay" oyunun bir adımıdır. Haftalık oyunda STEP_UNIT="Hafta", STEP_SCALE=12/52 verilir;
+    # oran ve olasılıklar adım başınadır, başlangıç gelir/giderleri STEP_SCALE ile ölçeklenir.
+    "STEP_UNIT": "Ay",
+    "STEP_SCALE": 1.0,
+    "TAX_DROP_STEPS": 11,         # gelirin kaç adım boyunca düştüğü (sonra sabit kalır)
+
+    # Aşamalar: başladıkları ay
+    "BANK_STAGE_FROM": 4,         # bankalar + mevduat
+    "HEDGE_STAGE_FROM": 6,        # döviz + kıymetli metal
+    "MARKET_STAGE_FROM": 8,       # hisse + kripto
+    "BANKS_START": 2,             # bankalar açıldığında banka sayısı (sonra her ay +1)
+    "BANKS_MAX": 8,
+
+    # FGD
+    "PGL_MIN_STEP": 0.01,
+    "PGL_MAX_STEP": 0.05,
+    "PGL_FLOOR": 0.01,
+    "PGL_CAP": 0.05,
+
+    "LOAN_ACTIVE_FROM_MONTH": 4,
+
+    # Nakit hırsızlığı
+    "CASH_THEFT_PROB_STAGE1": 0.12,
+    "CASH_THEFT_PROB_STAGE2": 0.05,
+    "CASH_THEFT_SEV_MIN": 0.10,
+    "CASH_THEFT_SEV_MAX": 0.35,
+
+    # Küçük banka olayı
+    "BANK_INCIDENT_PROB": 0.02,
+
+    # ✅ Banka BATIŞI (oyuncu bazlı, para varsa batış olur)
+    "BANKRUPTCY_EXTRA_PROB_AFTER_MIN": 0.05,  # min 2 sonrası ek batış ihtimali
+    "BANKRUPTCY_MIN_EVENTS_PER_PLAYER": 2,    # ✅ KESİN: her oyuncu için en az 2 batış
+    "BANKRUPTCY_FORCE_START_MONTH": 5,        # 4. ayda mevduat yeni oluşuyor; 5'ten itibaren zorlamayı başlatmak daha mantıklı
+    "BANKRUPTCY_FORCE_END_MONTH": 11,         # 12'de kapatma yerine önceki aylarda tamamla
+
+    # Banka faiz/güvence
+    "TD_RATE_MIN": 0.0070,
+    "TD_RATE_MAX": 0.0140,
+    "GUAR_MIN": 0.70,
+    "GUAR_MAX": 0.99,
+
+    # Kredi
+    "LOAN_RATE_BASE": 0.018,
+    "LOAN_RATE_ADD": 0.030,
+    "LOAN_RATE_NOISE": 0.002,
+    "LOAN_MAX_MULT_INCOME": 3.0,
+
+    # Komisyon/ceza
+    "EARLY_BREAK_PENALTY": 0.01,
+    "TX_FEE": 0.005,
+
+    # Spread (arayüzde "Komisyon" diye göstereceğiz)
+    "SPREAD": {"fx": 0.010, "pm": 0.012, "eq": 0.020, "cr": 0.050},
+
+    # Riskli varlık getirileri
+    "EQ_MU": 0.015, "EQ_SIG": 0.060,
+    "CR_MU": 0.020, "CR_SIG": 0.120,
+    "PM_MU": 0.008, "PM_SIG": 0.030,
+    "FX_MU": 0.010, "FX_SIG": 0.040,
+
+    # Kriz
+    "CRISIS_MONTH": 6,
+    "CRISIS_EQ": -0.12,
+    "CRISIS_CR": -0.20,
+    "CRISIS_PM": +0.04,
+    "CRISIS_FX": +0.07,
+
+    # Tarihsel stres penceresi (stress.py kütüphanesinden ad); boşsa yapay getiriler + CRISIS_* şoku.
+    # Seçilirse H adımındaki getiriler ve FGD güncellemesi pencerenin STRESS_START. satırından okunur.
+    "STRESS_WINDOW": "",
+    "STRESS_START": 0,
+
+    # Sistemik risk modu: batış bankalar arası alacak ağında yayılır
+    "SYSTEMIC_MODE": False,
+    "INTERBANK_DEGREE": 2,        # her bankanın borç verdiği banka sayısı
+    "INTERBANK_EXPOSURE": 0.9,    # bağlantı başına ortalama alacak (sermaye = Guarantee cinsinden)
+    "INTERBANK_LGD": 0.6,         # batan bankadaki alacağın kaybedilen oranı
+}
+
+ASSETS = {
+    "cash": "Nakit",
+    "dd": "Vadesiz Mevduat (Faiz Yok)",
+    "td": "Vadeli Mevduat (Faiz Var)",
+    "fx": "Döviz",
+    "pm": "Kıymetli Metal",
+    "eq": "Hisse Senedi",
+    "cr": "Kripto",
+}
+
+RISK_ASSETS = ["fx", "pm", "eq", "cr"]
+PRICE_FLOOR = 0.01  # aylık fiyat çarpanının alt sınırı (1 + getiri): varlık değeri sıfırlanmaz
+DEPOSIT_ASSETS = ["dd", "td"]
+
+
+def cfg_with_overrides(overrides: dict, base: dict = None) -> dict:
+    """
+    CFG kopyası + değişiklikler. "SPREAD.eq" gibi noktalı anahtarlar iç sözlüğü günceller.
+    Bilinmeyen anahtar KeyError verir (yazım hatası sessizce yutulmasın).
+    """
+    cfg = _plain_cfg(CFG if base is None else base)
+    for key, val in (overrides or {}).items():
+        head, _, sub = str(key).partition(".")
+        if head not in cfg:
+            raise KeyError(f"Bilinmeyen CFG anahtarı: {head}")
+        if sub:
+            if not isinstance(cfg[head], dict) or sub not in cfg[head]:
+                raise KeyError(f"Bilinmeyen CFG anahtarı: {key}")
+            cfg[head][sub] = val
+        else:
+            cfg[head] = val
+    return cfg
+
+def _plain_cfg(cfg) -> dict:
+    """Düzenlenebilir kopya (dondurulmuş görünümden de); değerler skaler ya da skaler sözlüğüdür."""
+    return {k: dict(v) if isinstance(v, Mapping) else v for k, v in cfg.items()}
+
+def _frozen_cfg(cfg: dict) -> MappingProxyType:
+    """Yazmaya kapalı görünüm, iç tablolar (SPREAD) dahil."""
+    return MappingProxyType({k: MappingProxyType(dict(v)) if isinstance(v, Mapping) else v for k, v in cfg.items()})
+
+def cfg_hash(cfg: dict) -> str:
+    """CFG içeriğinin kısa özeti (önbellek anahtarı)."""
+    raw = json.dumps(_plain_cfg(cfg), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:16]
+
+# =========================
+# AY KURALLARI
+# =========================
+def income_for_month(base_income: float, month: int, cfg: dict = CFG) -> float:
+    """Ay 1: base, Ay2: base*0.95, Ay3: base*0.95^2 ... (CFG["TAX_DROP_STEPS"] düşüşten sonra sabit)"""
+    month = int(month)
+    if month <= 1:
+        return float(base_income)
+    drops = min(month - 1, int(cfg["TAX_DROP_STEPS"]))
+    return float(base_income * ((1.0 - TAX_DROP_RATE) ** drops))
+
+def can_borrow(month: int, cfg: dict = CFG) -> bool:
+    return month >= int(cfg["LOAN_ACTIVE_FROM_MONTH"])
+
+def open_assets_by_month(month: int, cfg: dict = CFG):
+    if month < cfg["BANK_STAGE_FROM"]:
+        return ["cash"]
+    if month < cfg["HEDGE_STAGE_FROM"]:
+        return ["cash", "dd", "td"]
+    if month < cfg["MARKET_STAGE_FROM"]:
+        return ["cash", "dd", "td", "fx", "pm"]
+    return ["cash", "dd", "td", "fx", "pm", "eq", "cr"]
+
+def stage_label(month: int, cfg: dict = CFG):
+    if month < cfg["BANK_STAGE_FROM"]: return "1-KurumYok"
+    if month < cfg["HEDGE_STAGE_FROM"]: return "2-Banka"
+    if month < cfg["MARKET_STAGE_FROM"]: return "3-Korunma"
+    return "4-Piyasa"
+
+# seed aralığı: oyuncu/banka üreteçleri seed'e ad özeti ve ay ofseti ekler (negatif olamaz), piyasa akışları
+# 32 bitlik seed alır; aralık dışındaki seed ya hata verir ya da başka bir seed'le aynı piyasayı üretirdi
+SEED_MAX = 2**32
+
+def check_seed(seed) -> int:
+    """Oynanabilir seed (0 <= seed < SEED_MAX); aralık dışında ValueError."""
+    seed = int(seed)
+    if not 0 <= seed < SEED_MAX:
+        raise ValueError(f"Seed 0 ile {SEED_MAX - 1} arasında olmalı: {seed}")
+    return seed
+
+def rng_for_global(seed: int, month: int):
+    return np.random.default_rng(seed + month * 999)
+
+def name_hash(name: str) -> int:
+    """hash() süreç başına rastgele; kayıt kodunun sunucu yeniden başlasa da aynı oyunu sürdürmesi için sabit özet."""
+    return zlib.crc32(str(name).encode("utf-8")) % 10000
+
+def rng_for_player(name: str, month: int, seed: int):
+    return np.random.default_rng(name_hash(name) + month * 1000 + seed)
+
+def random_pgl_step(rng: np.random.Generator, cfg: dict = CFG) -> float:
+    return float(rng.uniform(cfg["PGL_MIN_STEP"], cfg["PGL_MAX_STEP"]))
+
+def signed_pgl_step(rng: np.random.Generator, cfg: dict = CFG) -> float:
+    """FGD adımı: büyüklük ~ U(min, max), işaret eşit olasılıkla ±; beklentisi 0."""
+    step = random_pgl_step(rng, cfg)
+    sign = -1.0 if rng.random() < 0.5 else 1.0
+    return float(sign * step)
+
+def next_pgl(prev_pgl: float, rng: np.random.Generator, cfg: dict = CFG):
+    signed_delta = signed_pgl_step(rng, cfg)
+
+    new_pgl = float(prev_pgl + signed_delta)
+    new_pgl = min(max(new_pgl, float(cfg["PGL_FLOOR"])), float(cfg["PGL_CAP"]))  # skaler: np.clip'ten hızlı
+    realized_delta = float(new_pgl - prev_pgl)
+    return new_pgl, realized_delta
+
+def bank_count_for_month(month: int, cfg: dict = CFG) -> int:
+    start = int(cfg["BANK_STAGE_FROM"])
+    if month < start:
+        return 0
+    return min(int(cfg["BANKS_START"]) + (month - start), int(cfg["BANKS_MAX"]))
+
+def buy_cost_rate(asset_key: str, cfg: dict = CFG) -> float:
+    fee = float(cfg["TX_FEE"])
+    spr = float(cfg["SPREAD"].get(asset_key, 0.0))
+    return fee + spr / 2.0
+
+def sell_cost_rate(asset_key: str, cfg: dict = CFG) -> float:
+    fee = float(cfg["TX_FEE"])
+    spr = float(cfg["SPREAD"].get(asset_key, 0.0))
+    return fee + spr / 2.0
+
+# =========================
+# SENARYO (DOĞRULANMIŞ CFG + AY TABLOLARI)
+# =========================
+_PROB_KEYS = ("CASH_THEFT_PROB_STAGE1", "CASH_THEFT_PROB_STAGE2", "BANK_INCIDENT_PROB",
+              "BANKRUPTCY_EXTRA_PROB_AFTER_MIN", "EARLY_BREAK_PENALTY", "TX_FEE", "INTERBANK_LGD")
+_RANGE_KEYS = (("PGL_MIN_STEP", "PGL_MAX_STEP"), ("PGL_FLOOR", "PGL_CAP"),
+               ("CASH_THEFT_SEV_MIN", "CASH_THEFT_SEV_MAX"), ("TD_RATE_MIN", "TD_RATE_MAX"), ("GUAR_MIN", "GUAR_MAX"))
+
+def validate_cfg(cfg: dict) -> list:
+    """CFG tutarlılık hataları (Türkçe); boş liste = geçerli."""
+    errors = []
+    for key, val in cfg.items():
+        if key == "SPREAD":
+            for k, v in val.items():
+                if k not in RISK_ASSETS:
+                    errors.append(f"SPREAD.{k}: bilinmeyen varlık")
+                elif isinstance(v, bool) or not isinstance(v, (int, float)) or v < 0:
+                    errors.append(f"SPREAD.{k}: negatif olmayan sayı olmalı")
+        elif key == "SYSTEMIC_MODE":
+            if not isinstance(val, bool):
+                errors.append("SYSTEMIC_MODE: true/false olmalı")
+        elif key == "STEP_UNIT":
+            if not isinstance(val, str) or not val:
+                errors.append("STEP_UNIT: metin olmalı")
+        elif key == "STRESS_WINDOW":
+            if not isinstance(val, str):
+                errors.append("STRESS_WINDOW: metin olmalı")
+        elif isinstance(val, bool) or not isinstance(val, (int, float)):
+            errors.append(f"{key}: sayı olmalı")
+    if errors:
+        return errors
+
+    if int(cfg["MONTHS"]) != cfg["MONTHS"] or cfg["MONTHS"] < 1:
+        errors.append("MONTHS: pozitif tam sayı olmalı")
+    for key in _PROB_KEYS:
+        if not 0.0 <= cfg[key] <= 1.0:
+            errors.append(f"{key}: 0 ile 1 arasında olmalı")
+    for lo, hi in _RANGE_KEYS:
+        if cfg[lo] > cfg[hi]:
+            errors.append(f"{lo} > {hi}")
+    for k in RISK_ASSETS:
+        if cfg[f"{k.upper()}_SIG"] < 0:
+            errors.append(f"{k.upper()}_SIG: negatif olamaz")
+    if not (cfg["BANKRUPTCY_FORCE_START_MONTH"] <= cfg["BANKRUPTCY_FORCE_END_MONTH"]):
+        errors.append("BANKRUPTCY_FORCE_START_MONTH > BANKRUPTCY_FORCE_END_MONTH")
+    if not (1 <= cfg["BANK_STAGE_FROM"] <= cfg["HEDGE_STAGE_FROM"] <= cfg["MARKET_STAGE_FROM"]):
+        errors.append("Aşama ayları 1 <= BANK_STAGE_FROM <= HEDGE_STAGE_FROM <= MARKET_STAGE_FROM olmalı")
+    if not (1 <= cfg["BANKS_START"] <= cfg["BANKS_MAX"]):
+        errors.append("1 <= BANKS_START <= BANKS_MAX olmalı")
+    if cfg["STEP_SCALE"] <= 0:
+        errors.append("STEP_SCALE: pozitif olmalı")
+    if cfg["TAX_DROP_STEPS"] < 0:
+        errors.append("TAX_DROP_STEPS: negatif olamaz")
+    if cfg["STRESS_WINDOW"]:
+        try:
+            stress_rows(cfg)
+        except (OSError, ValueError) as e:
+            errors.append(f"STRESS_WINDOW: {e}")
+    return errors
+
+def stress_rows(cfg: dict = CFG):
+    """Seçili stres penceresinin oyun aylarına düşen (MONTHS, 5) satırları (mmap görünümü) ya da None."""
+    if not cfg.get("STRESS_WINDOW"):
+        return None
+    return stress.window_slice(cfg["STRESS_WINDOW"], int(cfg["STRESS_START"]), int(cfg["MONTHS"]))
+
+class Scenario:
+    """
+    Doğrulanmış, değiştirilemez CFG ve ondan bir kez üretilen ay tabloları.
+    Ay tabloları 0..MONTHS+1 indekslidir (satır = ay; 0 ve MONTHS+1 kenar satırları), böylece sıcak döngüler
+    her çağrıda dallanıp float(CFG[...]) dönüştürmek yerine dizi/sözlük okur. Tek değerli maliyetler (komisyon,
+    spread) düz float'tır: numpy skaler indeksleme Python float okumasından yavaştır.
+    """
+    __slots__ = ("name", "cfg", "key", "months", "unit", "fee", "break_penalty", "incident_prob",
+                 "buy_rate", "sell_rate", "spread_half", "buy_keep", "sell_keep",
+                 "open_mask", "open_assets", "stages", "bank_counts", "income_factor",
+                 "borrow_open", "theft_prob", "_frozen")
+
+    def __init__(self, cfg: dict = None, name: str = ""):
+        cfg = _plain_cfg(CFG if cfg is None else cfg)
+        errors = validate_cfg(cfg)
+        if errors:
+            raise ValueError("Geçersiz senaryo: " + "; ".join(errors))
+        months = int(cfg["MONTHS"])
+        rows = np.arange(months + 2)
+        asset_keys = list(ASSETS)
+
+        self.name = str(name)
+        self.cfg = _frozen_cfg(cfg)
+        self.key = cfg_hash(cfg)
+        self.months = months
+        self.unit = str(cfg["STEP_UNIT"])
+        self.fee = float(cfg["TX_FEE"])
+        self.break_penalty = float(cfg["EARLY_BREAK_PENALTY"])
+        self.incident_prob = float(cfg["BANK_INCIDENT_PROB"])
+        self.spread_half = {k: float(cfg["SPREAD"].get(k, 0.0)) / 2.0 for k in asset_keys}
+        self.buy_rate = {k: buy_cost_rate(k, cfg) for k in asset_keys}
+        self.sell_rate = {k: sell_cost_rate(k, cfg) for k in asset_keys}
+        self.buy_keep = _frozen_array([1.0 - self.buy_rate[k] for k in RISK_ASSETS])
+        self.sell_keep = _frozen_array([1.0 - self.sell_rate[k] for k in RISK_ASSETS])
+
+        self.open_assets = tuple(tuple(open_assets_by_month(m, cfg)) for m in rows)
+        self.open_mask = _frozen_array([[k in opened for k in asset_keys] for opened in self.open_assets], dtype=bool)
+        self.stages = tuple(stage_label(m, cfg) for m in rows)
+        self.bank_counts = _frozen_array([bank_count_for_month(m, cfg) for m in rows], dtype=int)
+        drops = np.clip(rows - 1, 0, int(cfg["TAX_DROP_STEPS"])).astype(float)
+        self.income_factor = _frozen_array(np.where(rows <= 1, 1.0, (1.0 - TAX_DROP_RATE) ** drops))
+        self.borrow_open = _frozen_array(rows >= int(cfg["LOAN_ACTIVE_FROM_MONTH"]), dtype=bool)
+        self.theft_prob = _frozen_array(np.where(rows < int(cfg["BANK_STAGE_FROM"]), float(cfg["CASH_THEFT_PROB_STAGE1"]),
+                                                 float(cfg["CASH_THEFT_PROB_STAGE2"])))
+        self._frozen = True
+
+    def __setattr__(self, attr, val):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("Scenario değiştirilemez; yeni bir Scenario oluşturun.")
+        object.__setattr__(self, attr, val)
+
+    def row(self, month: int) -> int:
+        """Tablo satırı; oyun sonrası aylar son satıra sabitlenir."""
+        return min(max(int(month), 0), self.months + 1)
+
+    def income(self, base_income: float, month: int) -> float:
+        return float(base_income) * float(self.income_factor[self.row(month)])
+
+    def can_borrow(self, month: int) -> bool:
+        return bool(self.borrow_open[self.row(month)])
+
+    def stage(self, month: int) -> str:
+        return self.stages[self.row(month)]
+
+    def bank_count(self, month: int) -> int:
+        return int(self.bank_counts[self.row(month)])
+
+def _frozen_array(values, dtype=float) -> np.ndarray:
+    arr = np.array(values, dtype=dtype)
+    arr.setflags(write=False)
+    return arr
+
+def scenario_overrides(path: str) -> dict:
+    """
+    Senaryo dosyası (.toml ya da .json) -> cfg_with_overrides biçiminde düz değişiklikler.
+    İç tablolar noktalı anahtara açılır: [SPREAD] cr = 0.08 -> {"SPREAD.cr": 0.08}.
+    """
+    if str(path).lower().endswith(".toml"):
+        import tomllib
+        with open(path, "rb") as f:
+            doc = tomllib.load(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            doc = json.load(f)
+    out = {}
+    for key, val in doc.items():
+        if isinstance(val, dict):
+            out.update({f"{key}.{sub}": v for sub, v in val.items()})
+        else:
+            out[key] = val
+    return out
+
+def load_scenario(path: str) -> Scenario:
+    """Dosyadan doğrulanmış senaryo. Bilinmeyen anahtar KeyError, tutarsız değer ValueError verir."""
+    name = str(path).replace("\\", "/").rsplit("/", 1)[-1].rsplit(".", 1)[0]
+    return Scenario(cfg_with_overrides(scenario_overrides(path)), name=name)
+
+# =========================
+# PİYASA (SEED BAŞINA BANKA YOLU + FİYAT ENDEKSİ)
+# =========================
+class Market:
+    """
+    Bir seed + CFG için oyuncular arası ortak veri. bank_state ay -> {banka: {...}} sözlüğüdür;
+    Streamlit tarafında st.session_state.bank_state ile aynı nesne paylaşılır.
+    Riskli varlık fiyatları seed'den türetilir (price_path) ve tembel hesaplanıp saklanır.
+    cfg yerine derlenmiş bir Scenario da verilebilir; verilmezse cfg'den derlenir (market.scenario).
+    antithetic=True aynı seed'in ayna piyasasıdır: getiri şokları ters işaretli, bankalar ve oyuncu
+    çekilişleri aynı (varyans azaltmalı karşılaştırma için, bkz. compare.py).
+    """
+
+    def __init__(self, seed: int, cfg=None, bank_state: dict = None, antithetic: bool = False):
+        self.seed = check_seed(seed)
+        self.scenario = cfg if isinstance(cfg, Scenario) else Scenario(cfg)
+        self.cfg = self.scenario.cfg
+        self.bank_state = {} if bank_state is None else bank_state
+        self.antithetic = bool(antithetic)
+        self._prices = None
+        self._shocks = None
+        self._networks = {}
+        self._cascades = {}
+        self._stress = stress_rows(self.cfg)  # mmap görünümü; Market başına bir kez (pencere yoksa None)
+
+    def price_path(self) -> np.ndarray:
+        """
+        (MONTHS+1, len(RISK_ASSETS)) birikimli fiyat endeksi: satır 0 oyun başı (1.0), satır m = m. ay sonu.
+        Getiriler seed başına ortaktır; bütün oyuncular aynı piyasayı görür.
+        """
+        if self._prices is None:
+            cfg = self.cfg
+            months = int(cfg["MONTHS"])
+            history = self._stress
+            if history is not None:
+                # tarihsel pencere: getiriler seed'den bağımsız, kriz şoku zaten serinin içinde
+                r = history[:, :len(RISK_ASSETS)]
+            else:
+                mu = np.array([float(cfg[f"{k.upper()}_MU"]) for k in RISK_ASSETS])
+                sig = np.array([float(cfg[f"{k.upper()}_SIG"]) for k in RISK_ASSETS])
+                r = np.random.default_rng([self.seed, 32]).normal(mu, sig, size=(months, len(RISK_ASSETS)))
+                if self.antithetic:
+                    r = 2.0 * mu - r
+                self._shocks = (r - mu) / np.where(sig > 0, sig, 1.0)
+                crisis = int(cfg["CRISIS_MONTH"])
+                if 1 <= crisis <= months:
+                    r[crisis - 1] += np.array([float(cfg[f"CRISIS_{k.upper()}"]) for k in RISK_ASSETS])
+            prices = np.ones((months + 1, len(RISK_ASSETS)))
+            prices[1:] = np.cumprod(np.maximum(1.0 + r, PRICE_FLOOR), axis=0)
+            self._prices = prices
+        return self._prices
+
+    def return_shocks(self):
+        """(MONTHS, len(RISK_ASSETS)) standart normal getiri şokları (kriz şoku hariç); tarihsel pencerede None."""
+        self.price_path()
+        return self._shocks
+
+    def pgl_path(self):
+        """Stres penceresindeki aylık FGD düzeyleri (indeks = ay - 1) ya da None (FGD rastgele yürür)."""
+        history = self._stress
+        return None if history is None else history[:, len(RISK_ASSETS)]
+
+    def prices(self, month: int) -> np.ndarray:
+        """`month` ayı sonundaki fiyatlar (RISK_ASSETS sırasıyla); month=0 oyun başı."""
+        return self.price_path()[month]
+
+    def banks_for_month(self, month: int):
+        n = self.scenario.bank_count(month)
+        if n == 0:
+            return []
+
+        if month in self.bank_state:
+            bmap = self.bank_state[month]
+            out = []
+            for i in range(n):
+                name = f"Banka {i+1}"
+                out.append({"Bank": name, **bmap[name]})
+            return out
+
+        cfg = self.cfg
+        r = rng_for_global(self.seed, month)
+
+        td_min, td_max = float(cfg["TD_RATE_MIN"]), float(cfg["TD_RATE_MAX"])
+        gmin, gmax = float(cfg["GUAR_MIN"]), float(cfg["GUAR_MAX"])
+
+        TD_STEP = 0.0015
+        G_STEP  = 0.010
+        prev = self.bank_state.get(month - 1)
+
+        bmap_this = {}
+        for i in range(n):
+            bname = f"Banka {i+1}"
+
+            if prev and bname in prev:
+                td_prev = float(prev[bname]["TD_Rate"])
+                g_prev  = float(prev[bname]["Guarantee"])
+                td = td_prev + float(r.normal(0, TD_STEP))
+                guar = g_prev + float(r.normal(0, G_STEP))
+                td = float(np.clip(td, td_min, td_max))
+                guar = float(np.clip(guar, gmin, gmax))
+            else:
+                td = float(r.uniform(td_min, td_max))
+                x = (td - td_min) / max(td_max - td_min, 1e-9)
+                base_guar = gmax - x * (gmax - gmin)
+                guar = float(np.clip(base_guar + float(r.normal(0, 0.015)), gmin, gmax))
+
+            loan_rate = float(np.clip(
+                float(cfg["LOAN_RATE_BASE"]) + (1.0 - guar) * float(cfg["LOAN_RATE_ADD"]) + float(r.normal(0, float(cfg["LOAN_RATE_NOISE"]))),
+                0.010, 0.060
+            ))
+
+            bmap_this[bname] = {"TD_Rate": td, "Guarantee": guar, "Loan_Rate": loan_rate}
+
+        self.bank_state[month] = bmap_this
+
+        out = []
+        for i in range(n):
+            name = f"Banka {i+1}"
+            out.append({"Bank": name, **bmap_this[name]})
+        return out
+
+    def interbank_network(self, month: int) -> dict:
+        """Ayın bankalar arası alacak ağı (seyrek) ve sermaye tamponu; bankalar banks_for_month sırasıyla."""
+        if month not in self._networks:
+            cfg = self.cfg
+            banks = self.banks_for_month(month)
+            rng = np.random.default_rng([self.seed, int(month), 33])
+            rows, cols, vals = contagion.exposure_network(
+                len(banks), rng, int(cfg["INTERBANK_DEGREE"]), float(cfg["INTERBANK_EXPOSURE"])
+            )
+            self._networks[month] = {
+                "names": [b["Bank"] for b in banks],
+                "rows": rows, "cols": cols, "vals": vals,
+                # düşük güvenceli banka daha ince sermayeli
+                "capital": np.array([float(b["Guarantee"]) for b in banks]),
+            }
+        return self._networks[month]
+
+    def failed_banks(self, month: int, initial) -> set:
+        """initial batışlarının ağ üzerinden yayılmış hali (initial dahil); (ay, başlangıç kümesi) başına saklanır."""
+        key = (int(month), frozenset(initial))
+        if key not in self._cascades:
+            net = self.interbank_network(month)
+            start = np.array([b in key[1] for b in net["names"]], dtype=bool)
+            failed = contagion.cascade(net["rows"], net["cols"], net["vals"], net["capital"], start,
+                                       float(self.cfg["INTERBANK_LGD"]))
+            self._cascades[key] = frozenset(b for b, f in zip(net["names"], failed) if f) | key[1]
+        return set(self._cascades[key])
+
+    def freeze(self) -> "Market":
+        """
+        Bütün ayları üretip yazmaya kapatır: banka yolu, fiyatlar ve sistemik modda ağ ile her tek bankalı
+        başlangıcın yayılımı (choose_bankruptcy_for_player_month ayda bir banka seçer). Oturumlar arasında
+        paylaşılan piyasa kilitsiz okunur; eksik bir anahtar üretilmeye çalışılırsa TypeError verir.
+        """
+        systemic = bool(self.cfg.get("SYSTEMIC_MODE"))
+        for m in range(1, self.scenario.months + 1):
+            for b in self.banks_for_month(m):
+                if systemic:
+                    self.failed_banks(m, {b["Bank"]})
+        self.price_path().setflags(write=False)
+        for net in self._networks.values():
+            for k in ("rows", "cols", "vals", "capital"):
+                net[k].setflags(write=False)
+        self.bank_state = MappingProxyType({
+            m: MappingProxyType({b: MappingProxyType(v) for b, v in bmap.items()})
+            for m, bmap in self.bank_state.items()
+        })
+        self._networks = MappingProxyType({m: MappingProxyType({**net, "names": tuple(net["names"])})
+                                           for m, net in self._networks.items()})
+        self._cascades = MappingProxyType(self._cascades)
+        return self
+
+    def bank_map(self, month: int) -> dict:
+        if self.scenario.bank_count(month) == 0:
+            return {}
+        return {b["Bank"]: b for b in self.banks_for_month(month)}
+
+# =========================
+# PORTFÖY
+# =========================
+def dd_total(p: dict) -> float:
+    return float(sum(p.get("dd_accounts", {}).values()))
+
+def td_total(p: dict) -> float:
+    return float(sum(p.get("td_accounts", {}).values()))
+
+def other_investments_total(p: dict) -> float:
+    return float(sum(p["holdings"].get(k, 0.0) for k in RISK_ASSETS))
+
+def total_investments(p: dict) -> float:
+    return float(dd_total(p) + td_total(p) + other_investments_total(p))
+
+# =========================
+# POZİSYONLAR (BİRİM + FİYAT ENDEKSİ)
+# =========================
+def units_vector(p: dict) -> np.ndarray:
+    return np.array([float(p["units"].get(k, 0.0)) for k in RISK_ASSETS])
+
+def portfolio_values(units: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """(n, len(RISK_ASSETS)) birim matrisi -> oyuncu başına riskli varlık değeri (tek matris-vektör çarpımı)."""
+    return units @ prices
+
+def mark_to_market(p: dict, prices: np.ndarray) -> float:
+    """holdings'teki riskli varlık TL değerlerini birim x fiyat ile günceller; toplamı döndürür."""
+    # dört varlık: numpy dizisi kurmak çarpımdan pahalı, düz Python (sonuç aynı)
+    units, holdings = p["units"], p["holdings"]
+    values = [float(units.get(k, 0.0)) * px for k, px in zip(RISK_ASSETS, prices.tolist())]
+    for k, v in zip(RISK_ASSETS, values):
+        holdings[k] = v
+    return float(sum(values))
+
+def ensure_positions(p: dict, prices: np.ndarray):
+    """Birim alanları olmayan (eski kayıt kodlu) oyuncuyu, mevcut TL değerlerini bugünkü fiyattan birime çevirerek taşır."""
+    if "units" in p:
+        return
+    p["units"] = {k: float(p["holdings"].get(k, 0.0)) / float(px) for k, px in zip(RISK_ASSETS, prices)}
+    p["cost_basis"] = {k: float(p["holdings"].get(k, 0.0)) for k in RISK_ASSETS}
+    p["realized_pnl"] = {k: 0.0 for k in RISK_ASSETS}
+    p["lots"] = []
+
+def unrealized_pnl(p: dict) -> float:
+    return float(sum(float(p["holdings"].get(k, 0.0)) - float(p["cost_basis"].get(k, 0.0)) for k in RISK_ASSETS))
+
+def position_rows(p: dict, prices: np.ndarray) -> list:
+    """Varlık başına birim, fiyat, değer, maliyet ve kâr/zarar satırları (pozisyon tablosu için)."""
+    rows = []
+    for k, px in zip(RISK_ASSETS, prices):
+        units = float(p["units"].get(k, 0.0))
+        cost = float(p["cost_basis"].get(k, 0.0))
+        realized = float(p["realized_pnl"].get(k, 0.0))
+        if units <= 0 and realized == 0:
+            continue
+        value = units * float(px)
+        rows.append({"asset": k, "units": units, "price": float(px), "value": value, "cost": cost,
+                     "unrealized": value - cost, "realized": realized})
+    return rows
+
+# =========================
+# BANKA BATIŞI: OYUNCU BAZLI SEÇİM (PARASI OLAN BANKA)
+# =========================
+def choose_bankruptcy_for_player_month(p: dict, month: int, bank_map_local: dict, draws: tuple, cfg: dict = CFG):
+    """
+    Her oyuncu için en az 2 batış:
+    - Batış sadece oyuncunun o ay mevduatı bulunan bankalardan seçilir (dd/td > 0).
+    - Min 2 batış tamamlanana kadar uygun aylarda zorlanır.
+    - Min 2 sonrası küçük bir olasılıkla ek batış olabilir.
+    draws = (ek batış, banka seçimi) tekdüze çekilişleri (month_draws(...)["bankruptcy"]).
+    """
+    month = int(month)
+    u_extra, u_pick = draws
+    if not bank_map_local:
+        return set()
+
+    # aday bankalar: oyuncunun mevduatı olan bankalar
+    candidates = []
+    for bank in bank_map_local.keys():
+        dd = float(p.get("dd_accounts", {}).get(bank, 0.0))
+        td = float(p.get("td_accounts", {}).get(bank, 0.0))
+        tot = dd + td
+        if tot > 0:
+            candidates.append((bank, tot))
+
+    if not candidates:
+        return set()
+
+    seen = int(p.get("bankruptcies_seen", 0))
+    must = int(cfg["BANKRUPTCY_MIN_EVENTS_PER_PLAYER"])
+
+    force_window = (int(cfg["BANKRUPTCY_FORCE_START_MONTH"]) <= month <= int(cfg["BANKRUPTCY_FORCE_END_MONTH"]))
+    need_force = (seen < must) and force_window
+
+    do_extra = (seen >= must) and (u_extra < float(cfg["BANKRUPTCY_EXTRA_PROB_AFTER_MIN"]))
+
+    if not need_force and not do_extra:
+        return set()
+
+    # aynı bankayı tekrar tekrar batırmayı engelle (eğitsel olarak daha iyi)
+    history = set(p.get("bankrupt_banks_history", []))
+    fresh = [(b, w) for (b, w) in candidates if b not in history]
+    pool = fresh if fresh else candidates  # hepsi zaten batmışsa, yine de birini seç
+
+    # ağırlıklı seçim ters dağılımla (Generator.choice(p=...) ile aynı yöntem); birkaç banka: düz Python
+    cdf = list(itertools.accumulate(w for _, w in pool))
+    return {pool[min(bisect.bisect_right(cdf, u_pick * cdf[-1]), len(pool) - 1)][0]}
+
+# =========================
+# 1 AYLIK BORÇ MODELİ
+# =========================
+def loan_due_amount(p: dict, current_month: int) -> float:
+    total = 0.0
+    for ln in p.get("loans", []):
+        if int(ln["due_month"]) == int(current_month):
+            total += float(ln["principal"]) * (1.0 + float(ln["rate"]))
+    return float(total)
+
+def loan_outstanding_principal(p: dict) -> float:
+    return float(sum(float(ln["principal"]) for ln in p.get("loans", [])))
+
+def remove_due_loans(p: dict, current_month: int):
+    p["loans"] = [ln for ln in p.get("loans", []) if int(ln["due_month"]) != int(current_month)]
+
+def total_debt_display(p: dict, current_month: int) -> float:
+    due = loan_due_amount(p, current_month)
+    future_principal = float(sum(float(ln["principal"]) for ln in p.get("loans", []) if int(ln["due_month"]) > int(current_month)))
+    return float(due + future_principal)
+
+def net_wealth(p: dict) -> float:
+    return float(p["holdings"]["cash"] + total_investments(p) - float(loan_outstanding_principal(p)))
+
+# =========================
+# OYUNCU
+# =========================
+def theft_month_count(cfg: dict = CFG) -> int:
+    """Takvim yılı başına 3 kesin hırsızlık ayı (uzun ufukta yıl sayısıyla ölçeklenir)."""
+    months = int(cfg["MONTHS"])
+    years = max(1, int(np.ceil(months * float(cfg["STEP_SCALE"]) / 12.0 - 1e-9)))
+    return min(3 * years, months)
+
+def new_player(name: str, seed: int, cfg: dict = CFG) -> dict:
+    seed = check_seed(seed)
+    theft_rng = np.random.default_rng(name_hash(name) + seed)
+    scale = float(cfg["STEP_SCALE"])
+    theft_months = sorted(
+        theft_rng.choice(np.arange(1, cfg["MONTHS"] + 1), size=theft_month_count(cfg), replace=False).tolist()
+    )
+
+    pgl0 = float(np.random.default_rng(name_hash(name) + seed + 777).uniform(
+        cfg["PGL_FLOOR"], cfg["PGL_CAP"]
+    ))
+    history = stress_rows(cfg)
+    if history is not None:
+        pgl0 = float(history[0, len(RISK_ASSETS)])
+
+    return {
+        "month": 1,
+        "finished": False,
+        "defaulted": False,
+
+        "loans": [],
+        "loan_bank": None,
+
+        "holdings": {"cash": 0.0, "fx": 0.0, "pm": 0.0, "eq": 0.0, "cr": 0.0},
+        # riskli varlıklar birim olarak tutulur; holdings[k] = units[k] x fiyat (ay sonu değerlemesi)
+        "units": {k: 0.0 for k in RISK_ASSETS},
+        "cost_basis": {k: 0.0 for k in RISK_ASSETS},
+        "realized_pnl": {k: 0.0 for k in RISK_ASSETS},
+        "lots": [],  # {"month", "asset", "side", "units", "price", "amount", "pnl"}
+        "dd_accounts": {},
+        "td_accounts": {},
+
+        "income_base": float(DEFAULT_MONTHLY_INCOME * scale),
+
+        "fixed_current": float(START_FIXED_COST * scale),
+        "extra_current": float(START_EXTRA_COST * scale),
+        "pgl_current": float(pgl0),
+
+        "last_dd_bank": None,
+        "last_td_bank": None,
+
+        "theft_months": theft_months,  # sıralı (settle_month ikili arama yapar)
+        "log": [],
+
+        # ✅ batış takibi (oyuncu bazlı)
+        "bankruptcies_seen": 0,
+        "bankrupt_banks_history": [],  # list of bank names (en az bir kez batmış)
+    }
+
+def ensure_bank_choices(p: dict, bank_list: list):
+    """Bankalar sekmesindeki varsayılanlar: vadesiz son banka, vadeli ilk banka, kredi en ucuz banka."""
+    if not bank_list:
+        return
+    names = [b["Bank"] for b in bank_list]
+    if p.get("last_dd_bank") is None:
+        p["last_dd_bank"] = names[-1]
+    if p.get("last_td_bank") is None:
+        p["last_td_bank"] = names[0]
+    if p.get("loan_bank") is None:
+        p["loan_bank"] = sorted(bank_list, key=lambda x: x["Loan_Rate"])[0]["Bank"]
+
+# =========================
+# KAYIT KODU (OYUNU DIŞA AKTAR / GERİ YÜKLE)
+# =========================
+# Biçim: "WFG" + sürüm(1B) + seed(8B, işaretli; yalnızca check_seed aralığı yazılır/okunur) + zlib(JSON). Banka yolu seed'den yeniden üretilir,
+# log sütun adları bir kez yazılır (satırlar yalnızca değer listesi). Sürüm 1 kodlarında seed 4B işaretsizdir.
+SAVE_MAGIC = b"WFG"
+SAVE_VERSION = 2
+SAVE_HEADERS = {1: struct.Struct(">3sBI"), 2: struct.Struct(">3sBq")}
+
+def encode_save_code(name: str, p: dict, seed: int) -> bytes:
+    seed = check_seed(seed)
+    log = p.get("log", [])
+    cols = list(log[0].keys()) if log else []
+    body = {k: v for k, v in p.items() if k != "log"}
+    payload = {
+        "name": str(name),
+        "player": body,
+        "log_cols": cols,
+        "log_rows": [[row.get(c) for c in cols] for row in log],
+    }
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return SAVE_HEADERS[SAVE_VERSION].pack(SAVE_MAGIC, SAVE_VERSION, seed) + zlib.compress(raw, 9)
+
+def decode_save_code(blob: bytes):
+    """(ad, oyuncu durumu, seed); bozuk ya da tanınmayan kodda ValueError."""
+    blob = bytes(blob)
+    if len(blob) < 4 or blob[:3] != SAVE_MAGIC:
+        raise ValueError("Geçersiz kayıt kodu.")
+    header = SAVE_HEADERS.get(blob[3])
+    if header is None:
+        raise ValueError(f"Desteklenmeyen kayıt sürümü: {blob[3]}")
+    if len(blob) < header.size:
+        raise ValueError("Kayıt kodu çok kısa.")
+    _magic, _version, seed = header.unpack_from(blob)
+    seed = check_seed(seed)
+    try:
+        payload = json.loads(zlib.decompress(blob[header.size:]).decode("utf-8"))
+        p = dict(payload["player"])
+        cols = payload["log_cols"]
+        p["log"] = [dict(zip(cols, row)) for row in payload["log_rows"]]
+        name = str(payload["name"])
+    except (zlib.error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Kayıt kodu bozuk: {e}") from e
+    return name, p, seed
+
+def save_code_text(blob: bytes) -> str:
+    return base64.urlsafe_b64encode(blob).decode("ascii").rstrip("=")
+
+def save_code_bytes(text: str) -> bytes:
+    text = "".join(str(text).split())
+    try:
+        return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+    except binascii.Error as e:
+        raise ValueError(f"Kayıt kodu okunamadı: {e}") from e
+
+# =========================
+# AY SONU HESAPLAŞMA
+# =========================
+def empty_decisions() -> dict:
+    """Karar ekranının topladığı girdiler (hepsi TL)."""
+    return {
+        "sell": {k: 0.0 for k in RISK_ASSETS},
+        "sell_dd_bank": None,
+        "sell_dd_amt": 0.0,
+        "sell_td_bank": None,
+        "sell_td_amt": 0.0,
+        "borrow": 0.0,
+        "buy": {},
+        # None: oyuncunun bankalar sekmesindeki seçimi geçerli
+        "dd_bank": None,
+        "td_bank": None,
+        "loan_bank": None,
+        # toplu mevduat emri (empty_ticket biçimi); None: yalnızca yukarıdaki tek banka alanları
+        "ticket": None,
+    }
+
+TICKET_SIDES = ("dd_in", "td_in", "dd_out", "td_out")
+
+def empty_ticket() -> dict:
+    """Bütün bankalara tek seferde: {"dd_in"/"td_in": {banka: yatırılacak TL}, "dd_out"/"td_out": {banka: çekilecek TL}}."""
+    return {side: {} for side in TICKET_SIDES}
+
+def ticket_side(ticket: dict, side: str) -> tuple:
+    """(bankalar, tutar vektörü); yalnızca pozitif tutarlar."""
+    items = [(b, float(v)) for b, v in ((ticket or {}).get(side) or {}).items() if float(v or 0.0) > 0]
+    return [b for b, _ in items], np.array([v for _, v in items], dtype=np.float64)
+
+def projected_sell_cash(p: dict, decisions: dict, cfg: dict = CFG) -> float:
+    """Satış/bozma kararlarının net nakit girişi (A adımıyla aynı oranlar)."""
+    month = int(p["month"])
+    fee = float(cfg["TX_FEE"])
+    total = sum(float(amt) * (1.0 - sell_cost_rate(k, cfg)) for k, amt in (decisions.get("sell") or {}).items() if float(amt) > 0)
+    if month >= int(cfg["BANK_STAGE_FROM"]):
+        ticket = decisions.get("ticket")
+        dd_out = float(decisions.get("sell_dd_amt") or 0.0)
+        td_out = float(decisions.get("sell_td_amt") or 0.0)
+        if ticket:
+            dd_out += float(ticket_side(ticket, "dd_out")[1].sum())
+            td_out += float(ticket_side(ticket, "td_out")[1].sum())
+        total += dd_out * (1.0 - fee)
+        total += td_out * (1.0 - fee - float(cfg["EARLY_BREAK_PENALTY"]))
+    return float(total)
+
+def validate_decisions(p: dict, decisions: dict, cfg: dict = CFG) -> list:
+    """
+    Karar ekranı limitleri: satış <= bakiye, çekim/bozma <= seçili banka bakiyesi, borç <= tavan,
+    toplam alım <= kullanılabilir nakit. Hata mesajlarının listesi (boşsa geçerli).
+    """
+    month = int(p["month"])
+    tol = 0.5
+    errors = []
+    opened = open_assets_by_month(month, cfg)
+    for k, amt in (decisions.get("sell") or {}).items():
+        if float(amt) > float(p["holdings"].get(k, 0.0)) + tol:
+            errors.append(f"{ASSETS[k]} satışı bakiyeyi aşıyor.")
+    for acc, slot, label in (("dd_accounts", "sell_dd", "Vadesiz çekim"), ("td_accounts", "sell_td", "Vadeli bozma")):
+        amt = float(decisions.get(slot + "_amt") or 0.0)
+        if amt > 0 and amt > float(p[acc].get(decisions.get(slot + "_bank"), 0.0)) + tol:
+            errors.append(f"{label} seçili bankadaki bakiyeyi aşıyor.")
+
+    # toplu emir: banka başına bakiye (vektörel) ve açık banka denetimi
+    ticket = decisions.get("ticket")
+    ticket_in = 0.0
+    if ticket:
+        open_banks = {f"Banka {i + 1}" for i in range(bank_count_for_month(month, cfg))}
+        for side, acc, label in (("dd_out", "dd_accounts", "Vadesiz çekim"), ("td_out", "td_accounts", "Vadeli bozma")):
+            banks, amt = ticket_side(ticket, side)
+            bal = np.array([float(p[acc].get(b, 0.0)) for b in banks])
+            errors += [f"{label} ({b}) bakiyeyi aşıyor." for b, over in zip(banks, amt > bal + tol) if over]
+        for side in ("dd_in", "td_in"):
+            banks, amt = ticket_side(ticket, side)
+            ticket_in += float(amt.sum())
+            if banks and month < int(cfg["BANK_STAGE_FROM"]):
+                errors.append(f"{ASSETS[side[:2]]} bu ay açık değil.")
+            elif any(b not in open_banks for b in banks):
+                errors.append(f"{ASSETS[side[:2]]}: bu ay açık olmayan banka: {', '.join(b for b in banks if b not in open_banks)}")
+
+    income = income_for_month(float(p["income_base"]), month, cfg)
+    borrow = float(decisions.get("borrow") or 0.0)
+    if borrow > 0 and not can_borrow(month, cfg):
+        errors.append(f"{cfg['STEP_UNIT']} {month}: bankadan borç alınamaz.")
+    elif borrow > income * float(cfg["LOAN_MAX_MULT_INCOME"]) + tol:
+        errors.append("Borç, bu ayın borç tavanını aşıyor.")
+
+    buys = decisions.get("buy") or {}
+    for k, amt in buys.items():
+        if float(amt) > 0 and (k not in opened or (k in DEPOSIT_ASSETS and month < int(cfg["BANK_STAGE_FROM"]))):
+            errors.append(f"{ASSETS.get(k, k)} bu ay açık değil.")
+    available = (float(p["holdings"]["cash"]) + projected_sell_cash(p, decisions, cfg) + income
+                 - float(p["fixed_current"]) - float(p["extra_current"]) + borrow)
+    if sum(float(v) for v in buys.values()) + ticket_in > max(available, 0.0) + tol:
+        errors.append("Toplam yatırım, bu ay kullanılabilir nakdi aşıyor.")
+    return errors
+
+def _buy_units(p: dict, k: str, gross: float, net: float, month: int, prices: np.ndarray):
+    """Net tutarı açılış fiyatından birime çevirir; maliyete brüt tutar (komisyon + spread dahil) eklenir."""
+    price = float(prices[RISK_ASSETS.index(k)])
+    units = net / price
+    p["units"][k] = float(p["units"].get(k, 0.0) + units)
+    p["cost_basis"][k] = float(p["cost_basis"].get(k, 0.0) + gross)
+    p["lots"].append({"month": int(month), "asset": k, "side": "buy", "units": float(units),
+                      "price": price, "amount": float(gross), "pnl": 0.0})
+
+def _sell_units(p: dict, k: str, amt: float, net_cash: float, month: int, prices: np.ndarray) -> float:
+    """
+    amt TL'lik (piyasa değeri) satışı pozisyonla orantılı birime çevirir; ortalama maliyetle
+    gerçekleşen kâr/zararı (net nakit - satılan maliyet) döndürür.
+    """
+    value = float(p["holdings"].get(k, 0.0))
+    if value <= 0:
+        return 0.0
+    frac = min(amt / value, 1.0)
+    units = float(p["units"].get(k, 0.0)) * frac
+    cost_out = float(p["cost_basis"].get(k, 0.0)) * frac
+    pnl = net_cash - cost_out
+    p["units"][k] = float(p["units"][k] - units)
+    p["cost_basis"][k] = float(p["cost_basis"][k] - cost_out)
+    p["realized_pnl"][k] = float(p["realized_pnl"].get(k, 0.0) + pnl)
+    p["lots"].append({"month": int(month), "asset": k, "side": "sell", "units": float(units),
+                      "price": float(prices[RISK_ASSETS.index(k)]), "amount": float(amt), "pnl": float(pnl)})
+    return pnl
+
+def month_draws(rng: np.random.Generator, n_banks: int, cfg: dict = CFG) -> dict:
+    """
+    Oyuncunun ay içindeki bütün olay çekilişleri, akışta sabit sırada ve oyuncunun durumundan bağımsız:
+    hırsızlık (tetik u, şiddet), bankalar açıksa batış (ek batış u, banka seçimi u) ve küçük olay
+    ((vadesiz, vadeli) x banka u). İki strateji aynı ad ve seed ile aynı sayıları görür (ortak rastgele
+    sayılar); compare.py aynı çekilişlerden kontrol değişkenleri kurar.
+    """
+    # tek çağrı: akıştaki sayılar ayrı ayrı random()/uniform() çağrılarıyla bit düzeyinde aynıdır
+    n = int(n_banks)
+    u = rng.random(4 + 2 * n if n else 2)
+    head = u[:4].tolist()
+    lo = float(cfg["CASH_THEFT_SEV_MIN"])
+    out = {"theft": head[0], "severity": lo + (float(cfg["CASH_THEFT_SEV_MAX"]) - lo) * head[1]}
+    if n:
+        out["bankruptcy"] = (head[2], head[3])
+        out["incident"] = u[4:].reshape(2, n)
+    return out
+
+def closed_orders(p: dict, decisions: dict, sc: Scenario, month: int) -> list:
+    """
+    Bu ay uygulanamayan pozitif emirlerin varlıkları: açık olmayan varlıkta alım (validate_decisions ile
+    aynı kural) ya da elde tutulmayan varlıkta satış (mevduat çekimi sell_dd/sell_td alanlarıyla yapılır).
+    """
+    opened = sc.open_assets[sc.row(month)]
+    bad = [k for k, amt in (decisions.get("buy") or {}).items() if float(amt) > 0 and k not in opened]
+    bad += [k for k, amt in (decisions.get("sell") or {}).items() if float(amt) > 0 and k not in p["holdings"]]
+    return bad
+
+def _in_sorted(values: list, x) -> bool:
+    i = bisect.bisect_left(values, x)
+    return i < len(values) and values[i] == x
+
+# =========================
+# ÖLÇÜMLER (isteğe bağlı: settle_month(..., registry=metrics.REGISTRY))
+# =========================
+SETTLE_STAGE_METRIC = "wfg_settle_stage_seconds"
+_FEE_FIELDS = (("tx_fee", "İşlemÜcreti(TL)"), ("spread", "SpreadMaliyeti(TL)"), ("early_break", "VadeliBozmaCezası(TL)"))
+
+metrics.REGISTRY.describe(SETTLE_STAGE_METRIC, "Ay kapanışı aşama süresi (saniye).")
+metrics.REGISTRY.describe("wfg_settle_seconds", "Ay kapanışının toplam süresi (saniye).")
+metrics.REGISTRY.describe("wfg_settlements_total", "Kapatılan oyuncu-ay sayısı.")
+metrics.REGISTRY.describe("wfg_events_total", "Ay kapanışı olayları (kredi, hırsızlık, banka batışı, temerrüt).")
+metrics.REGISTRY.describe("wfg_loan_principal_tl_total", "Çekilen kredi anaparası (TL).")
+metrics.REGISTRY.describe("wfg_theft_loss_tl_total", "Hırsızlık kaybı (TL).")
+metrics.REGISTRY.describe("wfg_bankruptcy_loss_tl_total", "Banka batışında garanti üstü kayıp (TL).")
+metrics.REGISTRY.describe("wfg_fees_tl_total", "Tahsil edilen işlem ücreti, spread ve vadeli bozma cezası (TL).")
+
+def record_settlement(events: list, log_row: dict, seconds: float, registry: metrics.Registry = None):
+    """Bir ay kapanışının süresini, olaylarını ve ücretlerini sayaçlara yazar (log_row temerrütte None)."""
+    reg = metrics.REGISTRY if registry is None else registry
+    items = [("wfg_settlements_total", (), 1.0)]
+    for e in events:
+        kind = e["type"]
+        if kind == "loan":
+            items += [("wfg_events_total", (("type", kind),), 1.0), ("wfg_loan_principal_tl_total", (), e["principal"])]
+        elif kind == "theft":
+            items += [("wfg_events_total", (("type", kind),), 1.0), ("wfg_theft_loss_tl_total", (), e["loss"])]
+        elif kind == "bankruptcy":
+            key = (("contagion", "true" if e.get("contagion") else "false"), ("type", kind))
+            items += [("wfg_events_total", key, 1.0), ("wfg_bankruptcy_loss_tl_total", (), e["loss"])]
+        elif kind != "pgl":
+            items.append(("wfg_events_total", (("type", kind),), 1.0))
+    if log_row is not None:
+        for kind, field in _FEE_FIELDS:
+            items.append(("wfg_fees_tl_total", (("kind", kind),), float(log_row.get(field, 0.0))))
+    reg.inc_many(items)
+    reg.observe_many("wfg_settle_seconds", (((), seconds),))
+
+def settle_month(p: dict, name: str, decisions: dict, market: Market, registry: metrics.Registry = None) -> list:
+    """
+    Oyuncunun bu ayını kapatır (A..L adımları), p'yi yerinde günceller.
+    Dönen liste arayüzün pop-up olarak göstereceği olaylardır:
+    {"type": "loan" | "theft" | "bankruptcy" | "pgl" | "default", ...}.
+    Temerrütte hesaplaşma o adımda durur (arayüzdeki st.rerun() ile aynı).
+    registry verilirse (ör. metrics.REGISTRY) aşama süreleri ve olay sayaçları oraya yazılır; verilmezse
+    ölçüm yapılmaz (bot, sim ve turnuva döngüleri ölçüm maliyeti ödemez).
+    """
+    if registry is None:
+        return _settle_month(p, name, decisions, market, metrics.NULL_TIMER)
+    timer = metrics.StageTimer(SETTLE_STAGE_METRIC, registry)
+    n_log = len(p["log"])
+    events = _settle_month(p, name, decisions, market, timer)
+    record_settlement(events, p["log"][-1] if len(p["log"]) > n_log else None, timer.flush(), registry)
+    return events
+
+def _settle_month(p: dict, name: str, decisions: dict, market: Market, timer: metrics.StageTimer) -> list:
+    cfg = market.cfg
+    sc = market.scenario
+    month = int(p["month"])
+    income = sc.income(p["income_base"], month)
+    pgl = float(p["pgl_current"])
+    fixed_this_month = float(p["fixed_current"])
+    extra_this_month = float(p["extra_current"])
+    events = []
+    lap = timer.lap
+
+    # arayüz validate_decisions ile süzer; botlar ve sim doğrudan çağırır: p'ye dokunmadan reddet
+    bad = closed_orders(p, decisions, sc, month)
+    if bad:
+        raise ValueError(f"{sc.unit} {month}: açık olmayan varlıkta emir: {', '.join(ASSETS.get(k, str(k)) for k in bad)}")
+
+    rng = rng_for_player(name, month, market.seed)
+    prices_open = market.prices(month - 1)
+    ensure_positions(p, prices_open)
+
+    theft_loss = 0.0
+    bank_loss = 0.0
+    bankruptcy_loss = 0.0
+    td_interest = 0.0
+    tx_fee_total = 0.0
+    spread_cost_total = 0.0
+    early_break_penalty_total = 0.0
+    sell_cash_in = 0.0
+    realized_total = 0.0
+
+    bank_map_local = market.bank_map(month)
+    for key, slot in (("dd_bank", "last_dd_bank"), ("td_bank", "last_td_bank"), ("loan_bank", "loan_bank")):
+        if decisions.get(key) in bank_map_local:
+            p[slot] = decisions[key]
+
+    lap("setup")
+
+    # A) satış/bozma
+    for k, amt in (decisions.get("sell") or {}).items():
+        amt = float(amt)
+        if amt <= 0:
+            continue
+        amt = min(amt, float(p["holdings"].get(k, 0.0)))
+        fee_part = amt * sc.fee
+        spr_part = amt * sc.spread_half[k]
+        net_cash = amt * (1.0 - sc.sell_rate[k])
+
+        if k in RISK_ASSETS:
+            realized_total += _sell_units(p, k, amt, max(net_cash, 0.0), month, prices_open)
+        p["holdings"][k] -= amt
+        p["holdings"]["cash"] += max(net_cash, 0.0)
+        sell_cash_in += max(net_cash, 0.0)
+
+        tx_fee_total += fee_part
+        spread_cost_total += spr_part
+
+    sell_dd_amt = float(decisions.get("sell_dd_amt") or 0.0)
+    sell_dd_bank = decisions.get("sell_dd_bank")
+    banks_open = sc.bank_count(month) > 0
+    if banks_open and sell_dd_amt > 0 and sell_dd_bank:
+        bal = float(p["dd_accounts"].get(sell_dd_bank, 0.0))
+        amt = float(min(sell_dd_amt, bal))
+        fee_part = amt * sc.fee
+        net_cash = amt * (1.0 - sc.fee)
+        p["dd_accounts"][sell_dd_bank] = bal - amt
+        p["holdings"]["cash"] += max(net_cash, 0.0)
+        sell_cash_in += max(net_cash, 0.0)
+        tx_fee_total += fee_part
+
+    sell_td_amt = float(decisions.get("sell_td_amt") or 0.0)
+    sell_td_bank = decisions.get("sell_td_bank")
+    if banks_open and sell_td_amt > 0 and sell_td_bank:
+        bal = float(p["td_accounts"].get(sell_td_bank, 0.0))
+        amt = float(min(sell_td_amt, bal))
+        pen_part = amt * sc.break_penalty
+        fee_part = amt * sc.fee
+        net_cash = amt * (1.0 - sc.break_penalty - sc.fee)
+        p["td_accounts"][sell_td_bank] = bal - amt
+        p["holdings"]["cash"] += max(net_cash, 0.0)
+        sell_cash_in += max(net_cash, 0.0)
+        early_break_penalty_total += pen_part
+        tx_fee_total += fee_part
+
+    # toplu emir: çekim/bozma, banka vektörü üzerinde tek geçiş (emir yoksa atlanır)
+    ticket = decisions.get("ticket") if banks_open else None
+    if ticket:
+        for side, acc, pen_rate in (("dd_out", "dd_accounts", 0.0), ("td_out", "td_accounts", sc.break_penalty)):
+            banks, want = ticket_side(ticket, side)
+            if not banks:
+                continue
+            bal = np.array([float(p[acc].get(b, 0.0)) for b in banks])
+            amt = np.minimum(want, bal)
+            for b, taken, left in zip(banks, amt.tolist(), (bal - amt).tolist()):
+                if taken > 0:
+                    p[acc][b] = left
+            total = float(amt.sum())
+            net_cash = max(float((amt * (1.0 - pen_rate - sc.fee)).sum()), 0.0)
+            p["holdings"]["cash"] += net_cash
+            sell_cash_in += net_cash
+            early_break_penalty_total += total * pen_rate
+            tx_fee_total += total * sc.fee
+
+    lap("sales")
+
+    # B) gelir/gider
+    p["holdings"]["cash"] += income
+    p["holdings"]["cash"] -= float(fixed_this_month + extra_this_month)
+
+    lap("income")
+
+    # C) borç al
+    new_borrow_taken = 0.0
+    borrow_amt = float(decisions.get("borrow") or 0.0)
+    if sc.can_borrow(month) and borrow_amt > 0:
+        sel_bank = p.get("loan_bank")
+        loan_rate = float(bank_map_local[sel_bank]["Loan_Rate"]) if (bank_map_local and sel_bank in bank_map_local) else 0.03
+        new_borrow_taken = borrow_amt
+
+        p["holdings"]["cash"] += new_borrow_taken
+        due_amt = float(new_borrow_taken * (1.0 + loan_rate))
+        p["loans"].append({
+            "principal": float(new_borrow_taken),
+            "rate": float(loan_rate),
+            "bank": str(sel_bank),
+            "taken_month": int(month),
+            "due_month": int(month + 1),
+        })
+
+        events.append({
+            "type": "loan",
+            "player": str(name),
+            "month": int(month),
+            "principal": float(new_borrow_taken),
+            "rate": float(loan_rate),
+            "due": float(due_amt),
+        })
+
+    lap("borrow")
+
+    # D) açık -> temerrüt
+    if p["holdings"]["cash"] < 0:
+        p["holdings"]["cash"] = 0.0
+        p["defaulted"] = True
+        p["finished"] = True
+        events.append({"type": "default", "player": str(name), "month": int(month),
+                       "message": "⛔ Bu ay açık oluştu: TEMERRÜT!"})
+        lap("default_check")
+        return events
+    lap("default_check")
+
+    # E) işlemler / mevduat-yatırım
+    for k, buy_amt in (decisions.get("buy") or {}).items():
+        buy_amt = float(buy_amt)
+        if buy_amt <= 0:
+            continue
+
+        p["holdings"]["cash"] -= buy_amt
+        if p["holdings"]["cash"] < 0:
+            p["holdings"]["cash"] = 0.0
+            p["defaulted"] = True
+            p["finished"] = True
+            events.append({"type": "default", "player": str(name), "month": int(month),
+                           "message": "⛔ İşlemler nakdi aştı: TEMERRÜT!"})
+            lap("buys")
+            return events
+
+        if k in DEPOSIT_ASSETS and banks_open:
+            fee_part = buy_amt * sc.fee
+            net = buy_amt * (1.0 - sc.fee)
+            tx_fee_total += fee_part
+            if k == "dd":
+                bank = p.get("last_dd_bank") or "Banka 1"
+                p["dd_accounts"][bank] = float(p["dd_accounts"].get(bank, 0.0) + max(net, 0.0))
+            else:
+                bank = p.get("last_td_bank") or "Banka 1"
+                p["td_accounts"][bank] = float(p["td_accounts"].get(bank, 0.0) + max(net, 0.0))
+        else:
+            spr_half = sc.spread_half[k]
+            fee_part = buy_amt * sc.fee
+            spr_part = buy_amt * spr_half
+            net = buy_amt * (1.0 - (sc.fee + spr_half))
+            tx_fee_total += fee_part
+            spread_cost_total += spr_part
+            p["holdings"][k] += max(net, 0.0)
+            if k in RISK_ASSETS:
+                _buy_units(p, k, buy_amt, max(net, 0.0), month, prices_open)
+
+    # toplu emir: banka başına yatırma
+    if ticket:
+        for side, acc in (("dd_in", "dd_accounts"), ("td_in", "td_accounts")):
+            banks, amt = ticket_side(ticket, side)
+            if not banks:
+                continue
+            p["holdings"]["cash"] -= float(amt.sum())
+            if p["holdings"]["cash"] < 0:
+                p["holdings"]["cash"] = 0.0
+                p["defaulted"] = True
+                p["finished"] = True
+                events.append({"type": "default", "player": str(name), "month": int(month),
+                               "message": "⛔ İşlemler nakdi aştı: TEMERRÜT!"})
+                lap("buys")
+                return events
+            for b, net in zip(banks, (amt * (1.0 - sc.fee)).tolist()):
+                p[acc][b] = float(p[acc].get(b, 0.0) + net)
+            tx_fee_total += float(amt.sum()) * sc.fee
+
+    lap("buys")
+
+    # F) hırsızlık
+    draws = month_draws(rng, len(bank_map_local) if banks_open else 0, cfg)
+    sev = draws["severity"]
+    theft_trigger = False
+    if _in_sorted(p.get("theft_months", []), month) and float(p["holdings"]["cash"]) > 0:
+        theft_trigger = True
+    else:
+        if float(p["holdings"]["cash"]) > 0 and draws["theft"] < sc.theft_prob[sc.row(month)]:
+            theft_trigger = True
+
+    if theft_trigger and float(p["holdings"]["cash"]) > 0:
+        theft_loss = float(p["holdings"]["cash"]) * sev
+        p["holdings"]["cash"] -= theft_loss
+        events.append({
+            "type": "theft",
+            "loss": float(theft_loss),
+            "remain": float(p["holdings"]["cash"]),
+            "month": int(month),
+            "player": str(name),
+        })
+
+    lap("theft")
+
+    # G) banka batışı (para olan bankada) + küçük olay + vadeli faiz
+    if banks_open and bank_map_local:
+        # ✅ bu ay batacak banka(lar)ı oyuncunun mevduatı olan bankadan seç
+        first_banks = choose_bankruptcy_for_player_month(p, month, bank_map_local, draws["bankruptcy"], cfg)
+        bad_banks = set(first_banks)
+        if cfg.get("SYSTEMIC_MODE") and first_banks:
+            # bulaşma: ağda yayılan batışlar; mevduatı olmayan bankalar oyuncuyu etkilemez
+            bad_banks = market.failed_banks(month, first_banks)
+
+        # BATIŞ uygula
+        for bank in sorted(list(bad_banks)):
+            guar = float(bank_map_local[bank]["Guarantee"])
+            dd_before = float(p["dd_accounts"].get(bank, 0.0))
+            td_before = float(p["td_accounts"].get(bank, 0.0))
+            if bank not in first_banks and dd_before + td_before <= 0:
+                continue
+
+            # garanti altındaki kısım kalır
+            dd_after = dd_before * guar
+            td_after = td_before * guar
+            loss_here = (dd_before - dd_after) + (td_before - td_after)
+
+            # oyuncunun gerçekten parası olduğu için mutlaka etkisi var
+            p["dd_accounts"][bank] = float(dd_after)
+            p["td_accounts"][bank] = float(td_after)
+
+            bankruptcy_loss += float(loss_here)
+            bank_loss += float(loss_here)
+
+            # oyuncu bazlı sayacı artır
+            p["bankruptcies_seen"] = int(p.get("bankruptcies_seen", 0)) + 1
+            if bank not in p.get("bankrupt_banks_history", []):
+                p["bankrupt_banks_history"].append(bank)
+
+            events.append({
+                "type": "bankruptcy",
+                "player": str(name),
+                "month": int(month),
+                "bank": str(bank),
+                "guarantee": float(guar),
+                "dd_before": float(dd_before),
+                "td_before": float(td_before),
+                "loss": float(loss_here),
+                "remain": float(dd_after + td_after),
+                "contagion": bank not in first_banks,
+            })
+
+        lap("bankruptcy")
+
+        # küçük banka olayı (batık olmayan)
+        for acc, row in zip(("dd_accounts", "td_accounts"), draws["incident"].tolist()):
+            for bank, u in zip(bank_map_local, row):
+                if u >= sc.incident_prob:
+                    continue
+                bal = float(p[acc].get(bank, 0.0))
+                if bal <= 0 or bank in bad_banks:
+                    continue
+                guar = float(bank_map_local[bank]["Guarantee"])
+                loss = float(bal * (1.0 - guar))
+                p[acc][bank] = float(max(0.0, bal - loss))
+                bank_loss += loss
+
+        lap("incidents")
+
+        # vadeli faiz (batık olmayan)
+        for bank, bal in list(p["td_accounts"].items()):
+            if float(bal) > 0 and bank in bank_map_local and bank not in bad_banks:
+                before = float(bal)
+                rate = float(bank_map_local[bank]["TD_Rate"])
+                after = float(before * (1.0 + rate))
+                p["td_accounts"][bank] = after
+                td_interest += (after - before)
+        lap("td_interest")
+
+    # H) piyasa: ay sonu fiyatlarıyla yeniden değerleme
+    mark_to_market(p, market.prices(month))
+    lap("market")
+
+    # I) borç ödeme
+    due_now_actual = float(loan_due_amount(p, month))
+    repay_done = 0.0
+    if due_now_actual > 0:
+        if float(p["holdings"]["cash"]) + 1e-9 < due_now_actual:
+            p["defaulted"] = True
+            p["finished"] = True
+            events.append({"type": "default", "player": str(name), "month": int(month),
+                           "message": "⛔ Vadesi gelen 1 aylık borç ödenemedi: TEMERRÜT!"})
+            lap("repayment")
+            return events
+        p["holdings"]["cash"] -= due_now_actual
+        repay_done = due_now_actual
+        remove_due_loans(p, month)
+
+    lap("repayment")
+
+    # J) log
+    end_cash = float(p["holdings"]["cash"])
+    end_inv = float(total_investments(p))
+    end_total_debt_view = float(total_debt_display(p, month))
+    end_total = float(end_cash + end_inv - loan_outstanding_principal(p))
+
+    p["log"].append({
+        "Ay": int(month),
+        "Aşama": sc.stage(month),
+        "FiyatlarGenelDuzeyi": float(pgl),
+        "Gelir(TL)": float(income),
+        "SabitGider(TL)": float(fixed_this_month),
+        "EkHarcama(TL)": float(extra_this_month),
+        "SatışNetNakitGirişi(TL)": float(sell_cash_in),
+        "GerçekleşenKârZarar(TL)": float(realized_total),
+        "GerçekleşmemişKârZarar(TL)": float(unrealized_pnl(p)),
+        "YeniBorç(1ay)(TL)": float(new_borrow_taken),
+        "VadesiGelenBorçÖdeme(TL)": float(repay_done),
+        "İşlemÜcreti(TL)": float(tx_fee_total),
+        "SpreadMaliyeti(TL)": float(spread_cost_total),
+        "VadeliBozmaCezası(TL)": float(early_break_penalty_total),
+        "VadeliFaizGeliri(TL)": float(td_interest),
+        "BankaKayıp(TL)": float(bank_loss),
+        "BankaBatışıKayıp(TL)": float(bankruptcy_loss),
+        "NakitHırsızlıkKayıp(TL)": float(theft_loss),
+        "DönemSonuNakit(TL)": float(end_cash),
+        "DönemSonuYatırım(TL)": float(end_inv),
+        "Borç(Anapara)(TL)": float(loan_outstanding_principal(p)),
+        "Borç(Görünüm)(TL)": float(end_total_debt_view),
+        "ToplamServet(TL)": float(end_total),
+        "BankaBatışı_Sayı": int(p.get("bankruptcies_seen", 0)),
+    })
+
+    lap("log")
+
+    # K) PGL update
+    pgl_history = market.pgl_path()
+    if month < sc.months:
+        pgl_prev = float(p["pgl_current"])
+        fixed_prev = float(p["fixed_current"])
+        extra_prev = float(p["extra_current"])
+
+        if pgl_history is not None:
+            # tarihsel pencere: bir sonraki ayın FGD'si seriden okunur (bant sınırı uygulanmaz)
+            pgl_next = float(pgl_history[month])
+            realized_delta = float(pgl_next - pgl_prev)
+        else:
+            pgl_next, realized_delta = next_pgl(pgl_prev, rng_for_player(name, month + 1, market.seed), cfg)
+
+        fixed_next = float(max(0.0, fixed_prev * (1.0 + realized_delta)))
+        extra_next = float(max(0.0, extra_prev * (1.0 + realized_delta)))
+
+        p["pgl_current"] = float(pgl_next)
+        p["fixed_current"] = float(fixed_next)
+        p["extra_current"] = float(extra_next)
+
+        events.append({
+            "type": "pgl",
+            "player": str(name),
+            "from_month": int(month),
+            "to_month": int(month + 1),
+            "pgl_prev": float(pgl_prev),
+            "pgl_new": float(pgl_next),
+            "step_used": float(realized_delta),
+            "fixed_prev": float(fixed_prev),
+            "fixed_new": float(fixed_next),
+            "extra_prev": float(extra_prev),
+            "extra_new": float(extra_next),
+        })
+
+    # L) ay ilerlet
+    if month >= sc.months:
+        p["finished"] = True
+    else:
+        p["month"] += 1
+    lap("pgl")
+
+    return events
@@ -0,0 +1,202 @@
+"""
+Süreç içi ölçümler (sayaç + gecikme histogramı) ve Prometheus metin biçimi çıktısı.
+
+Ölçüm isteğe bağlıdır: settle_month(..., registry=REGISTRY) ay kapanışını aşama aşama buraya yazar
+(uygulama ve sim --metrics bunu yapar; botlar, turnuva ve compare ölçümsüz çalışır). Aynı süreçteki
+bütün oturumlar tek REGISTRY'yi paylaşır, böylece bir sınıfın tamamı tek uç noktadan izlenir:
+
+    WFG_METRICS_PORT=9108 streamlit run app.py      # http://127.0.0.1:9108/metrics
+    python -m sim --players 10000 --metrics out.prom   # node_exporter textfile biçimi
+
+Harici bağımlılık yoktur; yalnızca Prometheus metin biçimi (0.0.4) üretilir.
+"""
+import bisect
+import http.server
+import os
+import threading
+import time
+
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 5e-3, 1e-2, 0.1)
+
+class Registry:
+    """
+    Sayaçlar ve histogramlar: ad -> {etiket demeti: değer}. Bütün metotlar iş parçacığı güvenlidir.
+    snapshot()/merge() işçi süreçlerin ölçümlerini ana süreçte toplamak içindir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._counters = {}
+        self._hists = {}
+
+    def describe(self, name: str, text: str):
+        self._help[name] = text
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + float(value)
+
+    def inc_many(self, items):
+        """[(ad, etiket demeti, artış), ...] tek kilitle (etiket demeti sıralı (ad, değer) çiftleri)."""
+        with self._lock:
+            for name, key, value in items:
+                series = self._counters.setdefault(name, {})
+                series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, buckets: tuple = LATENCY_BUCKETS, **labels):
+        self.observe_many(name, ((tuple(sorted(labels.items())), value),), buckets)
+
+    def observe_many(self, name: str, items, buckets: tuple = LATENCY_BUCKETS):
+        """[(etiket demeti, değer), ...] tek kilitle; sıcak döngüde aşama süreleri için."""
+        with self._lock:
+            series = self._hists.setdefault(name, {})
+            for key, value in items:
+                h = series.get(key)
+                if h is None:
+                    h = series[key] = {"buckets": tuple(buckets), "counts": [0] * (len(buckets) + 1), "sum": 0.0}
+                h["counts"][bisect.bisect_left(h["buckets"], value)] += 1
+                h["sum"] += value
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._hists.clear()
+
+    def snapshot(self) -> dict:
+        """Seçilebilir (pickle) düz kopya."""
+        with self._lock:
+            return {
+                "help": dict(self._help),
+                "counters": {n: dict(s) for n, s in self._counters.items()},
+                "hists": {n: {k: {"buckets": h["buckets"], "counts": list(h["counts"]), "sum": h["sum"]}
+                              for k, h in s.items()} for n, s in self._hists.items()},
+            }
+
+    def merge(self, snap: dict):
+        with self._lock:
+            self._help.update(snap.get("help", {}))
+            for name, series in snap.get("counters", {}).items():
+                mine = self._counters.setdefault(name, {})
+                for key, v in series.items():
+                    mine[key] = mine.get(key, 0.0) + v
+            for name, series in snap.get("hists", {}).items():
+                mine = self._hists.setdefault(name, {})
+                for key, h in series.items():
+                    cur = mine.get(key)
+                    if cur is None:
+                        mine[key] = {"buckets": tuple(h["buckets"]), "counts": list(h["counts"]), "sum": h["sum"]}
+                    else:
+                        cur["counts"] = [a + b for a, b in zip(cur["counts"], h["counts"])]
+                        cur["sum"] += h["sum"]
+
+    def render(self) -> str:
+        """Prometheus metin biçimi."""
+        snap = self.snapshot()
+        out = []
+        for name in sorted(snap["counters"]):
+            out += _header(name, "counter", snap["help"])
+            for key, v in sorted(snap["counters"][name].items()):
+                out.append(f"{name}{_labels(key)} {_num(v)}")
+        for name in sorted(snap["hists"]):
+            out += _header(name, "histogram", snap["help"])
+            for key, h in sorted(snap["hists"][name].items()):
+                cum = 0
+                for le, c in zip(h["buckets"], h["counts"]):
+                    cum += c
+                    out.append(f"{name}_bucket{_labels(key + (('le', _num(le)),))} {cum}")
+                cum += h["counts"][-1]
+                out.append(f"{name}_bucket{_labels(key + (('le', '+Inf'),))} {cum}")
+                out.append(f"{name}_sum{_labels(key)} {_num(h['sum'])}")
+                out.append(f"{name}_count{_labels(key)} {cum}")
+        return "\n".join(out) + "\n"
+
+def _header(name: str, kind: str, helps: dict) -> list:
+    lines = [f"# HELP {name} {helps[name]}"] if name in helps else []
+    return lines + [f"# TYPE {name} {kind}"]
+
+def _labels(key: tuple) -> str:
+    if not key:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in key)
+    return "{" + body + "}"
+
+def _num(v: float) -> str:
+    return repr(float(v))
+
+REGISTRY = Registry()
+
+_STAGE_KEYS = {}
+
+class StageTimer:
+    """
+    Ardışık aşama süreleri: lap(aşama) bir önceki lap'ten bu yana geçen süreyi biriktirir,
+    flush() hepsini tek seferde histograma yazar ve toplam süreyi döndürür.
+    """
+    __slots__ = ("name", "registry", "start", "_last", "_laps")
+
+    def __init__(self, name: str, registry: Registry = None):
+        self.name = name
+        self.registry = REGISTRY if registry is None else registry
+        self.start = self._last = time.perf_counter()
+        self._laps = []
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        key = _STAGE_KEYS.get(stage)
+        if key is None:
+            key = _STAGE_KEYS[stage] = (("stage", stage),)
+        self._laps.append((key, now - self._last))
+        self._last = now
+
+    def flush(self) -> float:
+        self.registry.observe_many(self.name, self._laps)
+        self._laps = []
+        return self._last - self.start
+
+class NullTimer:
+    """StageTimer yerine geçen boş zamanlayıcı: ölçüm istenmediğinde lap/flush hiçbir şey yapmaz."""
+    __slots__ = ()
+
+    def lap(self, stage: str):
+        return None
+
+    def flush(self) -> float:
+        return 0.0
+
+NULL_TIMER = NullTimer()
+
+# =========================
+# DIŞA AKTARMA
+# =========================
+def write_textfile(path: str, registry: Registry = None):
+    """node_exporter textfile toplayıcısı için atomik yazım (geçici dosya + os.replace)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write((REGISTRY if registry is None else registry).render())
+    os.replace(tmp, path)
+
+def serve(port: int, host: str = "127.0.0.1", registry: Registry = None) -> http.server.ThreadingHTTPServer:
+    """/metrics uç noktasını arka plan iş parçacığında başlatır; sunucu nesnesini döndürür."""
+    reg = REGISTRY if registry is None else registry
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = reg.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, int(port)), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    return server
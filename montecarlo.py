@@ -0,0 +1,214 @@
+"""
+Karar ekranı için ay sonu servet önizlemesi (Monte Carlo).
+
+Bekleyen kararlar (satış, borç, yatırım) önce deterministik olarak uygulanır (settle_month A–E adımlarının
+nakit akışı); ortaya çıkan durum hashlenebilir bir demet olarak döner (preview_key) ve arayüzde
+st.cache_data anahtarı olur. Ay sonundaki rastgele kısım — hırsızlık, küçük banka olayı, banka batışı,
+piyasa getirisi — CFG dağılımlarından ~1000 vektörel çekilişle örneklenir.
+
+Aynı çekilişler risk panelinde de kullanılır (risk_key / portfolio_risk): bugünkü portföyün bir aylık
+%95 VaR ve Beklenen Kayıp (ES) değeri; piyasa, mevduat (güvence + batış/olay) ve nakit hırsızlığı bileşenleriyle.
+
+Gizli bilgi kullanılmaz: oyuncunun kesin hırsızlık ayları ve seed'in fiyat yolu önizlemeye girmez,
+yalnızca öğrencinin de bildiği olasılıklar kullanılır. Sistemik mod bulaşması önizlemede yoktur;
+tarihsel stres penceresinde de getiriler CFG dağılımından çekilir (pencerenin gelecek ayları gizlidir).
+"""
+import numpy as np
+
+from engine import (
+    PRICE_FLOOR, RISK_ASSETS, can_borrow, income_for_month, buy_cost_rate, sell_cost_rate,
+    loan_due_amount, loan_outstanding_principal, ticket_side,
+)
+
+PREVIEW_DRAWS = 1000
+PREVIEW_QUANTILES = (0.05, 0.25, 0.50, 0.75, 0.95)
+RISK_DRAWS = 4000
+RISK_LEVEL = 0.95
+RISK_COMPONENTS = ("market", "deposit", "theft")
+
+def preview_key(p: dict, decisions: dict, bank_map: dict, cfg: dict) -> tuple:
+    """
+    Kararlar uygulandıktan sonraki (hırsızlık/batış/getiri öncesi) durum:
+    (ay, nakit, vadesi gelen ödeme, kalan anapara, riskli varlık değerleri,
+     ((banka, vadesiz, vadeli, güvence, vadeli faiz, batış ağırlığı), ...), batış olasılığı).
+    """
+    month = int(p["month"])
+    banks_open = month >= int(cfg["BANK_STAGE_FROM"])
+    fee = float(cfg["TX_FEE"])
+    cash = float(p["holdings"]["cash"])
+    risk = {k: float(p["holdings"].get(k, 0.0)) for k in RISK_ASSETS}
+    dd = {b: float(v) for b, v in p.get("dd_accounts", {}).items()}
+    td = {b: float(v) for b, v in p.get("td_accounts", {}).items()}
+
+    # A) satış/bozma
+    for k, amt in (decisions.get("sell") or {}).items():
+        amt = min(float(amt), risk.get(k, 0.0))
+        if amt > 0:
+            risk[k] -= amt
+            cash += amt * (1.0 - sell_cost_rate(k, cfg))
+    for acc, bank, amt, keep in (
+        (dd, decisions.get("sell_dd_bank"), decisions.get("sell_dd_amt"), 1.0 - fee),
+        (td, decisions.get("sell_td_bank"), decisions.get("sell_td_amt"), 1.0 - fee - float(cfg["EARLY_BREAK_PENALTY"])),
+    ):
+        amt = min(float(amt or 0.0), acc.get(bank, 0.0))
+        if banks_open and bank and amt > 0:
+            acc[bank] -= amt
+            cash += amt * keep
+    ticket = decisions.get("ticket") if banks_open else None
+    for acc, side, keep in ((dd, "dd_out", 1.0 - fee), (td, "td_out", 1.0 - fee - float(cfg["EARLY_BREAK_PENALTY"]))):
+        for bank, amt in zip(*ticket_side(ticket, side)):
+            amt = min(float(amt), acc.get(bank, 0.0))
+            acc[bank] = acc.get(bank, 0.0) - amt
+            cash += amt * keep
+
+    # B–C) gelir/gider, borç
+    cash += income_for_month(float(p["income_base"]), month, cfg) - float(p["fixed_current"]) - float(p["extra_current"])
+    borrow = float(decisions.get("borrow") or 0.0) if can_borrow(month, cfg) else 0.0
+    cash += borrow
+
+    # E) işlemler
+    for k, amt in (decisions.get("buy") or {}).items():
+        amt = float(amt)
+        if amt <= 0:
+            continue
+        cash -= amt
+        if k == "dd" and banks_open:
+            bank = decisions.get("dd_bank") or p.get("last_dd_bank") or "Banka 1"
+            dd[bank] = dd.get(bank, 0.0) + amt * (1.0 - fee)
+        elif k == "td" and banks_open:
+            bank = decisions.get("td_bank") or p.get("last_td_bank") or "Banka 1"
+            td[bank] = td.get(bank, 0.0) + amt * (1.0 - fee)
+        elif k in risk:
+            risk[k] += amt * (1.0 - buy_cost_rate(k, cfg))
+    for acc, side in ((dd, "dd_in"), (td, "td_in")):
+        for bank, amt in zip(*ticket_side(ticket, side)):
+            cash -= float(amt)
+            acc[bank] = acc.get(bank, 0.0) + float(amt) * (1.0 - fee)
+
+    deposits, p_fail = _deposit_state(p, dd, td, bank_map, cfg)
+    debt = loan_outstanding_principal(p) + borrow
+    due = float(loan_due_amount(p, month))
+    due_principal = float(sum(float(ln["principal"]) for ln in p.get("loans", []) if int(ln["due_month"]) == month))
+    return (month, cash, due, debt - due_principal, tuple(risk[k] for k in RISK_ASSETS), deposits, p_fail)
+
+def _deposit_state(p: dict, dd: dict, td: dict, bank_map: dict, cfg: dict) -> tuple:
+    """((banka, vadesiz, vadeli, güvence, vadeli faiz, batış ağırlığı), ...) ve bu ayın batış olasılığı."""
+    month = int(p["month"])
+    # batış: zorlama penceresinde kesin, sonrasında küçük ihtimal; yeni (daha önce batmamış) bankalar öncelikli
+    seen = int(p.get("bankruptcies_seen", 0))
+    must = int(cfg["BANKRUPTCY_MIN_EVENTS_PER_PLAYER"])
+    force = int(cfg["BANKRUPTCY_FORCE_START_MONTH"]) <= month <= int(cfg["BANKRUPTCY_FORCE_END_MONTH"])
+    p_fail = 1.0 if (seen < must and force) else (float(cfg["BANKRUPTCY_EXTRA_PROB_AFTER_MIN"]) if seen >= must else 0.0)
+    history = set(p.get("bankrupt_banks_history", []))
+    banks = [b for b in bank_map if dd.get(b, 0.0) + td.get(b, 0.0) > 0]
+    fresh = [b for b in banks if b not in history] or banks
+    deposits = tuple(
+        (b, dd.get(b, 0.0), td.get(b, 0.0), float(bank_map[b]["Guarantee"]), float(bank_map[b]["TD_Rate"]),
+         dd.get(b, 0.0) + td.get(b, 0.0) if b in fresh else 0.0)
+        for b in banks
+    )
+    banks_open = month >= int(cfg["BANK_STAGE_FROM"])
+    return deposits, (p_fail if (banks_open and banks) else 0.0)
+
+# =========================
+# ÇEKİLİŞLER (vektörel; çağrı sırası rastgele sayı akışının parçasıdır)
+# =========================
+def _cash_end(rng, cash: float, month: int, cfg: dict, n: int) -> np.ndarray:
+    """F) hırsızlık (yalnızca nakit)."""
+    p_theft = float(cfg["CASH_THEFT_PROB_STAGE1"] if month < int(cfg["BANK_STAGE_FROM"]) else cfg["CASH_THEFT_PROB_STAGE2"])
+    sev = rng.uniform(cfg["CASH_THEFT_SEV_MIN"], cfg["CASH_THEFT_SEV_MAX"], size=n)
+    return cash * (1.0 - np.where(rng.random(n) < p_theft, sev, 0.0)) if cash > 0 else np.full(n, cash)
+
+def _deposits_end(rng, deposits: tuple, p_fail: float, cfg: dict, n: int) -> np.ndarray:
+    """G) batış (güvence oranı kadar kalır) + küçük olay + vadeli faiz."""
+    if not deposits:
+        return np.zeros(n)
+    dd, td, guar, rate, w = np.array([d[1:] for d in deposits], dtype=float).T
+    nb = len(deposits)
+    fail = rng.random(n) < p_fail
+    cdf = np.cumsum(w) / max(w.sum(), 1e-9)
+    pick = np.minimum(np.searchsorted(cdf, rng.random(n)), nb - 1)
+    failed = np.zeros((n, nb), dtype=bool)
+    failed[np.arange(n), pick] = fail
+    inc_p = float(cfg["BANK_INCIDENT_PROB"])
+    dd_cut = np.where(failed | (rng.random((n, nb)) < inc_p), guar, 1.0)
+    td_cut = np.where(failed | (rng.random((n, nb)) < inc_p), guar, 1.0)
+    return (dd * dd_cut + td * td_cut * np.where(failed, 1.0, 1.0 + rate)).sum(axis=1)
+
+def _risk_end(rng, risk: tuple, month: int, cfg: dict, n: int) -> np.ndarray:
+    """H) piyasa getirileri (CFG dağılımı; kriz ayında şok eklenir)."""
+    risk = np.array(risk, dtype=float)
+    if not risk.any():
+        return np.zeros(n)
+    mu = np.array([float(cfg[f"{k.upper()}_MU"]) for k in RISK_ASSETS])
+    sig = np.array([float(cfg[f"{k.upper()}_SIG"]) for k in RISK_ASSETS])
+    r = rng.normal(mu, sig, size=(n, len(RISK_ASSETS)))
+    if month == int(cfg["CRISIS_MONTH"]):
+        r += np.array([float(cfg[f"CRISIS_{k.upper()}"]) for k in RISK_ASSETS])
+    return (risk[None, :] * np.maximum(1.0 + r, PRICE_FLOOR)).sum(axis=1)
+
+def simulate_month_end(key: tuple, cfg: dict, n: int = PREVIEW_DRAWS, seed: int = 34) -> dict:
+    """
+    preview_key durumundan n ay sonu net servet çekilişi. Çekilişler sabit seed'lidir:
+    aynı girdiler aynı sonucu, farklı girdiler ortak rastgele sayılarla karşılaştırılabilir sonuç verir.
+    """
+    month, cash, due, debt, risk, deposits, p_fail = key
+    rng = np.random.default_rng(seed)
+
+    # D) açık -> temerrüt (kesin)
+    if cash < 0:
+        return {"quantiles": [0.0] * len(PREVIEW_QUANTILES), "mean": 0.0, "p_default": 1.0, "draws": n}
+
+    cash_end = _cash_end(rng, cash, month, cfg, n)
+    dep_end = _deposits_end(rng, deposits, p_fail, cfg, n)
+    risk_end = _risk_end(rng, risk, month, cfg, n)
+
+    # I) vadesi gelen borç
+    defaulted = cash_end + 1e-9 < due
+    wealth = cash_end - due + dep_end + risk_end - debt
+    return {
+        "quantiles": np.quantile(wealth, PREVIEW_QUANTILES).tolist(),
+        "mean": float(wealth.mean()),
+        "p_default": float(defaulted.mean()),
+        "draws": n,
+    }
+
+# =========================
+# RİSK PANELİ (VaR / ES)
+# =========================
+def risk_key(p: dict, bank_map: dict, cfg: dict) -> tuple:
+    """Bugünkü portföyün (bekleyen kararlar hariç) risk girdileri: (ay, nakit, riskli değerler, mevduatlar, batış olasılığı)."""
+    dd = {b: float(v) for b, v in p.get("dd_accounts", {}).items()}
+    td = {b: float(v) for b, v in p.get("td_accounts", {}).items()}
+    deposits, p_fail = _deposit_state(p, dd, td, bank_map, cfg)
+    return (int(p["month"]), max(float(p["holdings"]["cash"]), 0.0),
+            tuple(float(p["holdings"].get(k, 0.0)) for k in RISK_ASSETS), deposits, p_fail)
+
+def portfolio_risk(key: tuple, cfg: dict, n: int = RISK_DRAWS, level: float = RISK_LEVEL, seed: int = 35) -> dict:
+    """
+    Bir aylık kayıp dağılımı (bugünkü değer - ay sonu değeri; gelir/gider ve borç hariç):
+    {"value", "var", "es", "components": {bileşen: {"var", "es"}}, "draws"}.
+    ES en kötü (1 - level) paydaki senaryoların ortalama kaybıdır. Bileşen "var" tek başına VaR'dır; bileşen
+    "es" aynı kuyruk senaryolarındaki ortalama katkısıdır (toplamı ES).
+    """
+    month, cash, risk, deposits, p_fail = key
+    rng = np.random.default_rng(seed)
+    dep_value = float(sum(d[1] + d[2] for d in deposits))
+    losses = {
+        "theft": cash - _cash_end(rng, cash, month, cfg, n),
+        "deposit": dep_value - _deposits_end(rng, deposits, p_fail, cfg, n),
+        "market": float(sum(risk)) - _risk_end(rng, risk, month, cfg, n),
+    }
+    total = losses["theft"] + losses["deposit"] + losses["market"]
+    var = float(np.quantile(total, level))
+    # kuyruk sayıyla seçilir: çoğu çekilişte kayıp yoksa VaR 0 olur ve "total >= var" bütün çekilişleri alırdı
+    k = max(int(round((1.0 - level) * n)), 1)
+    tail = np.argsort(total, kind="stable")[n - k:]
+    return {
+        "value": cash + dep_value + float(sum(risk)),
+        "var": var,
+        "es": float(total[tail].mean()),
+        "components": {c: {"var": float(np.quantile(losses[c], level)), "es": float(losses[c][tail].mean())}
+                       for c in RISK_COMPONENTS},
+        "draws": n,
+    }
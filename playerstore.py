@@ -0,0 +1,109 @@
+"""
+Oturumlar arası paylaşılan, sürümlü oyuncu durumu (iyimser eşzamanlılık).
+
+Aynı oyuncu iki sekmede açıksa (ya da bağlantı koptuktan sonra yeniden bağlanırsa) iki oturum aynı
+kaydı görür. Her kayıt (sürüm, durum) çiftidir; yazma yalnızca okunan sürüm hâlâ günceldeyse kabul
+edilir (compare-and-swap). Aksi halde VersionConflict: çağıran güncel durumu yeniden okur ve ya
+isteği yeniden uygular (birleştirme) ya da reddeder (ör. ay başka sekmede zaten kapatılmış).
+
+Kilitler oyuncu anahtarına göre şeritlenmiştir (STRIPES); farklı oyuncular birbirini beklemez,
+okuma kilitsizdir (kayıt değişmez bir demettir). Saklanan durum yazmaya kapalı kabul edilir:
+değiştirmek için checkout() ile çalışma kopyası alınır.
+
+Silme kaydı kaldırmaz, durumu None olan bir mezar taşı yazar: sürüm tek yönlü artmaya devam eder, böylece
+silinmeden önce okunmuş bir sürümle yapılan CAS yeniden oluşturulan kayda yazamaz (ABA).
+"""
+import threading
+
+STRIPES = 64
+# yalnızca sona ekleme yapılan listeler: kopyada satırlar paylaşılır (uzun oyunda kopya maliyeti düz kalır)
+APPEND_ONLY = ("log", "lots")
+
+class VersionConflict(Exception):
+    """Okunan sürüm eskimiş: kayıt bu arada başka bir oturumca değiştirildi."""
+
+    def __init__(self, key, expected: int, current: int):
+        super().__init__(f"{key}: sürüm {expected} bekleniyordu, güncel sürüm {current}")
+        self.key = key
+        self.expected = expected
+        self.current = current
+
+def _copy(v):
+    # oyuncu durumu yalnızca dict/list ve değişmez skalerlerden oluşur; copy.deepcopy'den ~2 kat hızlı
+    t = type(v)
+    if t is dict:
+        return {k: _copy(x) for k, x in v.items()}
+    if t is list:
+        return [_copy(x) for x in v]
+    return v
+
+def working_copy(p: dict) -> dict:
+    """Değiştirilebilir kopya; APPEND_ONLY listelerin satırları paylaşılır, geri kalanı derin kopyalanır."""
+    return {k: (list(v) if k in APPEND_ONLY else _copy(v)) for k, v in p.items()}
+
+class PlayerStore:
+    """anahtar (ör. (oda, oyuncu, sahip)) -> (sürüm, durum). Sürüm 0 = hiç yazılmamış; durum None = silinmiş."""
+
+    def __init__(self, stripes: int = STRIPES):
+        self._locks = [threading.Lock() for _ in range(int(stripes))]
+        self._data = {}
+
+    def _lock(self, key) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+    def version(self, key) -> int:
+        rec = self._data.get(key)
+        return rec[0] if rec else 0
+
+    def exists(self, key) -> bool:
+        rec = self._data.get(key)
+        return bool(rec) and rec[1] is not None
+
+    def checkout(self, key):
+        """(sürüm, çalışma kopyası); kayıt yoksa ya da silinmişse (sürüm, None)."""
+        rec = self._data.get(key)
+        if not rec:
+            return 0, None
+        return rec[0], (None if rec[1] is None else working_copy(rec[1]))
+
+    def commit(self, key, expected: int, p: dict) -> int:
+        """p'yi yazar ve yeni sürümü döndürür; güncel sürüm `expected` değilse VersionConflict."""
+        snap = working_copy(p)  # kopya kilit dışında: kritik bölge yalnızca karşılaştır + ata
+        with self._lock(key):
+            current = self.version(key)
+            if current != expected:
+                raise VersionConflict(key, expected, current)
+            self._data[key] = (current + 1, snap)
+        return current + 1
+
+    def put(self, key, p: dict) -> int:
+        """Koşulsuz yazma (kayıttan yükleme); yeni sürümü döndürür."""
+        snap = working_copy(p)
+        with self._lock(key):
+            version = self.version(key) + 1
+            self._data[key] = (version, snap)
+        return version
+
+    def delete(self, key) -> int:
+        """Kaydı mezar taşıyla siler; yeni sürümü döndürür. Yeniden oluşturmak için commit(key, bu sürüm, p)."""
+        with self._lock(key):
+            version = self.version(key) + 1
+            self._data[key] = (version, None)
+        return version
+
+def transact(store: PlayerStore, key, fn, retries: int = 8):
+    """
+    İyimser işlem: güncel durumun kopyasına fn(p) uygulanır ve CAS ile yazılır; çakışmada güncel
+    durumla yeniden denenir. fn değişikliği reddetmek için istisna atabilir (hiçbir şey yazılmaz).
+    Dönen (yeni sürüm, p, fn'in sonucu).
+    """
+    for _ in range(max(int(retries), 1)):
+        version, p = store.checkout(key)
+        if p is None:
+            raise KeyError(key)
+        result = fn(p)
+        try:
+            return store.commit(key, version, p), p, result
+        except VersionConflict as e:
+            conflict = e
+    raise conflict
@@ -0,0 +1,137 @@
+"""
+Referans oyuncu dağılımı (yelpaze grafiği için).
+
+Aynı seed + CFG altında çok sayıda referans oyuncunun net servet yolunu numpy dizileriyle
+tek seferde simüle eder. Referans oyuncu her ay artan nakdini rastgele (Dirichlet) oranlarla
+nakit / vadeli mevduat / açık riskli varlıklar arasında böler; gelir, FGD, hırsızlık, banka batışı,
+küçük banka olayı ve vadeli faiz oyunun kurallarıyla aynı parametreleri kullanır.
+Banka tablosu ve riskli varlık fiyatları öğrencilerin gördüğü piyasayla aynıdır (Market.banks_for_month, Market.price_path);
+tarihsel stres penceresinde FGD de seriden okunur (Market.pgl_path).
+"""
+import numpy as np
+
+from engine import (
+    ASSETS, RISK_ASSETS, Market, theft_month_count, DEFAULT_MONTHLY_INCOME, START_FIXED_COST, START_EXTRA_COST,
+)
+
+QUANTILES = (0.05, 0.25, 0.50, 0.75, 0.95)
+
+def _liquidate(need, dep, risk, sell_keep, td_keep):
+    """Açığı (need > 0) önce riskli varlık, sonra mevduat satarak orantılı kapatır. Kapanmayan açığı döndürür."""
+    risk_val = risk.sum(axis=1)
+    take = np.minimum(need / sell_keep.mean(), risk_val)
+    frac = np.divide(take, risk_val, out=np.zeros_like(take), where=risk_val > 0)
+    got = (risk * frac[:, None] * sell_keep[None, :]).sum(axis=1)
+    risk *= (1.0 - frac)[:, None]
+    need = np.maximum(need - got, 0.0)
+
+    dep_val = dep.sum(axis=1)
+    take = np.minimum(need / td_keep, dep_val)
+    frac = np.divide(take, dep_val, out=np.zeros_like(take), where=dep_val > 0)
+    got = dep_val * frac * td_keep
+    dep *= (1.0 - frac)[:, None]
+    return np.maximum(need - got, 0.0)
+
+def simulate_wealth_paths(seed: int, cfg: dict, n: int = 4000) -> np.ndarray:
+    """(n, MONTHS) dizisi: her referans oyuncunun ay sonu net serveti. Temerrüt eden oyuncu o ayda donar."""
+    months = int(cfg["MONTHS"])
+    market = Market(seed, cfg)
+    rng = np.random.default_rng([market.seed, 29])
+
+    fee = float(cfg["TX_FEE"])
+    pen = float(cfg["EARLY_BREAK_PENALTY"])
+    sc = market.scenario
+    buy_keep = sc.buy_keep
+    sell_keep = sc.sell_keep
+    risk_cols = [list(ASSETS).index(k) for k in RISK_ASSETS]
+    prices = market.price_path()
+
+    cash = np.zeros(n)
+    dep = np.zeros((n, int(cfg["BANKS_MAX"])))
+    risk = np.zeros((n, len(RISK_ASSETS)))
+    scale = float(cfg["STEP_SCALE"])
+    fixed = np.full(n, float(START_FIXED_COST * scale))
+    extra = np.full(n, float(START_EXTRA_COST * scale))
+    pgl = rng.uniform(cfg["PGL_FLOOR"], cfg["PGL_CAP"], size=n)
+    pgl_history = market.pgl_path()
+    if pgl_history is not None:
+        pgl[:] = pgl_history[0]
+    alive = np.ones(n, dtype=bool)
+    seen = np.zeros(n, dtype=int)
+    # her oyuncuya yıl başına 3 kesin hırsızlık ayı (oyundaki theft_months gibi)
+    theft_month = np.argsort(rng.random((n, months)), axis=1)[:, :theft_month_count(cfg)] + 1
+    out = np.zeros((n, months))
+
+    for m in range(1, months + 1):
+        risk_open = sc.open_mask[m, risk_cols]
+        nb = sc.bank_count(m)
+        banks = market.banks_for_month(m)
+        td_rate = np.array([b["TD_Rate"] for b in banks]) if banks else np.zeros(0)
+        guar = np.array([b["Guarantee"] for b in banks]) if banks else np.zeros(0)
+
+        # gelir/gider; açık varsa satarak kapat, kapanmıyorsa temerrüt
+        cash += alive * (sc.income(DEFAULT_MONTHLY_INCOME * scale, m) - fixed - extra)
+        short = np.where(alive & (cash < 0), -cash, 0.0)
+        cash = np.maximum(cash, 0.0)
+        left = _liquidate(short, dep, risk, sell_keep, 1.0 - fee - pen)
+        alive &= left <= 1e-9
+
+        # dağıtım: [nakit, vadeli, riskli...] ağırlıkları; kapalı kovalar sıfır
+        buckets = np.concatenate([[True, nb > 0], risk_open])
+        w = rng.dirichlet(np.ones(buckets.sum()), size=n)
+        alloc = np.zeros((n, buckets.size))
+        alloc[:, buckets] = w
+        spend = cash * (1.0 - alloc[:, 0]) * alive
+        if nb > 0:
+            bank_idx = rng.integers(0, nb, size=n)
+            dep[np.arange(n), bank_idx] += cash * alloc[:, 1] * alive * (1.0 - fee)
+        risk += (cash * alive)[:, None] * alloc[:, 2:] * buy_keep[None, :]
+        cash -= spend
+
+        # hırsızlık (yalnızca nakit)
+        p_theft = sc.theft_prob[m]
+        hit = alive & (cash > 0) & ((theft_month == m).any(axis=1) | (rng.random(n) < p_theft))
+        sev = rng.uniform(cfg["CASH_THEFT_SEV_MIN"], cfg["CASH_THEFT_SEV_MAX"], size=n)
+        cash -= np.where(hit, cash * sev, 0.0)
+
+        if nb > 0:
+            d = dep[:, :nb]
+            tot = d.sum(axis=1)
+            # batış: zorlama penceresinde min sayıya ulaşmayanlar + sonrasında küçük ek ihtimal
+            force = (int(cfg["BANKRUPTCY_FORCE_START_MONTH"]) <= m <= int(cfg["BANKRUPTCY_FORCE_END_MONTH"]))
+            must = int(cfg["BANKRUPTCY_MIN_EVENTS_PER_PLAYER"])
+            fail = alive & (tot > 0) & (((seen < must) & force)
+                                        | ((seen >= must) & (rng.random(n) < float(cfg["BANKRUPTCY_EXTRA_PROB_AFTER_MIN"]))))
+            # mevduat ağırlıklı banka seçimi (satır başına ters-KDF)
+            u = rng.random(n) * tot
+            pick = np.minimum((np.cumsum(d, axis=1) < u[:, None]).sum(axis=1), nb - 1)
+            failed = np.zeros((n, nb), dtype=bool)
+            failed[np.arange(n), pick] = fail
+            seen += fail
+            incident = (rng.random((n, nb)) < float(cfg["BANK_INCIDENT_PROB"])) & ~failed & (d > 0)
+            haircut = np.where(failed | incident, guar[None, :], 1.0)
+            grow = np.where(failed, 1.0, 1.0 + td_rate[None, :])
+            dep[:, :nb] = d * haircut * grow
+
+        if risk_open.any():
+            # fiyat endeksi oyuncularla ortak: aynı aylık getiri herkese uygulanır
+            risk *= np.where(risk_open, prices[m] / prices[m - 1], 1.0)[None, :]
+
+        out[:, m - 1] = np.where(alive, cash + dep.sum(axis=1) + risk.sum(axis=1), out[:, m - 2] if m > 1 else 0.0)
+
+        # FGD: bir sonraki ayın giderleri
+        if pgl_history is not None:
+            new_pgl = np.full(n, pgl_history[min(m, months - 1)])
+        else:
+            step = rng.uniform(cfg["PGL_MIN_STEP"], cfg["PGL_MAX_STEP"], size=n) * np.where(rng.random(n) < 0.5, -1.0, 1.0)
+            new_pgl = np.clip(pgl + step, cfg["PGL_FLOOR"], cfg["PGL_CAP"])
+        delta = new_pgl - pgl
+        pgl = new_pgl
+        fixed = np.maximum(0.0, fixed * (1.0 + delta))
+        extra = np.maximum(0.0, extra * (1.0 + delta))
+
+    return out
+
+def wealth_quantiles(seed: int, cfg: dict, n: int = 4000) -> np.ndarray:
+    """(len(QUANTILES), MONTHS) dizisi: ay bazında net servet yüzdelikleri."""
+    return np.quantile(simulate_wealth_paths(seed, cfg, n), QUANTILES, axis=0)
@@ -0,0 +1,62 @@
+"""
+Oyun odaları (şubeler): bir sunucu süreci birden çok bağımsız sınıfı barındırır.
+
+Her odanın kendi seed'i ve CFG değişiklikleri vardır. Odanın piyasası (bütün ayların banka yolu,
+fiyat endeksi, bankalar arası ağ ve batış yayılımları) bir kez üretilir ve salt okunur hale getirilir; odadaki bütün
+oturumlar aynı nesneyi paylaşır. Oyuncu durumu oturumda kalır. FGD yolu oyuncu adına bağlı
+olduğundan oyuncu durumunun parçasıdır.
+
+Oda listesi WFG_ROOMS ortam değişkenindeki (yoksa uygulamanın yanındaki rooms.json) JSON dosyasından okunur:
+
+    {"rooms": {"Şube A": {"seed": 20260209},
+               "Şube B": {"seed": 777, "overrides": {"TX_FEE": 0.004, "SYSTEMIC_MODE": true}},
+               "Şube C": {"seed": 778, "scenario": "senaryolar/kriz.toml"}}}
+
+"scenario" dosyası (göreli yol oda dosyasına göredir) önce uygulanır, "overrides" onun üstüne yazılır.
+"""
+import json
+import os
+
+from engine import Market, Scenario, cfg_with_overrides, check_seed, scenario_overrides
+import stress
+
+DEFAULT_ROOMS = {"Genel": {"seed": 20260209, "overrides": {}}}
+ROOMS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rooms.json")
+
+def load_rooms(path: str = None) -> dict:
+    """oda adı -> {"seed", "overrides"}; dosya yoksa DEFAULT_ROOMS. Hatalı girişte OSError/ValueError/KeyError."""
+    path = path or os.environ.get("WFG_ROOMS") or ROOMS_FILE
+    if not os.path.exists(path):
+        return dict(DEFAULT_ROOMS)
+    with open(path, encoding="utf-8") as f:
+        doc = json.load(f)
+    rooms = {}
+    for name, spec in (doc.get("rooms") or {}).items():
+        if "seed" not in spec:
+            raise ValueError(f"Odanın seed'i yok: {name}")
+        overrides = dict(spec.get("overrides") or {})
+        if spec.get("scenario"):
+            scenario_path = os.path.join(os.path.dirname(os.path.abspath(path)), spec["scenario"])
+            overrides = {**scenario_overrides(scenario_path), **overrides}
+        Scenario(cfg_with_overrides(overrides))  # bilinmeyen anahtar -> KeyError, tutarsız değer -> ValueError
+        rooms[str(name)] = {"seed": check_seed(spec["seed"]), "overrides": overrides}
+    if not rooms:
+        raise ValueError(f"{path}: hiç oda tanımlı değil.")
+    return rooms
+
+class Room:
+    """Bir odanın seed'i, senaryosu (CFG + ay tabloları) ve paylaşılan (salt okunur) piyasası."""
+
+    def __init__(self, name: str, seed: int, overrides: dict = None):
+        self.name = name
+        self.seed = int(seed)
+        self.scenario = Scenario(cfg_with_overrides(overrides or {}), name=name)
+        self.cfg = self.scenario.cfg
+        self.cfg_key = self.scenario.key
+        self.market = build_market(self.seed, self.scenario)
+        window = self.cfg["STRESS_WINDOW"]
+        self.stress_label = stress.window_meta(window).get("label", window) if window else ""
+
+def build_market(seed: int, scenario: Scenario) -> Market:
+    """Bütün ayları önceden üretilmiş, yazmaya kapalı piyasa (banka yolu, fiyatlar, bankalar arası ağ ve yayılımlar)."""
+    return Market(seed, scenario).freeze()
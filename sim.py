@@ -0,0 +1,195 @@
+"""
+Komut satırı simülasyonu: oyun kurallarını Streamlit açmadan çalıştırır.
+
+Her oyuncu-ay için bir JSON satırı (J adımındaki log alanları + "Oyuncu") üretildikçe yazılır:
+
+    python -m sim --seed 20260209 --players 1000 --strategy td_ladder --workers 4 > out.jsonl
+    python -m sim --players 200000 --summary --set TX_FEE=0.004 --set SPREAD.cr=0.08
+    python -m sim --scenario kriz.toml --summary
+    python -m sim --players 10000 --summary --metrics out.prom   # Prometheus textfile
+    python -m sim --players 50000 --summary --analytics analytics_store --room "2026 Bahar"
+
+Oyuncular parçalar (chunk) halinde işlenir; bellek kullanımı oyuncu sayısından bağımsızdır.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import sys
+
+import analytics
+import metrics
+from bots import STRATEGIES, load_strategy, player_view
+from engine import Market, Scenario, cfg_with_overrides, scenario_overrides, settle_month, new_player, net_wealth
+
+# =========================
+# ÇALIŞTIRICI
+# =========================
+def parse_overrides(items) -> dict:
+    """["TX_FEE=0.004", "SPREAD.cr=0.08"] -> {"TX_FEE": 0.004, "SPREAD.cr": 0.08} (değer JSON, olmazsa metin)."""
+    out = {}
+    for item in items or []:
+        key, sep, raw = str(item).partition("=")
+        if not sep or not key:
+            raise ValueError(f"--set KEY=VALUE bekleniyordu: {item!r}")
+        try:
+            out[key.strip()] = json.loads(raw)
+        except json.JSONDecodeError:
+            out[key.strip()] = raw
+    return out
+
+def player_name(i: int) -> str:
+    return f"P{i:07d}"
+
+def play_game(name: str, market: Market, strategy, registry: metrics.Registry = None):
+    """Bir oyunu baştan sona oynatır; her ay kapandıkça (log satırı, olaylar) üretir. registry: bkz. settle_month."""
+    p = new_player(name, market.seed, market.cfg)
+    while not p["finished"]:
+        decisions = strategy(player_view(p, market))
+        n_log = len(p["log"])
+        events = settle_month(p, name, decisions, market, registry)
+        row = p["log"][-1] if len(p["log"]) > n_log else None
+        yield p, row, events
+
+_WORKER_MARKETS = {}
+
+def market_for(seed: int, overrides: dict) -> Market:
+    """İşçi süreç başına seed+CFG için tek Market (banka yolu bir kez üretilir)."""
+    key = (int(seed), json.dumps(overrides, sort_keys=True))
+    if key not in _WORKER_MARKETS:
+        _WORKER_MARKETS[key] = Market(seed, cfg_with_overrides(overrides))
+    return _WORKER_MARKETS[key]
+
+def _empty_summary() -> dict:
+    return {"players": 0, "player_months": 0, "defaults": 0, "bankruptcies": 0,
+            "theft_loss": 0.0, "wealth_sum": 0.0, "wealth_sq": 0.0,
+            "wealth_min": math.inf, "wealth_max": -math.inf}
+
+def _merge_summary(a: dict, b: dict) -> dict:
+    for k in ("players", "player_months", "defaults", "bankruptcies", "theft_loss", "wealth_sum", "wealth_sq"):
+        a[k] += b[k]
+    a["wealth_min"] = min(a["wealth_min"], b["wealth_min"])
+    a["wealth_max"] = max(a["wealth_max"], b["wealth_max"])
+    return a
+
+def run_chunk(job: tuple):
+    """
+    İşçi süreçte çalışır. job = (seed, overrides, strategy, start, stop, summary, with_metrics, store).
+    Dönen (sonuç, ölçümler): sonuç summary=False ise JSON satırlarının listesi, summary=True ise
+    parça özeti (dict); ölçümler with_metrics ise bu parçanın metrics snapshot'ı, değilse None.
+    store = (klasör, oda) verilirse biten oyunlar analitik deposuna parça olarak yazılır.
+    """
+    seed, overrides, strategy_name, start, stop, summary, with_metrics, store = job
+    registry = metrics.REGISTRY if with_metrics else None
+    if registry is not None:
+        registry.reset()
+    market = market_for(seed, overrides)
+    strategy = load_strategy(strategy_name)
+    lines = []
+    records = []
+    agg = _empty_summary()
+    for i in range(start, stop):
+        name = player_name(i)
+        p = None
+        for p, row, _events in play_game(name, market, strategy, registry):
+            if row is None:
+                continue
+            agg["player_months"] += 1
+            agg["theft_loss"] += float(row["NakitHırsızlıkKayıp(TL)"])
+            if not summary:
+                lines.append(json.dumps({"Oyuncu": name, **row}, ensure_ascii=False))
+        if store:
+            records.append(analytics.game_record(name, p, seed, store[1]))
+        w = net_wealth(p)
+        agg["players"] += 1
+        agg["defaults"] += int(bool(p["defaulted"]))
+        agg["bankruptcies"] += int(p.get("bankruptcies_seen", 0))
+        agg["wealth_sum"] += w
+        agg["wealth_sq"] += w * w
+        agg["wealth_min"] = min(agg["wealth_min"], w)
+        agg["wealth_max"] = max(agg["wealth_max"], w)
+    if records:
+        analytics.write_records(records, store[0])
+    return (agg if summary else lines), (registry.snapshot() if registry is not None else None)
+
+def iter_jobs(seed: int, overrides: dict, strategy: str, players: int, chunk_size: int, summary: bool,
+              with_metrics: bool = False, store: tuple = None):
+    for start in range(0, players, chunk_size):
+        yield (seed, overrides, strategy, start, min(start + chunk_size, players), summary, with_metrics, store)
+
+def finalize_summary(agg: dict, seed: int, strategy: str) -> dict:
+    n = max(agg["players"], 1)
+    mean = agg["wealth_sum"] / n
+    var = max(agg["wealth_sq"] / n - mean * mean, 0.0)
+    return {
+        "seed": int(seed),
+        "strategy": strategy,
+        "players": agg["players"],
+        "player_months": agg["player_months"],
+        "default_rate": agg["defaults"] / n,
+        "bankruptcies_per_player": agg["bankruptcies"] / n,
+        "theft_loss_per_player": agg["theft_loss"] / n,
+        "net_wealth_mean": mean,
+        "net_wealth_std": math.sqrt(var),
+        "net_wealth_min": agg["wealth_min"] if agg["players"] else None,
+        "net_wealth_max": agg["wealth_max"] if agg["players"] else None,
+    }
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m sim", description="Oyunu tarayıcısız simüle eder (JSON-lines çıktı).")
+    ap.add_argument("--seed", type=int, default=20260209)
+    ap.add_argument("--players", type=int, default=100)
+    ap.add_argument("--strategy", default="all_cash",
+                    help=f"hazır bot ({', '.join(sorted(STRATEGIES))}) ya da paket.modul:fonksiyon")
+    ap.add_argument("--scenario", metavar="DOSYA", help="senaryo dosyası (.toml/.json); --set değerleri bunun üstüne yazılır")
+    ap.add_argument("--set", dest="overrides", action="append", metavar="KEY=VALUE",
+                    help="CFG değişikliği (tekrarlanabilir), ör. --set TX_FEE=0.004 --set SPREAD.cr=0.08")
+    ap.add_argument("--out", default="-", help="çıktı dosyası (varsayılan: stdout)")
+    ap.add_argument("--workers", type=int, default=1, help="paralel süreç sayısı")
+    ap.add_argument("--chunk-size", type=int, default=500, help="bir işte oynatılan oyuncu sayısı")
+    ap.add_argument("--summary", action="store_true", help="ay satırları yerine tek özet satırı yaz")
+    ap.add_argument("--metrics", metavar="DOSYA", help="aşama süreleri ve olay sayaçlarını Prometheus metin biçiminde yaz")
+    ap.add_argument("--analytics", metavar="KLASÖR", help="biten oyunları kohort analitiği deposuna yaz (bkz. analytics.py)")
+    ap.add_argument("--room", default="sim", help="analitik deposundaki oda adı")
+    args = ap.parse_args(argv)
+
+    try:
+        overrides = {**(scenario_overrides(args.scenario) if args.scenario else {}), **parse_overrides(args.overrides)}
+        Scenario(cfg_with_overrides(overrides))
+        load_strategy(args.strategy)
+    except (OSError, ValueError, KeyError, ImportError) as e:
+        ap.error(str(e))
+
+    jobs = iter_jobs(args.seed, overrides, args.strategy, max(args.players, 0), max(args.chunk_size, 1), args.summary,
+                     bool(args.metrics), (args.analytics, args.room) if args.analytics else None)
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    pool = multiprocessing.Pool(args.workers) if args.workers > 1 else None
+    try:
+        results = pool.imap(run_chunk, jobs) if pool else map(run_chunk, jobs)
+        agg = _empty_summary()
+        registry = metrics.Registry()
+        for res, snap in results:
+            if snap:
+                registry.merge(snap)
+            if args.summary:
+                _merge_summary(agg, res)
+            else:
+                out.write("\n".join(res) + ("\n" if res else ""))
+                out.flush()
+        if args.summary:
+            out.write(json.dumps(finalize_summary(agg, args.seed, args.strategy), ensure_ascii=False) + "\n")
+        if args.metrics:
+            metrics.write_textfile(args.metrics, registry)
+        if args.analytics:
+            analytics.compact(args.analytics)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Tarihsel stres senaryoları: aylık getiri + FGD serilerinin bellek eşlemeli (mmap) kütüphanesi.
+
+Her pencere kütüphane klasöründe (WFG_STRESS_DIR, yoksa uygulamanın yanındaki stress_windows/) bir .npy dosyasıdır:
+(T, 5) float64, sütunlar COLUMNS sırasıyla — fx, pm, eq, cr aylık getirileri ve o ayın FGD düzeyi.
+Satır i oyunun (STRESS_START + i + 1). ayıdır. İsteğe bağlı aynı adlı .json dosyası açıklama taşır:
+
+    {"label": "2001 krizi", "start": "2000-11", "source": "..."}
+
+Dosyalar np.load(mmap_mode="r") ile açılır: açılış yalnızca başlığı okur, satırlar okundukça sayfalanır;
+aynı dosyayı açan işçi süreçler işletim sisteminin sayfa önbelleğini paylaşır (kopya yok).
+
+CSV'den pencere üretmek (başlık satırı: fx,pm,eq,cr,pgl):
+
+    python -m stress import kriz2001.csv --name 2001_kriz --label "2001 krizi" --start 2000-11
+    python -m stress list
+"""
+import argparse
+import csv
+import functools
+import json
+import os
+import sys
+
+import numpy as np
+
+COLUMNS = ("fx", "pm", "eq", "cr", "pgl")
+STRESS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stress_windows")
+
+def library_dir() -> str:
+    return os.environ.get("WFG_STRESS_DIR") or STRESS_DIR
+
+def list_windows(path: str = None) -> list:
+    """[(ad, açıklama), ...]; yalnızca dosya adları ve küçük .json açıklamaları okunur."""
+    path = path or library_dir()
+    if not os.path.isdir(path):
+        return []
+    out = []
+    for fn in sorted(os.listdir(path)):
+        if fn.endswith(".npy"):
+            name = fn[:-4]
+            out.append((name, window_meta(name, path).get("label", name)))
+    return out
+
+def window_meta(name: str, path: str = None) -> dict:
+    meta = os.path.join(path or library_dir(), f"{name}.json")
+    if not os.path.exists(meta):
+        return {}
+    with open(meta, encoding="utf-8") as f:
+        return json.load(f)
+
+@functools.lru_cache(maxsize=64)
+def _open(file: str) -> np.ndarray:
+    arr = np.load(file, mmap_mode="r")
+    if arr.ndim != 2 or arr.shape[1] != len(COLUMNS):
+        raise ValueError(f"{file}: (T, {len(COLUMNS)}) dizi bekleniyordu, {arr.shape} bulundu.")
+    return arr
+
+def window(name: str, path: str = None) -> np.ndarray:
+    """Pencerenin salt okunur, bellek eşlemeli (T, 5) dizisi. Bulunamazsa FileNotFoundError."""
+    return _open(os.path.join(path or library_dir(), f"{name}.npy"))
+
+def window_slice(name: str, start: int, months: int) -> np.ndarray:
+    """Oyunun 1..months aylarına düşen satırlar (görünüm, kopya değil); pencere kısaysa ValueError."""
+    arr = window(name)
+    start = int(start)
+    if start < 0 or start + int(months) > arr.shape[0]:
+        raise ValueError(f"Stres penceresi '{name}' {arr.shape[0]} ay; {start}. satırdan {months} ay alınamaz.")
+    return arr[start:start + int(months)]
+
+# =========================
+# KOMUT SATIRI
+# =========================
+def import_csv(csv_path: str, name: str, path: str = None, meta: dict = None) -> str:
+    """CSV'yi (başlık: COLUMNS) kütüphaneye .npy olarak yazar; yazılan dosya yolunu döndürür."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    missing = [c for c in COLUMNS if rows and c not in rows[0]]
+    if not rows or missing:
+        raise ValueError(f"{csv_path}: boş ya da eksik sütun: {', '.join(missing) or 'satır yok'}")
+    data = np.array([[float(r[c]) for c in COLUMNS] for r in rows], dtype=np.float64)
+    if (data[:, :4] <= -1.0).any():
+        raise ValueError(f"{csv_path}: getiri -%100 ya da daha düşük olamaz.")
+    path = path or library_dir()
+    os.makedirs(path, exist_ok=True)
+    out = os.path.join(path, f"{name}.npy")
+    np.save(out, data)
+    if meta:
+        with open(os.path.join(path, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+    return out
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m stress", description="Tarihsel stres penceresi kütüphanesi.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="kütüphanedeki pencereler")
+    imp = sub.add_parser("import", help="CSV'den pencere ekle")
+    imp.add_argument("csv")
+    imp.add_argument("--name", required=True)
+    imp.add_argument("--label")
+    imp.add_argument("--start", help="ilk satırın takvim ayı, ör. 2000-11")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "list":
+        for name, label in list_windows():
+            print(f"{name}\t{window(name).shape[0]} ay\t{label}")
+        return 0
+    meta = {k: v for k, v in (("label", args.label), ("start", args.start)) if v}
+    try:
+        print(import_csv(args.csv, args.name, meta=meta))
+    except (OSError, ValueError, TypeError) as e:
+        ap.error(str(e))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# modüller depo kökünde (paket değil): testler `pytest` ile de `python -m pytest` ile de çalışsın
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def player_at():
+    """player_at(month, market): td_ladder ile oynanıp `month`. aya gelmiş "Ali"."""
+    from bots import td_ladder
+    from sim import play_game
+
+    def _at(month: int, market) -> dict:
+        for p, _row, _ev in play_game("Ali", market, td_ladder):
+            if p["month"] >= month:
+                return p
+    return _at
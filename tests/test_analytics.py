@@ -0,0 +1,169 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+import analytics
+from bots import STRATEGIES
+from engine import Market
+from sim import play_game
+
+ROOM = "Şube A/2"  # bölüm adında kaçırılması gereken karakter
+
+def _records(seed: int, room: str, n: int) -> list:
+    market = Market(seed)
+    out = []
+    for i, strategy in zip(range(n), list(STRATEGIES.values()) * n):
+        name = f"P{i}"
+        for p, _row, _events in play_game(name, market, strategy):
+            pass
+        out.append(analytics.game_record(name, p, seed, room))
+    return out
+
+@pytest.fixture(scope="module")
+def games():
+    return _records(7, ROOM, 12) + _records(8, "Şube B", 4)
+
+@pytest.fixture
+def store(tmp_path, games):
+    # iki yazım: bölüm başına iki parça (compact öncesi)
+    analytics.write_records(games[:6], str(tmp_path))
+    analytics.write_records(games[6:], str(tmp_path))
+    return str(tmp_path)
+
+def _rows(games, seed=None) -> np.ndarray:
+    return np.array([row + rec["game"] for rec in games if seed in (None, rec["seed"]) for row in rec["log"]])
+
+def _col(name: str) -> int:
+    return analytics.COLUMNS.index(name)
+
+def _partitions(games) -> set:
+    return {(rec["seed"], rec["room"], int(r[0])) for rec in games for r in rec["log"]}
+
+def test_partitions_and_stats(store, games):
+    first, second = _partitions(games[:6]), _partitions(games[6:])
+    assert analytics.stats(store) == {"partitions": len(first | second), "parts": len(first) + len(second),
+                                      "rows": len(_rows(games))}
+    assert os.path.isdir(analytics.partition_dir(7, ROOM, 1, store))
+
+def test_preaggregated_and_scanned_answers_match_brute_force(store, games):
+    rows = _rows(games, seed=7)
+    sel = rows[rows[:, _col("Ay")] == 4]
+    wealth = sel[:, _col("ToplamServet(TL)")]
+    for agg, expected in (("count", wealth.size), ("sum", wealth.sum()), ("mean", wealth.mean()), ("std", wealth.std())):
+        fast = analytics.query(agg, "ToplamServet(TL)", where=["Ay == 4"], seeds=[7], path=store)
+        # Ay dışı her zaman doğru bir koşul satır taramasını zorlar
+        scan = analytics.query(agg, "ToplamServet(TL)", where=["Ay == 4", "Oyun.Ay > 0"], seeds=[7], path=store)
+        assert fast[0]["n"] == scan[0]["n"] == wealth.size
+        assert fast[0]["value"] == pytest.approx(expected) and scan[0]["value"] == pytest.approx(expected)
+
+def test_group_by_category_and_bins(store, games):
+    rows = _rows(games)
+    first = rows[rows[:, _col("Ay")] == 1]
+    res = analytics.query("count", "Oyun.SonServet", where=["Ay == 1"], by="Oyun.BaskınVarlık", path=store)
+    keys, counts = np.unique(first[:, _col("Oyun.BaskınVarlık")], return_counts=True)
+    labels = analytics.CATEGORIES["Oyun.BaskınVarlık"]
+    assert {r["group"]: r["n"] for r in res} == {labels[int(k)]: int(c) for k, c in zip(keys, counts)}
+    assert sum(r["n"] for r in res) == len(games)
+
+    binned = analytics.query("count", "Oyun.SonServet", where=["Ay == 1"], by="Oyun.SonServet",
+                             bins=[0, 50000], path=store)
+    wealth = first[:, _col("Oyun.SonServet")]
+    expected = {"[-inf, 0)": (wealth < 0).sum(), "[0, 50000)": ((wealth >= 0) & (wealth < 50000)).sum(),
+                "[50000, inf)": (wealth >= 50000).sum()}
+    assert {r["group"]: r["n"] for r in binned} == {g: int(n) for g, n in expected.items() if n}
+
+def test_partition_pruning_by_seed_room_and_month(store, games):
+    only_b = analytics.query("count", "Ay", rooms=["Şube B"], path=store)
+    assert only_b[0]["n"] == sum(len(rec["log"]) for rec in games if rec["room"] == "Şube B")
+    assert analytics.query("count", "Ay", seeds=[8], path=store) == only_b
+    late = analytics.query("count", "Ay", where=["Ay >= 3", "Ay < 5"], path=store)
+    assert late[0]["n"] == sum(1 for rec in games for r in rec["log"] if 3 <= r[0] < 5)
+    assert analytics.query("count", "Ay", seeds=[999], path=store) == []
+
+def test_compact_keeps_answers(store, games):
+    before = analytics.query("mean", "Oyun.Temerrüt", where=["Ay == 1"], by="Oyun.BaskınVarlık", path=store)
+    assert analytics.compact(store) == len(_partitions(games[:6]) & _partitions(games[6:]))
+    s = analytics.stats(store)
+    assert s["parts"] == s["partitions"]
+    assert analytics.compact(store) == 0
+    after = analytics.query("mean", "Oyun.Temerrüt", where=["Ay == 1"], by="Oyun.BaskınVarlık", path=store)
+    assert [(r["group"], r["n"]) for r in after] == [(r["group"], r["n"]) for r in before]
+    assert [r["value"] for r in after] == pytest.approx([r["value"] for r in before])
+
+def test_build_moves_inbox_into_partitions(tmp_path, games):
+    for rec in games[:3]:
+        analytics.record_game(rec, str(tmp_path))
+    assert analytics.build(str(tmp_path)) == 3
+    assert os.listdir(tmp_path / "inbox") == []
+    s = analytics.stats(str(tmp_path))
+    assert s["parts"] == s["partitions"] and s["rows"] == sum(len(rec["log"]) for rec in games[:3])
+
+def test_build_while_a_writer_holds_its_file_open(tmp_path, games, monkeypatch):
+    # yazar dosyayı açmış, satırı henüz yazmamışken build çalışır: kayıt ne kaybolur ne de yarım okunur
+    moved = []
+
+    class Racy:
+        def __init__(self, f):
+            self.f = f
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.f.close()
+
+        def write(self, data):
+            moved.append(analytics.build(str(tmp_path)))
+            return self.f.write(data)
+
+    def racy_open(file, mode="r", **kw):
+        f = open(file, mode, **kw)
+        return Racy(f) if mode[0] in "wa" and os.path.basename(os.path.dirname(file)) == "inbox" else f
+
+    monkeypatch.setattr(analytics, "open", racy_open, raising=False)
+    analytics.record_game(games[0], str(tmp_path))
+    analytics.record_game(games[1], str(tmp_path))
+    monkeypatch.undo()
+    assert moved[0] == 0 and sum(moved) + analytics.build(str(tmp_path)) == 2
+    assert analytics.stats(str(tmp_path))["rows"] == len(games[0]["log"]) + len(games[1]["log"])
+
+def test_records_appended_during_build_are_kept(tmp_path, games):
+    recs = games[:8] * 3
+    done = threading.Event()
+    moved = []
+
+    def builder():
+        while not done.is_set():
+            moved.append(analytics.build(str(tmp_path)))
+
+    t = threading.Thread(target=builder)
+    t.start()
+    try:
+        for rec in recs:
+            analytics.record_game(rec, str(tmp_path))
+    finally:
+        done.set()
+        t.join()
+    moved.append(analytics.build(str(tmp_path)))
+    assert sum(moved) == len(recs) and os.listdir(tmp_path / "inbox") == []
+    assert analytics.stats(str(tmp_path))["rows"] == sum(len(rec["log"]) for rec in recs)
+
+def test_parse_where():
+    assert analytics.parse_where("Ay == 4") == ("Ay", "==", 4.0)
+    assert analytics.parse_where("Oyun.BaskınVarlık == td") == ("Oyun.BaskınVarlık", "==", 2.0)
+    assert analytics.parse_where(" DönemSonuNakit(TL)>=-1.5 ") == ("DönemSonuNakit(TL)", ">=", -1.5)
+    with pytest.raises(KeyError):
+        analytics.parse_where("Yok == 1")
+    with pytest.raises(ValueError):
+        analytics.parse_where("Ay 4")
+    with pytest.raises(ValueError):
+        analytics.parse_where("Oyun.BaskınVarlık == altın")
+
+def test_query_rejects_bad_arguments(store):
+    with pytest.raises(ValueError):
+        analytics.query("median", "Ay", path=store)
+    with pytest.raises(KeyError):
+        analytics.query("mean", "Yok", path=store)
+    assert analytics.query("mean", "Ay", where=["Ay > 99"], path=store) == []
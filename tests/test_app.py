@@ -0,0 +1,92 @@
+import re
+
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+
+def _session(name: str) -> AppTest:
+    at = AppTest.from_file("../app.py", default_timeout=60).run()
+    at.text_input[0].set_value(name).run()
+    return at
+
+def _finish_month(at: AppTest):
+    """Ayı (girişsiz) tamamlar ve bütün bildirimleri kapatır."""
+    next(b for b in at.button if "Tamamla" in str(b.label)).click().run()
+    for _ in range(8):
+        close = [b for b in at.button if "kapat" in str(b.label).lower()]
+        if not close:
+            break
+        close[0].click().run()
+    assert not at.exception
+
+def _month_keys(at: AppTest, name: str) -> dict:
+    rx = re.compile(rf"_{re.escape(name)}_(\d+)(?:_Banka \d+)?$")
+    return {k: int(m.group(1)) for k in at.session_state if (m := rx.search(k))}
+
+def test_stale_month_keys_are_pruned_after_settlement():
+    at = _session("Ayşe")
+    at.session_state["buy_eq_Veli_1"] = 5.0  # sıcak koltukta diğer oyuncunun anahtarı
+    sizes = []
+    for _ in range(9):
+        month = at.session_state.players["Ayşe"]["month"]
+        # limiti 0 olan kutu değeri widget değil düz durum olarak yazar (safe_number_input): Streamlit bunu silmez
+        at.session_state[f"sell_cr_Ayşe_{month}"] = 0.0
+        _finish_month(at)
+        keys = _month_keys(at, "Ayşe")
+        assert all(m > month for m in keys.values()), keys
+        sizes.append(len(at.session_state))
+    assert at.session_state["buy_eq_Veli_1"] == 5.0
+    # bütün varlıklar açıldıktan sonra (8. ay) iz düz kalır
+    assert len(set(sizes[-3:])) == 1, sizes
+
+def test_memory_report_lists_categories():
+    at = _session("Ayşe")
+    for _ in range(5):  # bankalar açılınca ay bazlı karar kutuları oluşur
+        _finish_month(at)
+    at.toggle(key="show_mem_report").set_value(True).run()
+    rows = at.sidebar.dataframe[0].value
+    cats = dict(zip(rows["Kategori"], rows["Anahtar"]))
+    assert {"Oyuncular", "Widget (ay bazlı)", "Diğer"} <= set(cats) and cats["Oyuncular"] == 1
+    assert list(rows["Bayt"]) == sorted(rows["Bayt"], reverse=True)
+    assert sum(cats.values()) == len(at.session_state)
+
+def _autopilot_all_cash(at: AppTest, name: str, months: int):
+    """Otomatik pilotla `months` ay nakitte bekler (mevduat yok: banka batışı pilotu durdurmaz)."""
+    at.number_input(key=f"ap_months_{name}").set_value(months)
+    at.number_input(key=f"ap_td_{name}").set_value(0.0)
+    for k in ("fx", "pm", "eq", "cr"):
+        at.number_input(key=f"ap_{k}_{name}").set_value(0.0)
+    next(b for b in at.button if "İleri Sar" in str(b.label)).click().run()
+    assert not at.exception
+
+def test_history_renders_one_page_of_cached_rows(monkeypatch):
+    import streamlit as st
+
+    import views
+    formatted = []
+    blocks = views.log_row_blocks
+    monkeypatch.setattr(views, "log_row_blocks", lambda items: formatted.append(dict(items)["Ay"]) or blocks(items))
+    st.cache_data.clear()
+    at = _session("Ayşe")
+    _autopilot_all_cash(at, "Ayşe", 11)
+    history = next(t for t in at.tabs if "Geçmiş" in t.label)
+    assert [e.label for e in history.expander] == [f"Ay {m} — {at.session_state.players['Ayşe']['log'][m - 1]['Aşama']}"
+                                                   for m in range(11, 5, -1)]
+    assert "**Gelir(TL):**" in history.expander[0].markdown[0].value
+    assert sorted(formatted) == list(range(6, 12))  # yalnızca görünen sayfa biçimlendi
+
+    at.number_input(key="log_page_Ayşe").set_value(2).run()
+    history = next(t for t in at.tabs if "Geçmiş" in t.label)
+    assert [e.label.split(" — ")[0] for e in history.expander] == [f"Ay {m}" for m in range(5, 0, -1)]
+    at.number_input(key="log_page_Ayşe").set_value(1).run()
+    assert sorted(formatted) == list(range(1, 12))  # geri dönülen sayfa önbellekten çizilir
+    st.cache_data.clear()
+
+def test_first_screens_load_without_pandas():
+    import bench
+    res = bench.coldstart(runs=1)
+    # ad sorusu ve ilk oyun ekranında tablo/grafik yok: pandas, altair ve pyarrow yüklenmez
+    assert res["heavy_at_first_render"] == [] and res["heavy_at_game_screen"] == []
+    assert all(res[f] > 0 for f in bench.COLDSTART_FIELDS) and res["runs"] == 1
@@ -0,0 +1,169 @@
+import numpy as np
+import pytest
+
+from bots import (
+    STOP_EVENTS, STRATEGIES, borrow_to_invest, default_orders, fast_forward, load_strategy, player_view, spare_cash,
+    standing_orders,
+)
+from engine import (
+    CFG, RISK_ASSETS, Market, decode_save_code, encode_save_code, new_player, settle_month, validate_decisions,
+)
+from sim import play_game
+import tournament
+
+SEED = 20260209
+
+def test_view_cannot_change_rules_or_state():
+    market = Market(SEED)
+    p = new_player("Ali", SEED, market.cfg)
+    before = market.cfg["TX_FEE"], dict(market.cfg["SPREAD"]), dict(p["holdings"])
+
+    def vandal(view):
+        view["holdings"]["cash"] = 10**9
+        with pytest.raises(TypeError):
+            view["cfg"]["TX_FEE"] = 0.0
+        with pytest.raises(TypeError):
+            view["cfg"]["SPREAD"]["cr"] = 0.0
+        return STRATEGIES["all_cash"](view)
+
+    vandal(player_view(p, market))
+    assert (market.cfg["TX_FEE"], market.cfg["SPREAD"], p["holdings"]) == before
+    assert CFG["TX_FEE"] == before[0]
+
+@pytest.mark.parametrize("name", sorted(STRATEGIES))
+def test_strategies_play_valid_games(name):
+    market = Market(SEED)
+    strategy = load_strategy(name)
+    months = 0
+    for p, _row, _ev in play_game("Ali", market, strategy):
+        months += 1
+        if not p["finished"]:
+            assert validate_decisions(p, strategy(player_view(p, market)), market.cfg) == []
+    assert p["finished"]
+    assert months == market.scenario.months or p["defaulted"]
+
+def test_load_strategy_errors():
+    assert load_strategy("bots:td_ladder") is STRATEGIES["td_ladder"]
+    with pytest.raises(ValueError):
+        load_strategy("yok_boyle_bot")
+    with pytest.raises(ValueError):
+        load_strategy("bots:yok_boyle")
+
+def test_score_and_rank():
+    w = np.arange(100, dtype=float)
+    s = tournament.score(w, np.zeros(100, dtype=bool))
+    assert s["games"] == 100 and s["mean"] == pytest.approx(49.5)
+    assert s["tail_mean"] == pytest.approx(np.mean(w[w <= s["p5"]]))
+    rows = tournament.rank({
+        "a": {"mean": 10.0, "tail_mean": 5.0, "default_rate": 0.0},
+        "b": {"mean": 20.0, "tail_mean": 1.0, "default_rate": 0.5},
+    })
+    assert [r["strategy"] for r in rows] == ["a", "b"]
+
+def test_tournament_matches_direct_play():
+    rows = tournament.run_tournament(["all_cash", "td_ladder"], [SEED], players=4, chunk_size=3)
+    for r in rows:
+        _name, wealth, _defaulted = tournament.play_chunk((r["strategy"], SEED, {}, 0, 4))
+        assert r["games"] == 4
+        assert r["mean"] == pytest.approx(float(wealth.mean()))
+
+ORDERS = {"td_amount": 4000.0, "td_bank": "Banka 2", "alloc": {"eq": 0.5, "cr": 0.25}, "rollover": True}
+
+def _month_by_month(p: dict, name: str, market: Market, strategy, months: int):
+    """fast_forward'ın tek tek ay kapatarak karşılığı (arayüzde her ay "Tamamla")."""
+    events = []
+    for _ in range(months):
+        if p["finished"]:
+            return events, "finished"
+        month_events = settle_month(p, name, strategy(player_view(p, market)), market)
+        events.extend(month_events)
+        if any(ev["type"] in STOP_EVENTS for ev in month_events):
+            break
+    return events, None
+
+def test_standing_orders_repeat_every_month():
+    market = Market(SEED)
+    p = new_player("Ali", SEED, market.cfg)
+    strategy = standing_orders(ORDERS)
+    deposited = invested = 0
+    while not p["finished"]:
+        view = player_view(p, market)
+        d = strategy(view)
+        spare = spare_cash(view)
+        if spare > ORDERS["td_amount"] and "td" in view["open_assets"]:
+            # her ay aynı talimat: sabit vadeli tutarı tercih edilen bankaya, kalan nakdin yüzdeleri riskliye
+            assert d["buy"]["td"] == ORDERS["td_amount"] and d["td_bank"] == "Banka 2"
+            deposited += 1
+            rest = spare - ORDERS["td_amount"]
+            for k in RISK_ASSETS:
+                if k in view["open_assets"] and k in ORDERS["alloc"]:
+                    assert d["buy"][k] == np.floor(rest * ORDERS["alloc"][k])
+                    invested += 1
+        assert validate_decisions(p, d, market.cfg) == []
+        settle_month(p, "Ali", d, market)
+    assert deposited >= 6 and invested >= 2
+
+def test_orders_over_100_percent_are_scaled_down():
+    market = Market(SEED)
+    p = new_player("Ali", SEED, market.cfg)
+    orders = {**default_orders(), "alloc": {k: 0.8 for k in RISK_ASSETS}}
+    fast_forward(p, "Ali", market, standing_orders(default_orders()), 9)
+    view = player_view(p, market)
+    d = standing_orders(orders)(view)
+    assert sum(d["buy"].get(k, 0.0) for k in RISK_ASSETS) <= spare_cash(view)
+    assert validate_decisions(p, d, market.cfg) == []
+
+def test_fast_forward_matches_month_by_month():
+    market = Market(SEED)
+    auto, manual = new_player("Ali", SEED, market.cfg), new_player("Ali", SEED, market.cfg)
+    reasons = []
+    while not auto["finished"]:
+        events, reason = fast_forward(auto, "Ali", market, standing_orders(ORDERS), 12)
+        expected, _ = _month_by_month(manual, "Ali", market, standing_orders(ORDERS), 12)
+        assert events == expected and auto == manual
+        reasons.append(reason)
+    # zorunlu batışlarda durur, kaldığı yerden devam eder ve oyun sonunda "finished" döner
+    assert reasons.count("bankruptcy") == CFG["BANKRUPTCY_MIN_EVENTS_PER_PLAYER"] and reasons[-1] == "finished"
+    assert len(auto["log"]) == market.scenario.months and not auto["defaulted"]
+
+def test_fast_forward_stops_on_bankruptcy_at_that_month():
+    market = Market(SEED)
+    p = new_player("Ali", SEED, market.cfg)
+    events, reason = fast_forward(p, "Ali", market, standing_orders(ORDERS), 12)
+    hit = [ev for ev in events if ev["type"] == "bankruptcy"]
+    assert reason == "bankruptcy" and hit and not p["finished"]
+    assert p["month"] == hit[-1]["month"] + 1
+    assert all(ev.get("month", ev.get("from_month")) <= hit[-1]["month"] for ev in events)
+
+def test_fast_forward_stops_on_default():
+    market = Market(SEED)
+    p = new_player("P0000", SEED, market.cfg)
+    reason = None
+    while reason not in ("default", "finished"):
+        events, reason = fast_forward(p, "P0000", market, borrow_to_invest, 12)
+    # bu oyuncu batışla aynı ayda temerrüde düşer: neden temerrüttür, oyun biter
+    assert reason == "default" and p["defaulted"] and p["finished"]
+    assert {"bankruptcy", "default"} <= {ev["type"] for ev in events if ev.get("month") == p["month"]}
+    assert fast_forward(p, "P0000", market, borrow_to_invest, 3) == ([], "finished")
+
+def test_fast_forward_rejects_invalid_orders_without_settling():
+    market = Market(SEED)
+    p = new_player("Ali", SEED, market.cfg)
+    before = encode_save_code("Ali", p, SEED)
+
+    def greedy(view):
+        d = standing_orders(default_orders())(view)
+        d["buy"]["eq"] = 10**9
+        return d
+
+    events, reason = fast_forward(p, "Ali", market, greedy, 5)
+    assert events == [] and reason and reason not in ("finished", *STOP_EVENTS)
+    assert encode_save_code("Ali", p, SEED) == before
+
+def test_standing_orders_survive_save_code():
+    market = Market(SEED)
+    p = new_player("Ali", SEED, market.cfg)
+    p["standing_orders"] = ORDERS
+    fast_forward(p, "Ali", market, standing_orders(ORDERS), 2)
+    _name, q, _seed = decode_save_code(encode_save_code("Ali", p, SEED))
+    assert q["standing_orders"] == ORDERS
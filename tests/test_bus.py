@@ -0,0 +1,51 @@
+import bus
+from bus import Bus, LocalBackend, class_topic
+
+class Clock:
+    def __init__(self):
+        self.t = 1000.0
+
+    def __call__(self):
+        return self.t
+
+def test_rooms_with_same_seed_do_not_share_notices():
+    b = Bus()
+    a_topic, b_topic = class_topic("Şube A"), class_topic("Şube B")
+    b.subscribe(a_topic, "s1")
+    b.subscribe(b_topic, "s2")
+    assert b.publish(a_topic, {"message": "sınav"}) == 1
+    assert [e["message"] for e in b.drain(a_topic, "s1")] == ["sınav"]
+    assert b.drain(b_topic, "s2") == []
+
+def test_queue_is_bounded():
+    backend = LocalBackend(maxlen=3)
+    backend.subscribe("t", "s")
+    for i in range(5):
+        backend.publish("t", {"i": i})
+    assert [e["i"] for e in backend.drain("t", "s")] == [2, 3, 4]
+    assert backend.dropped == 2
+
+def test_idle_subscribers_pruned_without_publish(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(bus.time, "monotonic", clock)
+    backend = LocalBackend(idle_ttl=60)
+    for i in range(100):
+        backend.subscribe("t", f"closed{i}")
+    clock.t += 61
+    backend.subscribe("t", "live")  # abone olurken
+    assert list(backend._queues["t"]) == ["live"]
+    assert set(backend._last_seen) == {("t", "live")}
+
+    backend.subscribe("t", "other")
+    clock.t += 61
+    backend.drain("t", "other")  # yoklarken (drain eden abone kalır)
+    assert list(backend._queues["t"]) == ["other"]
+
+    clock.t += 61
+    backend.publish("t", {})
+    assert "t" not in backend._queues and not backend._last_seen
+
+def test_drain_of_unknown_subscriber_leaves_no_state():
+    backend = LocalBackend()
+    assert backend.drain("t", "ghost") == []
+    assert not backend._last_seen
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import compare
+import engine
+from bots import all_cash, max_risk
+from engine import Market
+from sim import play_game
+
+SEED = 20260209
+
+def _draws_seen(monkeypatch, strategy) -> list:
+    seen = []
+    real = engine.month_draws
+
+    def spy(rng, n_banks, cfg=engine.CFG):
+        d = real(rng, n_banks, cfg)
+        seen.append((d["theft"], d["severity"], d.get("bankruptcy"), d["incident"].tolist() if n_banks else None))
+        return d
+
+    monkeypatch.setattr(engine, "month_draws", spy)
+    for _ in play_game("P0000003", Market(SEED), strategy):
+        pass
+    return seen
+
+def test_strategies_see_the_same_draws(monkeypatch):
+    # ortak rastgele sayılar: kararlar farklı olsa da ayın çekilişleri aynı sırada aynı değerlerdir
+    a, b = _draws_seen(monkeypatch, all_cash), _draws_seen(monkeypatch, max_risk)
+    n = min(len(a), len(b))
+    assert n >= 6 and a[:n] == b[:n]
+
+def test_antithetic_market_mirrors_returns_only():
+    m, mirror = Market(SEED), Market(SEED, antithetic=True)
+    assert np.allclose(mirror.return_shocks(), -m.return_shocks())
+    assert not np.allclose(mirror.price_path(), m.price_path())
+    for month in range(1, m.scenario.months + 1):
+        assert mirror.bank_map(month) == m.bank_map(month)
+    # ayna çiftin S kontrolleri birbirini götürür: yalnızca S² - 1 kalır
+    assert len(compare.market_controls(m, True)) == len(compare.market_controls(m, False)) // 2
+
+def _synthetic(n=400, seed=3, strata=None):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(n, 3))
+    base = rng.normal(50000.0, 20000.0, size=n)  # iki stratejinin ortak gürültüsü
+    offset = 0.0 if strata is None else np.array([0.0, 4000.0, -3000.0])[strata]
+    diff = 100.0 + x @ np.array([500.0, -300.0, 200.0]) + rng.normal(0.0, 20.0, size=n) + offset
+    wealth = np.stack([base + diff, base], axis=1)[:, None, :]
+    return wealth, x
+
+def test_control_variates_shrink_the_interval():
+    wealth, x = _synthetic()
+    plain = compare.estimate(wealth, x, control=False)
+    cv = compare.estimate(wealth, x)
+    assert cv["controls"] == 3 and plain["controls"] == 0
+    assert cv["half_width"] < plain["half_width"] / 10
+    assert cv["ci"][0] <= 100.0 <= cv["ci"][1]
+    assert cv["gain"]["crn_cv"] > cv["gain"]["crn"] > cv["gain"]["independent"] == 1.0
+
+def test_strata_remove_world_offsets():
+    strata = np.arange(400) % 3
+    wealth, x = _synthetic(strata=strata)
+    pooled = compare.estimate(wealth, x, control=False)
+    within = compare.estimate(wealth, x, control=False, strata=strata)
+    assert within["diff"] == pytest.approx(pooled["diff"])
+    assert within["half_width"] < pooled["half_width"] / 3
+
+def test_too_few_units_drop_controls():
+    wealth, x = _synthetic(n=12)
+    assert compare.estimate(wealth, x)["controls"] == 0
+
+def test_measured_gain_over_independent_games():
+    res = compare.measure_gain("td_ladder", "max_risk", SEED, units=40, reps=6)
+    assert res["reps"] == 6 and res["gain"] > 3.0
@@ -0,0 +1,56 @@
+import numpy as np
+
+import contagion
+
+def _net(edges, n):
+    rows, cols, vals = zip(*edges)
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(vals, dtype=float), n
+
+def test_chain_propagates_to_fixed_point():
+    # 0 -> 1 -> 2 -> 3 zinciri (rows borç veren, cols borç alan): 3'ün batışı sırayla 2, 1, 0'ı batırır
+    rows, cols, vals, n = _net([(0, 1, 1.0), (1, 2, 1.0), (2, 3, 1.0)], 4)
+    start = np.array([False, False, False, True])
+    failed = contagion.cascade(rows, cols, vals, np.full(n, 0.5), start, lgd=1.0)
+    assert failed.tolist() == [True, True, True, True]
+    assert start.tolist() == [False, False, False, True]  # girdi değişmez
+
+def test_loss_below_capital_stops_spread():
+    rows, cols, vals, n = _net([(0, 1, 1.0), (1, 2, 1.0)], 3)
+    failed = contagion.cascade(rows, cols, vals, np.array([0.5, 0.6, 0.5]), np.array([False, False, True]), lgd=0.5)
+    assert failed.tolist() == [False, False, True]
+
+def test_losses_from_several_borrowers_add_up():
+    # 0, hem 1'e hem 2'ye borç vermiş; tek batış yetmez, ikisi birden batırır
+    rows, cols, vals, n = _net([(0, 1, 0.4), (0, 2, 0.4)], 3)
+    cap = np.array([0.7, 1.0, 1.0])
+    assert not contagion.cascade(rows, cols, vals, cap, np.array([False, True, False]), 1.0)[0]
+    assert contagion.cascade(rows, cols, vals, cap, np.array([False, True, True]), 1.0)[0]
+
+def test_result_is_a_fixed_point():
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        n = int(rng.integers(2, 9))
+        rows, cols, vals = contagion.exposure_network(n, rng, int(rng.integers(0, n)), 0.6)
+        cap = rng.uniform(0.2, 1.0, n)
+        start = rng.random(n) < 0.3
+        failed = contagion.cascade(rows, cols, vals, cap, start, 0.8)
+        assert (failed >= start).all()
+        loss = np.bincount(rows, weights=vals * failed[cols], minlength=n) * 0.8
+        assert np.array_equal(failed, start | (loss >= cap))
+
+def test_empty_network():
+    rows, cols, vals = contagion.exposure_network(1, np.random.default_rng(0), 3, 0.5)
+    start = np.array([True])
+    assert contagion.cascade(rows, cols, vals, np.ones(1), start, 1.0).tolist() == [True]
+
+def test_lenders_pick_distinct_counterparties():
+    rng = np.random.default_rng(0)
+    for n in range(2, 10):
+        for degree in range(0, n + 2):
+            rows, cols, vals = contagion.exposure_network(n, rng, degree, 0.5)
+            d = min(degree, n - 1)
+            assert rows.size == n * d
+            assert not (rows == cols).any()
+            edges = set(zip(rows.tolist(), cols.tolist()))
+            assert len(edges) == rows.size
+            assert ((vals >= 0.25) & (vals <= 0.75)).all()
@@ -0,0 +1,74 @@
+import pytest
+
+from bots import player_view, td_ladder
+from engine import (
+    CFG, Market, empty_decisions, empty_ticket, income_for_month, projected_sell_cash, sell_cost_rate,
+    settle_month, validate_decisions,
+)
+
+SEED = 20260209
+
+def _available(p: dict, d: dict) -> float:
+    income = income_for_month(float(p["income_base"]), int(p["month"]), CFG)
+    return (p["holdings"]["cash"] + projected_sell_cash(p, d, CFG) + income
+            - p["fixed_current"] - p["extra_current"] + float(d.get("borrow") or 0.0))
+
+def test_projected_sell_cash_uses_settlement_rates(player_at):
+    market = Market(SEED)
+    p = player_at(9, market)
+    bank = max(p["td_accounts"], key=p["td_accounts"].get)
+    d = empty_decisions()
+    d["sell"] = {"fx": 100.0, "eq": 0.0}
+    d["sell_td_amt"], d["sell_td_bank"] = 200.0, bank
+    d["ticket"] = empty_ticket()
+    d["ticket"]["dd_out"] = {bank: 50.0}
+    fee, pen = CFG["TX_FEE"], CFG["EARLY_BREAK_PENALTY"]
+    expected = 100.0 * (1 - sell_cost_rate("fx")) + 200.0 * (1 - fee - pen) + 50.0 * (1 - fee)
+    assert projected_sell_cash(p, d) == pytest.approx(expected)
+
+def test_deposit_sells_ignored_before_banks_open(player_at):
+    market = Market(SEED)
+    p = player_at(2, market)
+    d = empty_decisions()
+    d["sell_dd_amt"] = 500.0
+    assert projected_sell_cash(p, d) == 0.0
+
+@pytest.mark.parametrize("month", [5, 9])
+def test_buy_limit_matches_settlement(month, player_at):
+    # doğrulamanın izin verdiği en büyük alım temerrütsüz kapanır; biraz fazlası reddedilir
+    market = Market(SEED)
+    p = player_at(month, market)
+    d = td_ladder(player_view(p, market))
+    d["buy"] = {"td": float(int(_available(p, d)))}
+    assert validate_decisions(p, d) == []
+    events = settle_month(p, "Ali", d, market)
+    assert not any(e["type"] == "default" for e in events)
+
+    p = player_at(month, market)
+    d["buy"]["td"] += 1000.0
+    assert "Toplam yatırım, bu ay kullanılabilir nakdi aşıyor." in validate_decisions(p, d)
+
+def test_limits(player_at):
+    market = Market(SEED)
+    p = player_at(5, market)
+    bank = next(iter(p["td_accounts"]))
+    d = empty_decisions()
+    d["sell_td_amt"], d["sell_td_bank"] = p["td_accounts"][bank] + 10.0, bank
+    d["borrow"] = 10**9
+    d["buy"] = {"eq": 1.0}
+    errors = validate_decisions(p, d)
+    assert any("Vadeli bozma" in e for e in errors)
+    assert any("borç" in e.lower() for e in errors)
+    assert any(e.startswith("Hisse Senedi") for e in errors)
+
+def test_ticket_validation(player_at):
+    market = Market(SEED)
+    p = player_at(4, market)
+    d = empty_decisions()
+    d["ticket"] = empty_ticket()
+    d["ticket"]["td_in"] = {"Banka 1": 100.0, "Banka 9": 100.0}
+    d["ticket"]["dd_out"] = {"Banka 1": p["dd_accounts"].get("Banka 1", 0.0) + 100.0}
+    errors = validate_decisions(p, d)
+    assert any("Banka 9" in e for e in errors)
+    assert any("Vadesiz çekim (Banka 1)" in e for e in errors)
+    assert validate_decisions(p, empty_decisions()) == []
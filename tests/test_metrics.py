@@ -0,0 +1,36 @@
+import copy
+
+import metrics
+from bots import player_view, td_ladder
+from engine import SETTLE_STAGE_METRIC, Market, settle_month
+from sim import play_game
+
+SEED = 20260209
+
+def _month8():
+    market = Market(SEED)
+    for p, _row, _ev in play_game("Ali", market, td_ladder):
+        if p["month"] >= 8:
+            return market, p, td_ladder(player_view(p, market))
+
+def test_default_settlement_records_nothing():
+    market, p, d = _month8()
+    before = metrics.REGISTRY.snapshot()
+    settle_month(p, "Ali", d, market)
+    assert metrics.REGISTRY.snapshot() == before
+
+def test_metered_settlement_matches_unmetered():
+    market, p, d = _month8()
+    q = copy.deepcopy(p)
+    reg = metrics.Registry()
+    assert settle_month(p, "Ali", d, market, reg) == settle_month(q, "Ali", d, market)
+    assert p == q
+    snap = reg.snapshot()
+    assert snap["counters"]["wfg_settlements_total"] == {(): 1.0}
+    stages = {dict(k)["stage"] for k in snap["hists"][SETTLE_STAGE_METRIC]}
+    assert {"setup", "sales", "buys", "theft", "pgl"} <= stages
+    assert "# TYPE wfg_settle_seconds histogram" in reg.render()
+
+def test_null_timer_is_a_stage_timer_stand_in():
+    timer = metrics.NULL_TIMER
+    assert timer.lap("setup") is None and timer.flush() == 0.0
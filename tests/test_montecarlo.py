@@ -0,0 +1,125 @@
+import time
+from statistics import NormalDist
+
+import pytest
+
+import montecarlo
+from bots import max_risk, td_ladder, player_view
+from engine import CFG, RISK_ASSETS, Market, cfg_with_overrides, net_wealth, new_player, settle_month
+
+N = 200_000
+LEVEL = 0.95
+
+def _key(month=2, cash=0.0, risk=None, deposits=(), p_fail=0.0) -> tuple:
+    risk = risk or {}
+    return (month, cash, tuple(float(risk.get(k, 0.0)) for k in RISK_ASSETS), deposits, p_fail)
+
+def test_cash_theft_var_and_es_match_closed_form():
+    cash, p = 10000.0, float(CFG["CASH_THEFT_PROB_STAGE1"])
+    lo, hi = float(CFG["CASH_THEFT_SEV_MIN"]), float(CFG["CASH_THEFT_SEV_MAX"])
+    # kayıp = nakit x U(lo, hi) (p olasılıkla); %95 kuyruğu hırsızlık çekilişlerinin üst (1 - LEVEL) / p payı
+    q = lo + (hi - lo) * (LEVEL - (1.0 - p)) / p
+    out = montecarlo.portfolio_risk(_key(cash=cash), CFG, n=N, level=LEVEL)
+    assert out["var"] == pytest.approx(cash * q, rel=0.02)
+    assert out["es"] == pytest.approx(cash * (q + hi) / 2.0, rel=0.02)
+
+def test_deposit_es_uses_worst_tail_when_var_is_zero():
+    dd, guar = 50000.0, 0.8
+    out = montecarlo.portfolio_risk(_key(month=5, deposits=(("Banka 1", dd, 0.0, guar, 0.01, dd),)), CFG,
+                                    n=N, level=LEVEL)
+    # küçük olay %2: VaR 0, ama en kötü %5'in %2/%5'i olaylı -> ES = (0.02 / 0.05) x kayıp
+    loss = dd * (1.0 - guar)
+    assert out["var"] == 0.0
+    assert out["es"] == pytest.approx(float(CFG["BANK_INCIDENT_PROB"]) / (1.0 - LEVEL) * loss, rel=0.05)
+    assert out["components"]["deposit"]["es"] == pytest.approx(out["es"])
+
+def test_market_var_and_es_match_normal():
+    value = 20000.0
+    mu, sig = float(CFG["EQ_MU"]), float(CFG["EQ_SIG"])
+    z = NormalDist().inv_cdf(LEVEL)
+    out = montecarlo.portfolio_risk(_key(risk={"eq": value}), CFG, n=N, level=LEVEL)
+    assert out["var"] == pytest.approx(value * (z * sig - mu), rel=0.02)
+    assert out["es"] == pytest.approx(value * (sig * NormalDist().pdf(z) / (1.0 - LEVEL) - mu), rel=0.02)
+
+def test_components_add_up_to_es():
+    key = _key(month=5, cash=3000.0, risk={"eq": 8000.0, "fx": 4000.0},
+               deposits=(("Banka 1", 5000.0, 6000.0, 0.7, 0.012, 11000.0), ("Banka 2", 0.0, 2000.0, 0.9, 0.01, 2000.0)),
+               p_fail=0.05)
+    out = montecarlo.portfolio_risk(key, CFG)
+    assert out["value"] == pytest.approx(3000.0 + 8000.0 + 4000.0 + 11000.0 + 2000.0)
+    assert sum(c["es"] for c in out["components"].values()) == pytest.approx(out["es"])
+    assert out["es"] >= out["var"] > 0.0
+    assert montecarlo.portfolio_risk(key, CFG) == out  # sabit seed: önbellek anahtarı olarak güvenli
+
+def test_risk_key_from_player():
+    market = Market(7)
+    p = new_player("Ayşe", 7, market.cfg)
+    while p["month"] < 6:
+        settle_month(p, "Ayşe", td_ladder(player_view(p, market)), market)
+    bank_map = market.bank_map(p["month"])
+    month, cash, risk, deposits, p_fail = montecarlo.risk_key(p, bank_map, market.cfg)
+    assert month == p["month"] and cash == max(p["holdings"]["cash"], 0.0)
+    assert risk == tuple(p["holdings"][k] for k in RISK_ASSETS)
+    assert deposits and all(b in bank_map and d + t > 0 for b, d, t, *_ in deposits)
+    assert 0.0 <= p_fail <= 1.0
+
+# rastgelelik kapalı dünya: önizleme dağılımı tek noktadır ve settle_month sonucuna eşit olmalı
+CALM = {
+    **{f"{k.upper()}_SIG": 0.0 for k in RISK_ASSETS},
+    "CASH_THEFT_PROB_STAGE1": 0.0, "CASH_THEFT_PROB_STAGE2": 0.0, "BANK_INCIDENT_PROB": 0.0,
+    "BANKRUPTCY_MIN_EVENTS_PER_PLAYER": 0, "BANKRUPTCY_EXTRA_PROB_AFTER_MIN": 0.0,
+    # 10. ay çöküşü fiyat tabanına (PRICE_FLOOR) dayanır
+    "CRISIS_MONTH": 10, **{f"CRISIS_{k.upper()}": -1.5 for k in RISK_ASSETS},
+}
+
+@pytest.mark.parametrize("strategy", [td_ladder, max_risk])
+def test_preview_matches_settlement_without_randomness(strategy):
+    market = Market(7, cfg_with_overrides(CALM))
+    p = new_player("Ayşe", 7, market.cfg)
+    checked = 0
+    while not p["finished"]:
+        month = p["month"]
+        d = strategy(player_view(p, market))
+        mc = montecarlo.simulate_month_end(montecarlo.preview_key(p, d, market.bank_map(month), market.cfg), market.cfg)
+        settle_month(p, "Ayşe", d, market)
+        assert mc["quantiles"][0] == pytest.approx(mc["quantiles"][-1]) and mc["p_default"] == 0.0
+        if month not in p["theft_months"]:  # kesin hırsızlık ayları gizli bilgidir, önizlemeye girmez
+            assert mc["mean"] == pytest.approx(net_wealth(p)), month
+            checked += 1
+    assert checked >= 8
+
+def test_preview_key_tracks_decisions():
+    market = Market(7)
+    p = new_player("Ayşe", 7, market.cfg)
+    while p["month"] < 8:
+        settle_month(p, "Ayşe", max_risk(player_view(p, market)), market)
+    bank_map = market.bank_map(p["month"])
+    held = max(RISK_ASSETS, key=lambda k: p["holdings"][k])
+    base = montecarlo.preview_key(p, {}, bank_map, market.cfg)
+    assert hash(base) == hash(montecarlo.preview_key(p, {}, bank_map, market.cfg))
+
+    sold = montecarlo.preview_key(p, {"sell": {held: 1000.0}}, bank_map, market.cfg)
+    j = RISK_ASSETS.index(held)
+    assert sold[4][j] == pytest.approx(base[4][j] - 1000.0)
+    assert base[1] < sold[1] < base[1] + 1000.0
+
+    bank = next(iter(bank_map))
+    dep = montecarlo.preview_key(p, {"buy": {"td": 500.0}, "td_bank": bank}, bank_map, market.cfg)
+    td = {d[0]: d[2] for d in dep[5]}
+    assert dep[1] == pytest.approx(base[1] - 500.0)
+    assert td[bank] == pytest.approx({d[0]: d[2] for d in base[5]}.get(bank, 0.0) + 500.0 * (1.0 - CFG["TX_FEE"]))
+    # oyuncu durumu değişmez
+    assert montecarlo.preview_key(p, {}, bank_map, market.cfg) == base
+
+def test_preview_cached_key_is_deterministic_and_within_budget():
+    key = (8, 12000.0, 5000.0, 20000.0, (4000.0, 3000.0, 9000.0, 2000.0),
+           tuple((f"Banka {i}", 3000.0, 8000.0, 0.8, 0.012, 11000.0) for i in range(1, 6)), 0.05)
+    first = montecarlo.simulate_month_end(key, CFG)
+    assert montecarlo.simulate_month_end(key, CFG) == first
+    assert first["draws"] == montecarlo.PREVIEW_DRAWS and first["quantiles"] == sorted(first["quantiles"])
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        montecarlo.simulate_month_end(key, CFG)
+        best = min(best, time.perf_counter() - t0)
+    assert best < 0.030  # önizleme her gönderimde (önbellek dışı) 30 ms bütçesinde
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+import reference
+from engine import (
+    CFG, DEFAULT_MONTHLY_INCOME, RISK_ASSETS, START_EXTRA_COST, START_FIXED_COST, Scenario, cfg_with_overrides,
+    theft_month_count,
+)
+from reference import QUANTILES, simulate_wealth_paths, wealth_quantiles
+from views import wealth_chart
+
+SEED = 20260209
+
+# rastgele hırsızlık, banka olayı/batışı ve fiyat oynaklığı kapalı (kesin hırsızlık ayları kalır)
+CALM = {
+    **{f"{k.upper()}_SIG": 0.0 for k in RISK_ASSETS},
+    "CASH_THEFT_PROB_STAGE1": 0.0, "CASH_THEFT_PROB_STAGE2": 0.0, "BANK_INCIDENT_PROB": 0.0,
+    "BANKRUPTCY_MIN_EVENTS_PER_PLAYER": 0, "BANKRUPTCY_EXTRA_PROB_AFTER_MIN": 0.0,
+}
+
+def test_paths_are_fixed_by_seed_and_cfg():
+    a = simulate_wealth_paths(SEED, CFG, n=300)
+    assert a.shape == (300, CFG["MONTHS"]) and np.isfinite(a).all()
+    assert np.array_equal(a, simulate_wealth_paths(SEED, CFG, n=300))
+    assert not np.array_equal(a, simulate_wealth_paths(SEED + 1, CFG, n=300))
+    assert simulate_wealth_paths(SEED, cfg_with_overrides({"MONTHS": 20}), n=50).shape == (50, 20)
+
+def test_quantiles_are_ordered_bands_of_the_paths():
+    q = wealth_quantiles(SEED, CFG, n=300)
+    assert q.shape == (len(QUANTILES), CFG["MONTHS"])
+    assert np.allclose(q, np.quantile(simulate_wealth_paths(SEED, CFG, n=300), QUANTILES, axis=0))
+    assert (np.diff(q, axis=0) >= 0).all()
+
+def test_first_month_follows_the_game_rules():
+    cfg = cfg_with_overrides(CALM)
+    first = simulate_wealth_paths(SEED, cfg, n=2000)[:, 0]
+    # 1. ayda yalnızca nakit açık: gelir - sabit - ek gider; kesin hırsızlık ayına düşenler şiddet kadar kaybeder
+    clean = Scenario(cfg).income(DEFAULT_MONTHLY_INCOME, 1) - START_FIXED_COST - START_EXTRA_COST
+    robbed = first < clean - 1e-6
+    assert first.max() == pytest.approx(clean)
+    assert first.min() >= clean * (1.0 - cfg["CASH_THEFT_SEV_MAX"]) - 1e-6
+    assert robbed.mean() == pytest.approx(theft_month_count(cfg) / cfg["MONTHS"], abs=0.03)
+
+def test_chart_bands_are_the_quantiles():
+    q = wealth_quantiles(SEED, CFG, n=200)
+    log = [{"Ay": m, "ToplamServet(TL)": 1000.0 * m} for m in range(1, 4)]
+    chart = wealth_chart(log, q, QUANTILES, "Ay")
+    band = chart.data  # bant katmanları ortak tabloyu paylaşır
+    assert list(band["Ay"]) == list(range(1, CFG["MONTHS"] + 1))
+    for level, row in zip(QUANTILES, q):
+        assert np.allclose(band[f"P{int(level * 100)}"], row)
+    assert list(chart.layer[-1].data["Toplam Servet (Net) - TL"]) == [1000.0, 2000.0, 3000.0]
+
+def test_sessions_share_the_cached_bands(monkeypatch):
+    st = pytest.importorskip("streamlit")
+    from streamlit.testing.v1 import AppTest
+    calls = []
+    monkeypatch.setattr(reference, "wealth_quantiles",
+                        lambda seed, cfg, n=4000: calls.append(seed) or np.zeros((len(QUANTILES), int(cfg["MONTHS"]))))
+    st.cache_data.clear()
+    for name in ("Ayşe", "Veli"):
+        at = AppTest.from_file("../app.py", default_timeout=60).run()
+        at.text_input[0].set_value(name).run()
+        next(b for b in at.button if "Tamamla" in str(b.label)).click().run()
+        assert not at.exception and len(at.get("vega_lite_chart")) == 1
+    assert calls == [SEED]  # ikinci öğrencinin sayfası önbellekten çizilir
+    st.cache_data.clear()
@@ -0,0 +1,100 @@
+import json
+import threading
+
+import pytest
+
+from bots import STRATEGIES
+from engine import Market, cfg_with_overrides
+from rooms import DEFAULT_ROOMS, Room, load_rooms
+from sim import play_game
+
+SYSTEMIC = {"SYSTEMIC_MODE": True, "INTERBANK_DEGREE": 3}
+
+def _write_rooms(tmp_path, rooms: dict) -> str:
+    f = tmp_path / "rooms.json"
+    f.write_text(json.dumps({"rooms": rooms}, ensure_ascii=False), encoding="utf-8")
+    return str(f)
+
+def _play(market, names) -> dict:
+    out = {}
+    strategies = list(STRATEGIES.values())
+    for name in names:
+        strategy = strategies[int(name[1:]) % len(strategies)]
+        for p, _row, _events in play_game(name, market, strategy):
+            pass
+        out[name] = (p["log"], p["bankruptcies_seen"], p["defaulted"])
+    return out
+
+def test_load_rooms(tmp_path):
+    (tmp_path / "kriz.toml").write_text("TX_FEE = 0.003\nMONTHS = 10\n", encoding="utf-8")
+    path = _write_rooms(tmp_path, {"Şube A": {"seed": 1},
+                                   "Şube B": {"seed": 2, "scenario": "kriz.toml", "overrides": {"TX_FEE": 0.004}}})
+    rooms = load_rooms(path)
+    assert rooms["Şube A"] == {"seed": 1, "overrides": {}}
+    assert rooms["Şube B"]["overrides"] == {"TX_FEE": 0.004, "MONTHS": 10}  # overrides senaryonun üstüne yazar
+    assert load_rooms(str(tmp_path / "yok.json")) == DEFAULT_ROOMS
+
+@pytest.mark.parametrize("rooms, error", [
+    ({}, ValueError),
+    ({"A": {"overrides": {}}}, ValueError),
+    ({"A": {"seed": -1}}, ValueError),
+    ({"A": {"seed": 1, "overrides": {"TX_FE": 0.1}}}, KeyError),
+    ({"A": {"seed": 1, "overrides": {"MONTHS": 0}}}, ValueError),
+])
+def test_load_rooms_rejects(tmp_path, rooms, error):
+    with pytest.raises(error):
+        load_rooms(_write_rooms(tmp_path, rooms))
+
+def test_rooms_have_their_own_market():
+    a, b = Room("A", 1), Room("B", 2, SYSTEMIC)
+    assert a.market is not b.market and a.market.scenario is a.scenario and b.cfg["SYSTEMIC_MODE"]
+    assert a.cfg_key != b.cfg_key
+    assert a.market.bank_map(5) != b.market.bank_map(5)
+
+def test_shared_market_rejects_mutation():
+    market = Room("B", 2, SYSTEMIC).market
+    month = market.scenario.months
+    with pytest.raises(TypeError):
+        market.bank_state[month] = {}
+    with pytest.raises(TypeError):
+        market.bank_state[month]["Banka 1"]["Guarantee"] = 0.0
+    with pytest.raises(ValueError):
+        market.price_path()[1, 0] = 2.0
+    net = market.interbank_network(month)
+    with pytest.raises(ValueError):
+        net["vals"][0] = 0.0
+    with pytest.raises(TypeError):
+        net["capital"] = None
+    # önceden üretilmemiş bir yayılım (iki bankalı başlangıç) paylaşılan nesneye yazamaz
+    with pytest.raises(TypeError):
+        market.failed_banks(month, {"Banka 1", "Banka 2"})
+    # banka olayları bir bankayla başlar: her başlangıç hazırdır ve kopya döner
+    hit = market.failed_banks(month, {"Banka 1"})
+    hit.add("Banka 99")
+    assert "Banka 99" not in market.failed_banks(month, {"Banka 1"})
+
+def test_frozen_market_plays_like_a_fresh_one():
+    room = Room("B", 2, SYSTEMIC)
+    names = [f"P{i:03d}" for i in range(24)]
+    expected = _play(Market(2, cfg_with_overrides(SYSTEMIC)), names)
+    assert _play(room.market, names) == expected
+    assert any(seen > 0 for _log, seen, _d in expected.values())
+
+def test_sessions_share_the_room_market_across_threads():
+    room = Room("B", 2, SYSTEMIC)
+    names = [f"P{i:03d}" for i in range(16)]
+    expected = _play(Market(2, cfg_with_overrides(SYSTEMIC)), names)
+    results, errors = {}, []
+
+    def session(chunk):
+        try:
+            results.update(_play(room.market, chunk))
+        except Exception as e:  # noqa: BLE001 - iş parçacığındaki hata testte yüzeye çıkmalı
+            errors.append(e)
+
+    threads = [threading.Thread(target=session, args=(names[i::4],)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == [] and results == expected
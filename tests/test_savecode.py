@@ -0,0 +1,82 @@
+import struct
+import zlib
+
+import pytest
+
+from bots import player_view, td_ladder
+from engine import (
+    Market, SAVE_HEADERS, SAVE_MAGIC, SAVE_VERSION, SEED_MAX, decode_save_code, encode_save_code, new_player,
+    save_code_bytes, save_code_text, settle_month,
+)
+from sim import play_game
+
+SEED = 20260209
+
+def _played(months: int = 5) -> dict:
+    for p, _row, _ev in play_game("Ayşe", Market(SEED), td_ladder):
+        if p["month"] > months or p["finished"]:
+            return p
+    return p
+
+@pytest.mark.parametrize("seed", [SEED, 0, SEED_MAX - 1])
+def test_round_trip(seed):
+    p = _played()
+    name, q, s = decode_save_code(save_code_bytes(save_code_text(encode_save_code("Ayşe", p, seed))))
+    assert (name, s) == ("Ayşe", seed)
+    assert q == p
+
+def test_round_trip_new_player_without_log():
+    p = new_player("Ali", SEED)
+    assert decode_save_code(encode_save_code("Ali", p, SEED))[1] == p
+
+@pytest.mark.parametrize("seed", [-1, SEED_MAX, -2**63, 2**63])
+def test_seed_out_of_range(seed):
+    p = new_player("Ali", SEED)
+    with pytest.raises(ValueError):
+        encode_save_code("Ali", p, seed)
+    if -2**63 <= seed < 2**63:
+        blob = encode_save_code("Ali", p, SEED)
+        with pytest.raises(ValueError):
+            decode_save_code(SAVE_HEADERS[SAVE_VERSION].pack(SAVE_MAGIC, SAVE_VERSION, seed) + blob[12:])
+    with pytest.raises(ValueError):
+        new_player("Ali", seed)
+    with pytest.raises(ValueError):
+        Market(seed)
+
+def test_seeds_differing_above_32_bits_are_rejected_not_aliased():
+    assert Market(5).price_path()[1:].tolist() != Market(6).price_path()[1:].tolist()
+    with pytest.raises(ValueError):
+        Market(5 + SEED_MAX)
+
+@pytest.mark.parametrize("seed", [0, SEED_MAX - 1])
+def test_boundary_seed_plays_from_decoded_code(seed):
+    name, p, s = decode_save_code(encode_save_code("Ali", new_player("Ali", seed), seed))
+    market = Market(s)
+    while p["month"] < 5 and not p["finished"]:
+        settle_month(p, name, td_ladder(player_view(p, market)), market)
+    assert len(p["log"]) == 4
+
+def test_version_1_codes_still_load():
+    p = new_player("Ali", SEED)
+    blob = encode_save_code("Ali", p, SEED)
+    v1 = struct.pack(">3sBI", SAVE_MAGIC, 1, SEED) + blob[12:]
+    assert decode_save_code(v1) == ("Ali", p, SEED)
+
+@pytest.mark.parametrize("mutate", [
+    lambda b: b"",
+    lambda b: b[:6],
+    lambda b: b"XYZ" + b[3:],
+    lambda b: b[:3] + bytes([99]) + b[4:],
+    lambda b: b[:-5],
+    lambda b: b[:20] + bytes(x ^ 0xFF for x in b[20:40]) + b[40:],
+    lambda b: b[:12] + zlib.compress(b"[1, 2]"),
+    lambda b: b[:12] + zlib.compress(b"\xff\xfe"),
+])
+def test_corrupt_blob_raises_value_error(mutate):
+    blob = encode_save_code("Ali", _played(3), SEED)
+    with pytest.raises(ValueError):
+        decode_save_code(mutate(blob))
+
+def test_bad_text_raises_value_error():
+    with pytest.raises(ValueError):
+        save_code_bytes("a")
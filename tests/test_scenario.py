@@ -0,0 +1,136 @@
+import copy
+
+import numpy as np
+import pytest
+
+from bots import all_cash, player_view
+from engine import (
+    ASSETS, CFG, DEFAULT_MONTHLY_INCOME, START_EXTRA_COST, START_FIXED_COST, TAX_DROP_RATE, Market, Scenario,
+    bank_count_for_month, buy_cost_rate, can_borrow, cfg_hash, cfg_with_overrides, income_for_month, load_scenario,
+    new_player, open_assets_by_month, settle_month, stage_label, theft_month_count, validate_cfg,
+)
+
+@pytest.mark.parametrize("overrides, key", [
+    ({"MONTHS": 0}, "MONTHS"),
+    ({"MONTHS": 2.5}, "MONTHS"),
+    ({"TX_FEE": "yüzde bir"}, "TX_FEE"),
+    ({"TX_FEE": True}, "TX_FEE"),
+    ({"BANK_INCIDENT_PROB": 1.5}, "BANK_INCIDENT_PROB"),
+    ({"SPREAD.eq": -0.01}, "SPREAD.eq"),
+    ({"SYSTEMIC_MODE": 1}, "SYSTEMIC_MODE"),
+    ({"STEP_UNIT": ""}, "STEP_UNIT"),
+    ({"STEP_SCALE": 0}, "STEP_SCALE"),
+    ({"TAX_DROP_STEPS": -1}, "TAX_DROP_STEPS"),
+    ({"PGL_FLOOR": 0.5, "PGL_CAP": 0.1}, "PGL_FLOOR > PGL_CAP"),
+    ({"BANKS_START": 0}, "BANKS_START"),
+    ({"BANK_STAGE_FROM": 9, "HEDGE_STAGE_FROM": 5}, "Aşama"),
+])
+def test_validate_cfg_rejects(overrides, key):
+    cfg = cfg_with_overrides(overrides)
+    assert any(key in e for e in validate_cfg(cfg))
+    with pytest.raises(ValueError, match="Geçersiz senaryo"):
+        Scenario(cfg)
+
+def test_unknown_keys_are_rejected():
+    assert validate_cfg(CFG) == []
+    for key in ("TX_FE", "SPREAD.gold", "TX_FEE.eq"):
+        with pytest.raises(KeyError):
+            cfg_with_overrides({key: 0.01})
+
+def test_load_scenario_tables_match_rules(tmp_path):
+    path = tmp_path / "uzun_hafta.toml"
+    path.write_text('MONTHS = 30\nSTEP_UNIT = "Hafta"\nTAX_DROP_STEPS = 4\nLOAN_ACTIVE_FROM_MONTH = 6\n'
+                    '[SPREAD]\neq = 0.04\n', encoding="utf-8")
+    sc = load_scenario(str(path))
+    cfg = sc.cfg
+    assert sc.name == "uzun_hafta" and sc.months == 30 and sc.unit == "Hafta"
+    assert cfg["SPREAD"]["eq"] == 0.04 and cfg["SPREAD"]["fx"] == CFG["SPREAD"]["fx"]
+    assert sc.spread_half["eq"] == 0.02 and sc.buy_rate["eq"] == buy_cost_rate("eq", cfg)
+    for m in range(sc.months + 2):
+        assert sc.open_assets[m] == tuple(open_assets_by_month(m, cfg))
+        assert list(sc.open_mask[m]) == [k in sc.open_assets[m] for k in ASSETS]
+        assert sc.stage(m) == stage_label(m, cfg)
+        assert sc.bank_count(m) == bank_count_for_month(m, cfg)
+        assert sc.can_borrow(m) == can_borrow(m, cfg)
+        assert sc.income(1000.0, m) == pytest.approx(income_for_month(1000.0, m, cfg))
+    # oyun sonrası aylar son satıra sabitlenir
+    assert sc.row(99) == sc.months + 1 and sc.row(-3) == 0
+    assert sc.income(1000.0, 99) == pytest.approx(1000.0 * 0.95 ** 4)
+
+def test_scenario_is_immutable_all_the_way_down():
+    src = cfg_with_overrides({"TX_FEE": 0.02})
+    sc = Scenario(src)
+    with pytest.raises(AttributeError):
+        sc.fee = 0.0
+    with pytest.raises(TypeError):
+        sc.cfg["TX_FEE"] = 0.0
+    with pytest.raises(TypeError):
+        sc.cfg["SPREAD"]["eq"] = 0.0
+    with pytest.raises(TypeError):
+        del sc.cfg["SPREAD"]
+    with pytest.raises(ValueError):
+        sc.open_mask[0, 0] = True
+    with pytest.raises(ValueError):
+        sc.income_factor[2] = 1.0
+    # kaynak sözlük sonradan değişse de senaryo (ve önbellek anahtarı) değişmez
+    key = sc.key
+    src["TX_FEE"] = 0.5
+    src["SPREAD"]["eq"] = 0.5
+    assert sc.cfg["TX_FEE"] == 0.02 and sc.cfg["SPREAD"]["eq"] == CFG["SPREAD"]["eq"] and sc.key == key
+
+def test_frozen_cfg_feeds_back_into_rules():
+    sc = Scenario(cfg_with_overrides({"MONTHS": 8}))
+    # dondurulmuş görünüm yeni bir senaryonun ya da değişikliğin tabanı olabilir
+    assert Scenario(sc.cfg).key == sc.key == cfg_hash(sc.cfg)
+    derived = cfg_with_overrides({"SPREAD.cr": 0.1}, base=sc.cfg)
+    derived["TX_FEE"] = 0.03
+    assert derived["MONTHS"] == 8 and derived["SPREAD"]["cr"] == 0.1 and sc.cfg["SPREAD"]["cr"] == CFG["SPREAD"]["cr"]
+    assert Market(7, sc.cfg).price_path().shape == Market(7, sc).price_path().shape
+    assert copy.deepcopy(CFG) == CFG
+    assert np.array_equal(Scenario(sc.cfg).theft_prob, sc.theft_prob)
+
+WEEKLY = {"STEP_UNIT": "Hafta", "STEP_SCALE": 12 / 52, "MONTHS": 52}
+
+def test_step_scale_scales_starting_flows_not_rates():
+    weekly, monthly = cfg_with_overrides(WEEKLY), cfg_with_overrides({"MONTHS": 52})
+    p, q = new_player("Ali", 7, weekly), new_player("Ali", 7, monthly)
+    scale = 12 / 52
+    assert p["income_base"] == pytest.approx(DEFAULT_MONTHLY_INCOME * scale)
+    assert p["fixed_current"] == pytest.approx(START_FIXED_COST * scale)
+    assert p["extra_current"] == pytest.approx(START_EXTRA_COST * scale)
+    # oran ve olasılıklar adım başınadır: bankalar, fiyat yolu ve FGD ölçeklenmez
+    a, b = Market(7, weekly), Market(7, monthly)
+    assert all(a.bank_map(m) == b.bank_map(m) for m in range(1, 53))
+    assert np.array_equal(a.price_path(), b.price_path())
+    assert p["pgl_current"] == q["pgl_current"]
+
+@pytest.mark.parametrize("overrides, count", [
+    ({}, 3),
+    (WEEKLY, 3),
+    ({**WEEKLY, "MONTHS": 104}, 6),
+    ({**WEEKLY, "MONTHS": 53}, 6),  # başlamış takvim yılı tam sayılır
+    ({"MONTHS": 120}, 30),
+    ({"MONTHS": 2}, 2),
+])
+def test_theft_months_scale_with_calendar_years(overrides, count):
+    cfg = cfg_with_overrides(overrides)
+    p = new_player("Ali", 7, cfg)
+    assert theft_month_count(cfg) == count == len(p["theft_months"])
+    assert p["theft_months"] == sorted(set(p["theft_months"])) and 1 <= p["theft_months"][0] <= p["theft_months"][-1] <= cfg["MONTHS"]
+
+@pytest.mark.parametrize("overrides", [WEEKLY, {"MONTHS": 60, "TAX_DROP_STEPS": 5}, {"MONTHS": 30, "TAX_DROP_STEPS": 0}])
+def test_income_drops_for_tax_drop_steps_then_stays_flat(overrides):
+    market = Market(7, cfg_with_overrides(overrides))
+    cfg, sc = market.cfg, market.scenario
+    p = new_player("Ali", 7, cfg)
+    base = p["income_base"]
+    while not p["finished"]:
+        settle_month(p, "Ali", all_cash(player_view(p, market)), market)
+    steps = int(cfg["TAX_DROP_STEPS"])
+    assert len(p["log"]) > steps + 2  # düşüşler ve sonrasındaki düz kısım oynandı
+    for row in p["log"]:
+        m = row["Ay"]
+        expected = base * (1.0 - TAX_DROP_RATE) ** min(max(m - 1, 0), steps)
+        assert row["Gelir(TL)"] == pytest.approx(expected) == income_for_month(base, m, cfg) == sc.income(base, m)
+    assert p["log"][-1]["Gelir(TL)"] == pytest.approx(base * (1.0 - TAX_DROP_RATE) ** steps)
+    assert sc.income(base, sc.months) == sc.income(base, 10 * sc.months) == pytest.approx(p["log"][-1]["Gelir(TL)"])
@@ -0,0 +1,120 @@
+import copy
+
+import pytest
+
+from bots import player_view, td_ladder
+from engine import (
+    RISK_ASSETS, Market, cfg_with_overrides, empty_decisions, empty_ticket, new_player, projected_sell_cash, settle_month,
+    validate_decisions,
+)
+
+SEED = 20260209
+
+@pytest.mark.parametrize("month, asset", [(1, "dd"), (2, "td"), (4, "eq"), (6, "cr"), (8, "yok")])
+def test_closed_asset_buy_is_rejected_without_side_effects(month, asset, player_at):
+    market = Market(SEED)
+    p = new_player("Ali", SEED, market.cfg) if month == 1 else player_at(month, market)
+    d = empty_decisions()
+    d["buy"] = {asset: 1000.0}
+    assert validate_decisions(p, d, market.cfg)
+    before = copy.deepcopy(p)
+    with pytest.raises(ValueError, match="açık olmayan"):
+        settle_month(p, "Ali", d, market)
+    assert p == before
+
+def test_deposit_in_sell_dict_is_rejected(player_at):
+    market = Market(SEED)
+    p = player_at(5, market)
+    d = empty_decisions()
+    d["sell"] = {"td": 1.0}
+    with pytest.raises(ValueError):
+        settle_month(p, "Ali", d, market)
+
+def test_open_asset_buy_settles(player_at):
+    market = Market(SEED)
+    p = player_at(4, market)
+    d = empty_decisions()
+    d["buy"] = {"td": 1000.0}
+    d["td_bank"] = market.banks_for_month(4)[0]["Bank"]
+    assert validate_decisions(p, d, market.cfg) == []
+    settle_month(p, "Ali", d, market)
+    assert p["month"] == 5
+
+# hırsızlık, banka olayı/batışı ve fiyat oynaklığı kapalı: bakiyeler yalnızca emir aritmetiğiyle değişir
+CALM = {
+    **{f"{k.upper()}_SIG": 0.0 for k in RISK_ASSETS},
+    "CASH_THEFT_PROB_STAGE1": 0.0, "CASH_THEFT_PROB_STAGE2": 0.0, "BANK_INCIDENT_PROB": 0.0,
+    "BANKRUPTCY_MIN_EVENTS_PER_PLAYER": 0, "BANKRUPTCY_EXTRA_PROB_AFTER_MIN": 0.0,
+}
+
+def _calm_player_at(month: int) -> tuple:
+    market = Market(SEED, cfg_with_overrides(CALM))
+    p = new_player("Ali", SEED, market.cfg)
+    p["theft_months"] = []
+    while p["month"] < month:
+        settle_month(p, "Ali", td_ladder(player_view(p, market)), market)
+    return p, market
+
+def test_multi_bank_ticket_settles_per_bank():
+    p, market = _calm_player_at(8)
+    sc, bank_map = market.scenario, market.bank_map(8)
+    fee, pen = sc.fee, sc.break_penalty
+    td1, td2 = p["td_accounts"]["Banka 1"], p["td_accounts"]["Banka 2"]
+    assert td1 > 30000.0 and 0.0 < td2 < 50000.0 and not p["dd_accounts"]
+    cash0 = p["holdings"]["cash"]
+
+    d = empty_decisions()
+    d["buy"] = {"eq": 4000.0}
+    d["ticket"] = empty_ticket()
+    d["ticket"]["td_out"] = {"Banka 1": 30000.0, "Banka 2": 50000.0}  # Banka 2: bakiyeyle sınırlanır
+    d["ticket"]["dd_in"] = {"Banka 3": 10000.0, "Banka 4": 5000.0, "Banka 6": 0.0}
+    d["ticket"]["td_in"] = {"Banka 5": 20000.0}
+    assert validate_decisions(p, d, market.cfg) == ["Vadeli bozma (Banka 2) bakiyeyi aşıyor."]
+    projected = projected_sell_cash(p, d, market.cfg)
+    settle_month(p, "Ali", d, market)
+    row = p["log"][-1]
+
+    out = 30000.0 + td2
+    ins = 10000.0 + 5000.0 + 20000.0
+    assert row["SatışNetNakitGirişi(TL)"] == pytest.approx(out * (1.0 - fee - pen))
+    assert projected == pytest.approx((30000.0 + 50000.0) * (1.0 - fee - pen))  # önizleme istenen tutarı kullanır
+    assert row["VadeliBozmaCezası(TL)"] == pytest.approx(out * pen)
+    assert row["İşlemÜcreti(TL)"] == pytest.approx((out + ins + 4000.0) * fee)
+    assert row["SpreadMaliyeti(TL)"] == pytest.approx(4000.0 * sc.spread_half["eq"])
+
+    # banka başına bakiyeler: yatırılan net tutar, vadelide ay sonu faiziyle
+    rate = {b: bank_map[b]["TD_Rate"] for b in bank_map}
+    assert p["dd_accounts"] == pytest.approx({"Banka 3": 10000.0 * (1.0 - fee), "Banka 4": 5000.0 * (1.0 - fee)})
+    assert p["td_accounts"] == pytest.approx({
+        "Banka 1": (td1 - 30000.0) * (1.0 + rate["Banka 1"]),
+        "Banka 2": 0.0,
+        "Banka 5": 20000.0 * (1.0 - fee) * (1.0 + rate["Banka 5"]),
+    })
+    assert row["VadeliFaizGeliri(TL)"] == pytest.approx((td1 - 30000.0) * rate["Banka 1"] + 20000.0 * (1.0 - fee) * rate["Banka 5"])
+    cash_flow = row["Gelir(TL)"] - row["SabitGider(TL)"] - row["EkHarcama(TL)"] + row["YeniBorç(1ay)(TL)"] - row["VadesiGelenBorçÖdeme(TL)"]
+    assert p["holdings"]["cash"] == pytest.approx(cash0 + row["SatışNetNakitGirişi(TL)"] + cash_flow - ins - 4000.0)
+    assert p["holdings"]["eq"] > 0
+
+def test_ticket_matches_single_bank_fields():
+    a, market = _calm_player_at(8)
+    b = copy.deepcopy(a)
+    single = empty_decisions()
+    single.update(sell_td_amt=12000.0, sell_td_bank="Banka 1", sell_dd_amt=0.0)
+    single["buy"] = {"dd": 3000.0}
+    single["dd_bank"] = "Banka 2"
+    ticket = empty_decisions()
+    ticket["ticket"] = {**empty_ticket(), "td_out": {"Banka 1": 12000.0}, "dd_in": {"Banka 2": 3000.0}}
+    settle_month(a, "Ali", single, market)
+    settle_month(b, "Ali", ticket, market)
+    keep = ("log", "dd_accounts", "td_accounts", "holdings")
+    assert {k: a[k] for k in keep} == {k: b[k] for k in keep}
+    assert a["log"][-1]["VadeliBozmaCezası(TL)"] == pytest.approx(12000.0 * market.scenario.break_penalty)
+
+def test_ticket_deposit_beyond_cash_defaults():
+    p, market = _calm_player_at(8)
+    d = empty_decisions()
+    d["ticket"] = {**empty_ticket(), "dd_in": {"Banka 3": 10_000_000.0}}
+    assert validate_decisions(p, d, market.cfg) == ["Toplam yatırım, bu ay kullanılabilir nakdi aşıyor."]
+    events = settle_month(p, "Ali", d, market)
+    assert p["defaulted"] and p["finished"] and p["holdings"]["cash"] == 0.0
+    assert [e["type"] for e in events] == ["default"] and "Banka 3" not in p["dd_accounts"]
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import engine
+import stress
+from engine import CFG, RISK_ASSETS, Market, Scenario, cfg_with_overrides, new_player, settle_month
+from bots import player_view, td_ladder
+
+ROWS = 15
+
+def _write_csv(path, rows):
+    lines = [",".join(stress.COLUMNS)] + [",".join(f"{v:.6f}" for v in r) for r in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    monkeypatch.setenv("WFG_STRESS_DIR", str(tmp_path / "lib"))
+    stress._open.cache_clear()
+    rng = np.random.default_rng(1)
+    data = np.column_stack([rng.uniform(-0.2, 0.2, size=(ROWS, 4)), np.linspace(0.01, 0.08, ROWS)])
+    stress.import_csv(_write_csv(tmp_path / "kriz.csv", data), "kriz", meta={"label": "Deneme krizi"})
+    yield np.round(data, 6)
+    stress._open.cache_clear()
+
+def test_import_round_trip_is_read_only_mmap(library):
+    arr = stress.window("kriz")
+    assert isinstance(arr, np.memmap) and not arr.flags.writeable
+    assert np.array_equal(np.asarray(arr), library)
+    assert stress.window("kriz") is arr  # lru_cache: dosya süreç başına bir kez açılır
+    assert stress.list_windows() == [("kriz", "Deneme krizi")]
+    assert stress.window_meta("kriz") == {"label": "Deneme krizi"}
+
+@pytest.mark.parametrize("header, rows", [
+    ("fx,pm,eq,cr", ["0.1,0.1,0.1,0.1"]),
+    ("fx,pm,eq,cr,pgl", []),
+    ("fx,pm,eq,cr,pgl", ["0.1,-1.0,0.1,0.1,0.02"]),
+    ("fx,pm,eq,cr,pgl", ["0.1,abc,0.1,0.1,0.02"]),
+])
+def test_import_rejects_bad_csv(tmp_path, header, rows):
+    f = tmp_path / "bad.csv"
+    f.write_text("\n".join([header] + rows) + "\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        stress.import_csv(str(f), "bad", path=str(tmp_path / "lib"))
+
+def test_window_slice_boundaries(library):
+    assert np.array_equal(stress.window_slice("kriz", 0, ROWS), library)
+    assert np.array_equal(stress.window_slice("kriz", ROWS - 12, 12), library[-12:])
+    for start in (ROWS - 11, ROWS, ROWS + 5, -1):
+        with pytest.raises(ValueError):
+            stress.window_slice("kriz", start, 12)
+    with pytest.raises(FileNotFoundError):
+        stress.window("yok")
+
+def test_scenario_rejects_start_past_window(library):
+    with pytest.raises(ValueError):
+        Scenario(cfg_with_overrides({"STRESS_WINDOW": "kriz", "STRESS_START": ROWS - 11}))
+    with pytest.raises(ValueError):
+        Scenario(cfg_with_overrides({"STRESS_WINDOW": "yok"}))
+
+def test_market_replays_window_from_start(library, monkeypatch):
+    start = 2
+    market = Market(7, cfg_with_overrides({"STRESS_WINDOW": "kriz", "STRESS_START": start}))
+    rows = library[start:start + int(CFG["MONTHS"])]
+    assert np.allclose(market.price_path()[1:], np.cumprod(np.maximum(1.0 + rows[:, :len(RISK_ASSETS)], 0.01), axis=0))
+    assert np.array_equal(market.pgl_path(), rows[:, len(RISK_ASSETS)])
+    assert market.return_shocks() is None
+
+    # pencere Market başına bir kez çözülür: oyun sırasında kütüphaneye yeniden gidilmez
+    p = new_player("Ayşe", 7, market.cfg)
+    assert p["pgl_current"] == rows[0, len(RISK_ASSETS)]
+    monkeypatch.setattr(engine.stress, "window_slice", lambda *a: pytest.fail("pencere yeniden okundu"))
+    for _ in range(3):
+        settle_month(p, "Ayşe", td_ladder(player_view(p, market)), market)
+    assert [row["FiyatlarGenelDuzeyi"] for row in p["log"]] == pytest.approx(rows[:3, len(RISK_ASSETS)])
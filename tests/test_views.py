@@ -0,0 +1,7 @@
+from views import log_row_blocks
+
+def test_log_row_blocks_split_formatted_rows_into_two_columns():
+    row = {"Aşama": "2-Banka", "FiyatlarGenelDuzeyi": 0.034, "Gelir(TL)": 32500.0, "ToplamServet(TL)": 1234567.4, "Not": "-"}
+    left, right = log_row_blocks(tuple(row.items()))
+    assert left == "**Aşama:** 2-Banka  \n**FiyatlarGenelDuzeyi:** 3.4%  \n**Gelir(TL):** 32.500 TL"
+    assert right == "**ToplamServet(TL):** 1.234.567 TL  \n**Not:** -"
@@ -0,0 +1,133 @@
+"""
+Bot turnuvası: stratejiler aynı seed ve oyuncu adlarıyla (ortak senaryolar) oynar,
+ortalama ve kuyruk net servet ile temerrüt oranına göre sıralanır.
+
+    python -m tournament --seeds 4 --players 2500 --workers 8
+    python -m tournament --strategies td_ladder,max_risk,benim_botum:karar --json sonuc.json
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+
+from bots import STRATEGIES, load_strategy
+from sim import player_name, play_game, market_for, parse_overrides
+from engine import Scenario, cfg_with_overrides, scenario_overrides, net_wealth
+
+# =========================
+# İŞÇİ
+# =========================
+def play_chunk(job: tuple):
+    """job = (strateji, seed, overrides, başlangıç, bitiş) -> (strateji, net servet dizisi, temerrüt dizisi)."""
+    strategy_name, seed, overrides, start, stop = job
+    market = market_for(seed, overrides)
+    strategy = load_strategy(strategy_name)
+    wealth = np.empty(stop - start, dtype=np.float64)
+    defaulted = np.zeros(stop - start, dtype=bool)
+    for j, i in enumerate(range(start, stop)):
+        p = None
+        for p, _row, _events in play_game(player_name(i), market, strategy):
+            pass
+        wealth[j] = net_wealth(p)
+        defaulted[j] = bool(p["defaulted"])
+    return strategy_name, wealth, defaulted
+
+def iter_jobs(strategies, seeds, overrides: dict, players: int, chunk_size: int):
+    # aynı (seed, oyuncu) her stratejiye verilir: karşılaştırma ortak senaryolar üzerinde
+    for seed in seeds:
+        for start in range(0, players, chunk_size):
+            stop = min(start + chunk_size, players)
+            for s in strategies:
+                yield (s, int(seed), overrides, start, stop)
+
+# =========================
+# SIRALAMA
+# =========================
+def score(wealth: np.ndarray, defaulted: np.ndarray, tail: float = 0.05) -> dict:
+    """Ortalama, kuyruk (alt %5 yüzdelik ve alt %5'in ortalaması = ES) ve temerrüt oranı."""
+    q = float(np.quantile(wealth, tail))
+    worst = wealth[wealth <= q]
+    return {
+        "games": int(wealth.size),
+        "mean": float(wealth.mean()),
+        "median": float(np.median(wealth)),
+        f"p{int(tail * 100)}": q,
+        "tail_mean": float(worst.mean()) if worst.size else q,
+        "default_rate": float(defaulted.mean()),
+    }
+
+def rank(results: dict) -> list:
+    """Ortalama (yüksek), kuyruk ortalaması (yüksek), temerrüt (düşük) sıraları ve bunların toplamı."""
+    names = list(results)
+    for key, reverse in (("mean", True), ("tail_mean", True), ("default_rate", False)):
+        order = sorted(names, key=lambda n: results[n][key], reverse=reverse)
+        for pos, n in enumerate(order, start=1):
+            results[n][f"rank_{key}"] = pos
+    rows = [{"strategy": n, **results[n]} for n in names]
+    rows.sort(key=lambda r: (r["rank_mean"] + r["rank_tail_mean"] + r["rank_default_rate"], r["rank_mean"]))
+    return rows
+
+def run_tournament(strategies, seeds, players: int, overrides: dict = None, workers: int = 1, chunk_size: int = 250):
+    overrides = overrides or {}
+    jobs = iter_jobs(strategies, seeds, overrides, players, chunk_size)
+    wealth = {s: [] for s in strategies}
+    defaulted = {s: [] for s in strategies}
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    try:
+        results = pool.imap_unordered(play_chunk, jobs) if pool else map(play_chunk, jobs)
+        for s, w, d in results:
+            wealth[s].append(w)
+            defaulted[s].append(d)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    scored = {s: score(np.concatenate(wealth[s]), np.concatenate(defaulted[s])) for s in strategies}
+    return rank(scored)
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m tournament", description="Bot stratejilerini ortak senaryolarda yarıştırır.")
+    ap.add_argument("--strategies", default=",".join(STRATEGIES),
+                    help="virgülle ayrılmış hazır bot adları ya da paket.modul:fonksiyon")
+    ap.add_argument("--seed", type=int, default=20260209, help="ilk seed")
+    ap.add_argument("--seeds", type=int, default=1, help="seed sayısı (seed, seed+1, ...)")
+    ap.add_argument("--players", type=int, default=1000, help="seed başına oyun sayısı")
+    ap.add_argument("--scenario", metavar="DOSYA", help="senaryo dosyası (.toml/.json); --set değerleri bunun üstüne yazılır")
+    ap.add_argument("--set", dest="overrides", action="append", metavar="KEY=VALUE", help="CFG değişikliği")
+    ap.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    ap.add_argument("--chunk-size", type=int, default=250)
+    ap.add_argument("--json", dest="json_out", help="sonuçları JSON olarak bu dosyaya da yaz")
+    args = ap.parse_args(argv)
+
+    strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
+    try:
+        overrides = {**(scenario_overrides(args.scenario) if args.scenario else {}), **parse_overrides(args.overrides)}
+        Scenario(cfg_with_overrides(overrides))
+        for s in strategies:
+            load_strategy(s)
+    except (OSError, ValueError, KeyError, ImportError) as e:
+        ap.error(str(e))
+
+    seeds = [args.seed + i for i in range(max(args.seeds, 1))]
+    t0 = time.perf_counter()
+    rows = run_tournament(strategies, seeds, max(args.players, 1), overrides, max(args.workers, 1), max(args.chunk_size, 1))
+    elapsed = time.perf_counter() - t0
+    games = sum(r["games"] for r in rows)
+
+    print(f"{'#':>2}  {'strateji':<20} {'ortalama':>12} {'alt%5 ort.':>12} {'temerrüt':>9}")
+    for pos, r in enumerate(rows, start=1):
+        print(f"{pos:>2}  {r['strategy']:<20} {r['mean']:>12,.0f} {r['tail_mean']:>12,.0f} {r['default_rate']:>8.1%}")
+    print(f"{games} oyun, {elapsed:.2f} sn ({games / max(elapsed, 1e-9):,.0f} oyun/sn)")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"seeds": seeds, "players": args.players, "overrides": overrides,
+                       "elapsed_sec": elapsed, "results": rows}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
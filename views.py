@@ -0,0 +1,147 @@
+"""
+pandas tabanlı görünümler (banka tablosu, log tablosu, servet grafiği). Streamlit'ten bağımsızdır.
+
+pandas (~0.3 sn) ve altair (~0.2 sn) ilk kullanımda içe aktarılır: yeni oturumun ilk ekranında
+(ad sorusu, 1. ay) tablo ya da grafik yoktur, sunucunun ilk açılışı bu maliyeti ödemez.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def banks_df(banks: list) -> pd.DataFrame:
+    import pandas as pd
+    if not banks:
+        return pd.DataFrame()
+    df = pd.DataFrame(banks)
+    df["Vadeli Faiz (Aylık)"] = df["TD_Rate"].map(lambda x: f"{x*100:.2f}%")
+    df["Güvence Oranı"] = df["Guarantee"].map(lambda x: f"{x*100:.0f}%")
+    df["Kredi Faizi (Aylık)"] = df["Loan_Rate"].map(lambda x: f"{x*100:.2f}%")
+    return df.sort_values("TD_Rate", ascending=False)[["Bank", "Vadeli Faiz (Aylık)", "Güvence Oranı", "Kredi Faizi (Aylık)"]]
+
+def wealth_frame(log: list) -> pd.DataFrame:
+    """Grafik için Ay / Toplam Servet tablosu (log sırayla eklendiği için sıralama gerekmez)."""
+    import pandas as pd
+    return pd.DataFrame({
+        "Ay": [row["Ay"] for row in log],
+        "Toplam Servet (Net) - TL": [row["ToplamServet(TL)"] for row in log],
+    })
+
+def wealth_chart(log: list, quantiles, levels, unit: str):
+    """
+    Oyuncunun net serveti (kırmızı) + referans oyuncuların yüzdelik bantları (reference.wealth_quantiles).
+    levels: QUANTILES (0.05, 0.25, 0.5, 0.75, 0.95); dönen altair katmanı st.altair_chart'a verilir.
+    """
+    import altair as alt
+    import pandas as pd
+
+    df_plot = wealth_frame(log)
+    band = pd.DataFrame({"Ay": range(1, quantiles.shape[1] + 1)})
+    for qq, row in zip(levels, quantiles):
+        band[f"P{int(qq * 100)}"] = row
+
+    base = alt.Chart(band).encode(x=alt.X("Ay:Q", title=unit, axis=alt.Axis(tickMinStep=1)))
+    outer = base.mark_area(opacity=0.18, color="#0b4aa2").encode(
+        y=alt.Y("P5:Q", title="Net Servet (TL)"), y2="P95:Q", tooltip=["Ay", "P5", "P95"])
+    inner = base.mark_area(opacity=0.35, color="#0b4aa2").encode(y="P25:Q", y2="P75:Q", tooltip=["Ay", "P25", "P75"])
+    median = base.mark_line(color="#0b4aa2", strokeDash=[5, 4]).encode(y="P50:Q")
+    # uzun ufukta nokta işaretleri çizgiyi kalabalıklaştırır ve çizimi yavaşlatır
+    you = alt.Chart(df_plot).mark_line(point=len(df_plot) <= 60, color="#b30000", strokeWidth=3).encode(
+        x="Ay:Q", y="Toplam Servet (Net) - TL:Q", tooltip=["Ay", "Toplam Servet (Net) - TL"])
+    return outer + inner + median + you
+
+# bildirim penceresi yedeği (st.dialog yoksa) için stil; app.py her etkileşimde yeniden çalışır, bu modül bir kez yüklenir
+OVERLAY_CSS = """
+<style>
+.ovl {
+    position: fixed; top: 0; left: 0;
+    width: 100vw; height: 100vh;
+    background: rgba(0,0,0,0.35);
+    z-index: 9999;
+    display: flex; align-items: center; justify-content: center;
+    padding: 18px;
+}
+.card {
+    background: #ffffff;
+    border-radius: 18px;
+    padding: 18px;
+    max-width: 620px;
+    width: 100%;
+    box-shadow: 0 18px 60px rgba(0,0,0,0.20);
+    border: 2px solid rgba(0,0,0,0.06);
+}
+.titleRed { font-size: 22px; font-weight: 900; color:#b30000; margin-bottom: 6px; }
+.titleBlue { font-size: 22px; font-weight: 900; color:#0b4aa2; margin-bottom: 6px; }
+.titleOrange { font-size: 22px; font-weight: 900; color:#9a4b00; margin-bottom: 6px; }
+</style>
+"""
+
+def _tl(x: float) -> str:
+    return f"{x:,.0f} TL".replace(",", ".")
+
+def _pct(x: float) -> str:
+    return f"{x*100:.1f}%"
+
+def log_row_blocks(items: tuple) -> tuple:
+    """Log satırının (anahtar, değer) çiftlerini iki sütunluk markdown bloğuna çevirir."""
+    lines = []
+    for k, v in items:
+        if isinstance(v, (int, float)):
+            v = _pct(float(v)) if ("FGD" in str(k) or "Fiyatlar" in str(k)) else _tl(float(v))
+        lines.append(f"**{k}:** {v}")
+    half = (len(lines) + 1) // 2
+    return "  \n".join(lines[:half]), "  \n".join(lines[half:])
+
+def positions_df(rows: list, labels: dict) -> pd.DataFrame:
+    """engine.position_rows çıktısından pozisyon tablosu (birim, fiyat endeksi, değer, maliyet, K/Z)."""
+    import pandas as pd
+    if not rows:
+        return pd.DataFrame()
+    df = pd.DataFrame(rows)
+    return pd.DataFrame({
+        "Varlık": df["asset"].map(labels),
+        "Birim": df["units"].map(lambda x: f"{x:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")),
+        "Fiyat Endeksi": df["price"].map(lambda x: f"{x:.4f}"),
+        "Değer": df["value"].map(_tl),
+        "Maliyet": df["cost"].map(_tl),
+        "Gerçekleşmemiş K/Z": df["unrealized"].map(_tl),
+        "Gerçekleşen K/Z": df["realized"].map(_tl),
+    })
+
+def risk_df(components: dict, labels: dict) -> pd.DataFrame:
+    """montecarlo.portfolio_risk bileşenleri: tek başına VaR ve ES'e katkı."""
+    import pandas as pd
+    return pd.DataFrame({
+        "Kaynak": [labels.get(c, c) for c in components],
+        "Tek Başına VaR": [_tl(v["var"]) for v in components.values()],
+        "ES Katkısı": [_tl(v["es"]) for v in components.values()],
+    })
+
+# toplu mevduat emri: düzenlenebilir sütun -> engine.empty_ticket tarafı
+TICKET_COLUMNS = {"Vadesiz Yatır": "dd_in", "Vadeli Yatır": "td_in", "Vadesiz Çek": "dd_out", "Vadeli Boz": "td_out"}
+
+def ticket_frame(banks: list, dd_accounts: dict, td_accounts: dict) -> pd.DataFrame:
+    """Banka başına bir satır: oranlar ve bakiyeler (salt okunur) + boş emir sütunları."""
+    import pandas as pd
+    df = pd.DataFrame({
+        "Banka": [b["Bank"] for b in banks],
+        "Güvence": [_pct(b["Guarantee"]) for b in banks],
+        "Vadeli Faiz": [f"{b['TD_Rate']*100:.2f}%" for b in banks],
+        "Vadesiz Bakiye": [_tl(float(dd_accounts.get(b["Bank"], 0.0))) for b in banks],
+        "Vadeli Bakiye": [_tl(float(td_accounts.get(b["Bank"], 0.0))) for b in banks],
+    })
+    for col in TICKET_COLUMNS:
+        df[col] = 0.0
+    return df
+
+def ticket_from_frame(df: pd.DataFrame) -> dict:
+    """Düzenlenmiş tablodan emir: {"dd_in": {banka: TL}, ...}; boş/sıfır hücreler atlanır."""
+    import pandas as pd
+    out = {}
+    for col, side in TICKET_COLUMNS.items():
+        amounts = pd.to_numeric(df[col], errors="coerce").fillna(0.0).clip(lower=0.0)
+        out[side] = {str(b): float(a) for b, a in zip(df["Banka"], amounts) if a > 0}
+    return out